@@ -1,36 +1,45 @@
 import os
 import pandas as pd
 from datetime import datetime
-from path_utils import UPLOAD_FOLDER, NEW_FILES_LIST
-import re
-patron_final = re.compile(r'^.+ - \d{2}-\d{2}-\d{4}\.xlsx$', re.IGNORECASE)
-if NEW_FILES_LIST.exists():
-    with open(NEW_FILES_LIST, 'r', encoding='utf-8') as f:
-        nuevos = {l.strip() for l in f if l.strip()}
-else:
-    nuevos = None
+from path_utils import UPLOAD_FOLDER, cargar_manifiesto
+from COMUN import staging
 
-for file_path in UPLOAD_FOLDER.glob('*.xlsx'):
-    archivo = file_path.name
-    if archivo.endswith(".xlsx") and " - " in archivo:
-        if patron_final.match(archivo) and (not nuevos or archivo not in nuevos):
-            continue
-        ruta_archivo = str(file_path)
-        try:
-            nombre_sin_extension = os.path.splitext(archivo)[0]
-            partes = nombre_sin_extension.split(" - ")
-            empresa = partes[0].strip()
-            fecha_str = partes[1].strip()
-            fecha_dt = datetime.strptime(fecha_str, "%d-%m-%Y")
-            fecha_formateada = fecha_dt.strftime("%d/%m/%Y")
-            df = pd.read_excel(ruta_archivo)
-            if "Cuenta contable" in df.columns:
-                df["Empresa"] = df["Cuenta contable"].notna().map(lambda x: empresa if x else "")
-                df["Fecha"] = df["Cuenta contable"].notna().map(lambda x: fecha_formateada if x else "")
-            else:
-                df["Empresa"] = empresa
-                df["Fecha"] = fecha_formateada
-            df.to_excel(ruta_archivo, index=False)
-            print(f"Archivo actualizado: {archivo} (Empresa: {empresa}, Fecha: {fecha_formateada})")
-        except Exception as e:
-            print(f"Error procesando {archivo}: {e}")
+
+def procesar(df, archivo):
+    """Agrega Empresa y Fecha tomadas del nombre 'EMPRESA - dd-mm-aaaa.xlsx'."""
+    nombre_sin_extension = os.path.splitext(archivo)[0]
+    partes = nombre_sin_extension.split(" - ")
+    empresa = partes[0].strip()
+    fecha_str = partes[1].strip()
+    fecha_dt = datetime.strptime(fecha_str, "%d-%m-%Y")
+    fecha_formateada = fecha_dt.strftime("%d/%m/%Y")
+    if "Cuenta contable" in df.columns:
+        df["Empresa"] = df["Cuenta contable"].notna().map(lambda x: empresa if x else "")
+        df["Fecha"] = df["Cuenta contable"].notna().map(lambda x: fecha_formateada if x else "")
+    else:
+        df["Empresa"] = empresa
+        df["Fecha"] = fecha_formateada
+    print(f"Archivo actualizado: {archivo} (Empresa: {empresa}, Fecha: {fecha_formateada})")
+    return df
+
+
+def main():
+    manifiesto = cargar_manifiesto()
+    for file_path in UPLOAD_FOLDER.glob('*.xlsx'):
+        archivo = file_path.name
+        if archivo.endswith(".xlsx") and " - " in archivo:
+            if not manifiesto.pendiente(file_path, "agregar_colum"):
+                continue
+            ruta_archivo = str(file_path)
+            try:
+                df = staging.leer(ruta_archivo)
+                df = procesar(df, archivo)
+                staging.escribir(df, ruta_archivo)
+                manifiesto.registrar(file_path, "agregar_colum")
+            except Exception as e:
+                print(f"Error procesando {archivo}: {e}")
+    manifiesto.guardar()
+
+
+if __name__ == "__main__":
+    main()
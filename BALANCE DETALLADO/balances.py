@@ -0,0 +1,226 @@
+"""Base SQLite con los balances ya procesados de DOCUMENTOS.
+
+Cada libro final ("EMPRESA - dd-mm-aaaa.xlsx") se carga como un corte completo: las filas
+de esa empresa y esa fecha se reemplazan en una sola transacción, así que volver a cargar
+un archivo reprocesado no duplica nada. La consulta típica ("saldo final de la cuenta X de
+la empresa Y al corte Z") es un acceso por índice en vez de abrir todos los Excel.
+
+Las cuentas se guardan como texto y las consultas por cuenta usan prefijo PUC: "1110"
+suma todas sus subcuentas. Las identificaciones se normalizan igual que en terceros.py.
+"""
+import re
+import sqlite3
+from pathlib import Path
+
+import pandas as pd
+
+from terceros import normalizar_nit
+
+# Columna del Excel → columna de la tabla
+COLUMNAS = {
+    "Cuenta contable": "cuenta",
+    "Cuenta contable nombre": "cuenta_nombre",
+    "No. Identificación": "nit",
+    "Tercero": "tercero",
+    "Saldo anterior": "saldo_anterior",
+    "Débitos": "debitos",
+    "Créditos": "creditos",
+    "Saldo final": "saldo_final",
+    "Categoría": "categoria",
+    "Saldo por Cobrar": "saldo_por_cobrar",
+    "Saldo por Pagar": "saldo_por_pagar",
+}
+COLUMNAS_SALDO = ["saldo_anterior", "debitos", "creditos", "saldo_final",
+                  "saldo_por_cobrar", "saldo_por_pagar"]
+
+# "EMPRESA - 31-08-2025.xlsx"
+_PATRON_ARCHIVO = re.compile(r'^(?P<empresa>.+) - (?P<d>\d{2})-(?P<m>\d{2})-(?P<a>\d{4})\.xlsx$', re.IGNORECASE)
+_PATRON_FECHA = re.compile(r'^(\d{2})[/-](\d{2})[/-](\d{4})$')
+
+
+def fecha_iso(fecha):
+    """"31/08/2025", "31-08-2025" o "2025-08-31" → "2025-08-31"."""
+    texto = str(fecha).strip()
+    m = _PATRON_FECHA.match(texto)
+    if m:
+        return f"{m.group(3)}-{m.group(2)}-{m.group(1)}"
+    return pd.Timestamp(texto).strftime("%Y-%m-%d")
+
+
+def corte_de_archivo(archivo):
+    """(empresa, fecha ISO) a partir del nombre final del archivo, o None."""
+    m = _PATRON_ARCHIVO.match(Path(archivo).name)
+    if not m:
+        return None
+    return m.group("empresa").strip(), f"{m.group('a')}-{m.group('m')}-{m.group('d')}"
+
+
+def _texto_cuenta(serie):
+    s = serie.astype("string").str.strip().str.replace(r"\.0$", "", regex=True)
+    return s.mask(s == "")
+
+
+def _saldo(serie):
+    # Acepta números o textos con coma decimal de versiones anteriores
+    texto = serie.astype(str).str.strip().str.replace(",", ".", regex=False)
+    return pd.to_numeric(texto, errors="coerce").astype("float64")
+
+
+class BaseBalances:
+    def __init__(self, ruta_db):
+        self.ruta_db = Path(ruta_db)
+        self.conexion = sqlite3.connect(str(self.ruta_db))
+        self.conexion.executescript(
+            "CREATE TABLE IF NOT EXISTS balances ("
+            " empresa TEXT NOT NULL,"
+            " fecha TEXT NOT NULL,"
+            " cuenta TEXT NOT NULL,"
+            " cuenta_nombre TEXT,"
+            " nit TEXT,"
+            " tercero TEXT,"
+            " saldo_anterior REAL,"
+            " debitos REAL,"
+            " creditos REAL,"
+            " saldo_final REAL,"
+            " categoria TEXT,"
+            " saldo_por_cobrar REAL,"
+            " saldo_por_pagar REAL,"
+            " archivo TEXT);"
+            # Corte y prefijo de cuenta (rango cuenta >= '1110' AND cuenta < '1111')
+            "CREATE INDEX IF NOT EXISTS ix_balances_corte ON balances (empresa, fecha, cuenta);"
+            "CREATE INDEX IF NOT EXISTS ix_balances_cuenta ON balances (cuenta);"
+            "CREATE INDEX IF NOT EXISTS ix_balances_nit ON balances (nit);"
+        )
+        self.conexion.commit()
+
+    def cerrar(self):
+        self.conexion.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    # ------------------------------------------------------------------ carga
+
+    def cargar(self, df, archivo, reemplazar=True, confirmar=True):
+        """Reemplaza el corte (empresa, fecha) del archivo con las filas del DataFrame, en una
+        sola transacción. Con reemplazar=False solo agrega las filas y con confirmar=False
+        deja la transacción abierta (bloques de un mismo archivo, ver CargaPorBloques).
+        Retorna el número de filas cargadas, o None si el archivo no tiene nombre final
+        o le faltan columnas."""
+        corte = corte_de_archivo(archivo)
+        if corte is None or "Cuenta contable" not in df.columns:
+            return None
+        empresa, fecha = corte
+        datos = pd.DataFrame({destino: df[origen] if origen in df.columns else None
+                              for origen, destino in COLUMNAS.items()})
+        datos["cuenta"] = _texto_cuenta(datos["cuenta"])
+        datos["nit"] = normalizar_nit(datos["nit"])
+        # decimales deja "nan" como texto en las categorías vacías
+        datos["categoria"] = datos["categoria"].mask(datos["categoria"].astype(str).isin(["nan", ""]))
+        for columna in COLUMNAS_SALDO:
+            datos[columna] = _saldo(datos[columna])
+        datos = datos[datos["cuenta"].notna()]
+        # NaN → NULL
+        datos = datos.astype(object).where(datos.notna(), None)
+
+        columnas = ["empresa", "fecha", *COLUMNAS.values(), "archivo"]
+        filas = [(empresa, fecha, *fila, Path(archivo).name)
+                 for fila in datos.itertuples(index=False, name=None)]
+        try:
+            if reemplazar:
+                self.conexion.execute("DELETE FROM balances WHERE empresa = ? AND fecha = ?", (empresa, fecha))
+            self.conexion.executemany(
+                f"INSERT INTO balances ({', '.join(columnas)}) VALUES ({', '.join('?' * len(columnas))})",
+                filas,
+            )
+        except Exception:
+            self.conexion.rollback()
+            raise
+        if confirmar:
+            self.conexion.commit()
+        return len(filas)
+
+    # --------------------------------------------------------------- consultas
+
+    @staticmethod
+    def _filtro_cuenta(cuenta):
+        """Condición por prefijo de cuenta que usa el índice (sin LIKE)."""
+        prefijo = str(cuenta).strip()
+        if not prefijo:
+            raise ValueError("La cuenta no puede estar vacía")
+        siguiente = prefijo[:-1] + chr(ord(prefijo[-1]) + 1)
+        return "cuenta >= ? AND cuenta < ?", [prefijo, siguiente]
+
+    def saldo(self, empresa, fecha, cuenta, columna="saldo_final"):
+        """Suma de `columna` de la cuenta (y sus subcuentas) de la empresa al corte.
+        None si ese corte no está cargado."""
+        if columna not in COLUMNAS_SALDO:
+            raise ValueError(f"Columna de saldo desconocida: {columna}")
+        fecha = fecha_iso(fecha)
+        if not self.conexion.execute(
+                "SELECT 1 FROM balances WHERE empresa = ? AND fecha = ? LIMIT 1", (empresa, fecha)).fetchone():
+            return None
+        condicion, valores = self._filtro_cuenta(cuenta)
+        (total,) = self.conexion.execute(
+            f"SELECT COALESCE(SUM({columna}), 0) FROM balances"
+            f" WHERE empresa = ? AND fecha = ? AND {condicion}",
+            [empresa, fecha, *valores],
+        ).fetchone()
+        return total
+
+    def consultar(self, empresa=None, fecha=None, cuenta=None, nit=None):
+        """Filas que cumplen los filtros dados (cuenta por prefijo, nit normalizado)."""
+        condiciones, valores = [], []
+        if empresa is not None:
+            condiciones.append("empresa = ?")
+            valores.append(empresa)
+        if fecha is not None:
+            condiciones.append("fecha = ?")
+            valores.append(fecha_iso(fecha))
+        if cuenta is not None:
+            condicion, extra = self._filtro_cuenta(cuenta)
+            condiciones.append(condicion)
+            valores += extra
+        if nit is not None:
+            condiciones.append("nit = ?")
+            valores.append(normalizar_nit(pd.Series([nit])).iloc[0])
+        sql = "SELECT * FROM balances"
+        if condiciones:
+            sql += " WHERE " + " AND ".join(condiciones)
+        return pd.read_sql_query(sql + " ORDER BY empresa, fecha, cuenta", self.conexion, params=valores)
+
+    def cortes(self, empresa=None):
+        """DataFrame con los cortes cargados (empresa, fecha, filas)."""
+        sql = "SELECT empresa, fecha, COUNT(*) AS filas FROM balances"
+        valores = []
+        if empresa is not None:
+            sql += " WHERE empresa = ?"
+            valores.append(empresa)
+        return pd.read_sql_query(sql + " GROUP BY empresa, fecha ORDER BY empresa, fecha",
+                                 self.conexion, params=valores)
+
+
+class CargaPorBloques:
+    """Envoltura de BaseBalances para el modo por bloques: el primer bloque de cada archivo
+    borra el corte y los siguientes agregan filas, todo en una sola transacción que el
+    ejecutor confirma con `terminar` cuando el archivo terminó bien (si no, se deshace y
+    el corte queda como estaba)."""
+
+    def __init__(self, base):
+        self.base = base
+        self._iniciados = set()
+
+    def cargar(self, df, archivo):
+        reemplazar = archivo not in self._iniciados
+        self._iniciados.add(archivo)
+        return self.base.cargar(df, archivo, reemplazar=reemplazar, confirmar=False)
+
+    def terminar(self, archivo, completo):
+        self._iniciados.discard(archivo)
+        if completo:
+            self.base.conexion.commit()
+        else:
+            self.base.conexion.rollback()
@@ -0,0 +1,35 @@
+from path_utils import UPLOAD_FOLDER, BALANCES_DB, cargar_manifiesto
+from COMUN import staging
+from balances import BaseBalances
+
+
+def procesar(df, archivo, base):
+    """Carga el balance final en la base (reemplaza su corte); None si no aplica."""
+    filas = base.cargar(df, archivo)
+    if filas is None:
+        print(f"'{archivo}' no se cargó en la base (nombre o columnas inesperadas)")
+        return None
+    print(f"Cargado en la base: {archivo} ({filas} filas)")
+    return filas
+
+
+def main():
+    manifiesto = cargar_manifiesto()
+    archivos = [f for f in UPLOAD_FOLDER.glob('*.xlsx')
+                if " - " in f.name and manifiesto.pendiente(f, "base_datos")]
+
+    with BaseBalances(BALANCES_DB) as base:
+        for file_path in archivos:
+            archivo = file_path.name
+            try:
+                df = staging.leer(str(file_path))
+                procesar(df, archivo, base)
+                # No modifica el archivo: solo queda registrada la etapa
+                manifiesto.registrar(file_path, "base_datos")
+            except Exception as e:
+                print(f"Error cargando {archivo} en la base: {e}")
+    manifiesto.guardar()
+
+
+if __name__ == "__main__":
+    main()
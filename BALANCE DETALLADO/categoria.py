@@ -1,57 +1,76 @@
+import json
 import pandas as pd
-from path_utils import UPLOAD_FOLDER, NEW_FILES_LIST
-import re
-patron_final = re.compile(r'^.+ - \d{2}-\d{2}-\d{4}\.xlsx$', re.IGNORECASE)
-if NEW_FILES_LIST.exists():
-    with open(NEW_FILES_LIST, 'r', encoding='utf-8') as f:
-        nuevos = {l.strip() for l in f if l.strip()}
-else:
-    nuevos = None
-
-# Categorías según los primeros 4 dígitos de la cuenta contable
-cobrar = {"1370", "1895"}
-pagar = {"2399", "2815", "2360", "3710"}
-
-for file_path in UPLOAD_FOLDER.glob('*.xlsx'):
-    archivo = file_path.name
-    ruta_archivo = str(file_path)
-    if patron_final.match(archivo) and (not nuevos or archivo not in nuevos):
-        continue
-    try:
-            df = pd.read_excel(ruta_archivo)
-
-            if {"Cuenta contable", "Saldo final"}.issubset(df.columns):
-                # Obtener los primeros 4 caracteres como string
-                df["Prefijo Cuenta"] = df["Cuenta contable"].astype(str).str[:4]
-
-                # Clasificar en Categoría
-                def clasificar(prefijo):
-                    if prefijo in cobrar:
-                        return "Saldo por Cobrar"
-                    elif prefijo in pagar:
-                        return "Saldo por Pagar"
-                    else:
-                        return ""
-
-                df["Categoría"] = df["Prefijo Cuenta"].apply(clasificar)
-
-                # Crear columnas adicionales en blanco
-                df["Saldo por Cobrar"] = 0
-                df["Saldo por Pagar"] = 0
-
-                # Asignar los valores de "Saldo final" a las columnas nuevas según corresponda
-                df.loc[df["Categoría"] == "Saldo por Cobrar", "Saldo por Cobrar"] = df["Saldo final"]
-                df.loc[df["Categoría"] == "Saldo por Pagar", "Saldo por Pagar"] = df["Saldo final"]
-
-                # Eliminar la columna auxiliar
-                df.drop(columns=["Prefijo Cuenta"], inplace=True)
+from path_utils import BASE_DIR, UPLOAD_FOLDER, cargar_manifiesto
+from COMUN import staging
 
+# Clasificador por prefijos del PUC (1, 2, 4 o 6 dígitos); el prefijo más largo gana.
+RUTA_CATEGORIAS = BASE_DIR / "categorias_puc.json"
+
+
+def cargar_categorias(ruta=RUTA_CATEGORIAS):
+    """Lee la configuración y arma el índice {longitud: {prefijo: categoría}}, de mayor a menor longitud.
+    Retorna (índice, columnas de saldo)."""
+    with open(ruta, 'r', encoding='utf-8') as fh:
+        datos = json.load(fh)
+    indice = {}
+    for prefijo, categoria in datos["prefijos"].items():
+        prefijo = str(prefijo).strip()
+        indice.setdefault(len(prefijo), {})[prefijo] = categoria
+    indice = dict(sorted(indice.items(), reverse=True))
+    return indice, datos.get("columnas_saldo", [])
+
+
+indice_prefijos, columnas_saldo = cargar_categorias()
+
+
+# Clasificar en Categoría
+def clasificar(cuentas):
+    """Categoría de cada cuenta: una búsqueda vectorizada por longitud de prefijo, de la más larga a la más corta."""
+    cuentas = cuentas.astype(str)
+    categoria = pd.Series(pd.NA, index=cuentas.index, dtype=object)
+    for longitud, prefijos in indice_prefijos.items():
+        pendientes = categoria.isna()
+        if not pendientes.any():
+            break
+        categoria[pendientes] = cuentas[pendientes].str[:longitud].map(prefijos)
+    return categoria.fillna("")
+
+
+def procesar(df, archivo):
+    """Agrega Categoría y las columnas Saldo por Cobrar / Saldo por Pagar; None si faltan columnas."""
+    if not {"Cuenta contable", "Saldo final"}.issubset(df.columns):
+        print(f"Columnas necesarias no encontradas en: {archivo}")
+        return None
+    df["Categoría"] = clasificar(df["Cuenta contable"])
+
+    # Una columna por categoría con saldo: "Saldo final" donde corresponde, 0 en el resto
+    for columna in columnas_saldo:
+        df[columna] = df["Saldo final"].where(df["Categoría"] == columna, 0)
+
+    print(f"Archivo actualizado con categorías y columnas de saldo: {archivo}")
+    return df
+
+
+def main():
+    manifiesto = cargar_manifiesto()
+    for file_path in UPLOAD_FOLDER.glob('*.xlsx'):
+        archivo = file_path.name
+        ruta_archivo = str(file_path)
+        if not manifiesto.pendiente(file_path, "categoria"):
+            continue
+        try:
+            df = staging.leer(ruta_archivo)
+            df = procesar(df, archivo)
+            if df is not None:
                 # Guardar el archivo sobrescribiendo el original
-                df.to_excel(ruta_archivo, index=False)
-                print(f"Archivo actualizado con categorías y columnas de saldo: {archivo}")
-            else:
-                print(f"Columnas necesarias no encontradas en: {archivo}")
+                staging.escribir(df, ruta_archivo)
+            # Aunque no aplique, queda registrada para no volver a leer el archivo
+            manifiesto.registrar(file_path, "categoria")
+
+        except Exception as e:
+            print(f"Error procesando {archivo}: {e}")
+    manifiesto.guardar()
 
-    except Exception as e:
-        print(f"Error procesando {archivo}: {e}")
 
+if __name__ == "__main__":
+    main()
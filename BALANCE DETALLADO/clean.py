@@ -1,34 +1,56 @@
 import pandas as pd
-from openpyxl import load_workbook
-from path_utils import UPLOAD_FOLDER, NEW_FILES_LIST
-import re
-
-patron_final = re.compile(r'^.+ - \d{2}-\d{2}-\d{4}\.xlsx$', re.IGNORECASE)
-if NEW_FILES_LIST.exists():
-    with open(NEW_FILES_LIST, 'r', encoding='utf-8') as f:
-        nuevos = {l.strip() for l in f if l.strip()}
-else:
-    nuevos = None  # None = procesar solo los que NO cumplen patrón y aún no están finalizados
-
-for file_path in UPLOAD_FOLDER.glob('*.xlsx'):
-    archivo = file_path.name
-    # Regla de omisión: si nombre final y no está en "nuevos" (o no hay nuevos definidos), saltar
-    if patron_final.match(archivo) and (not nuevos or archivo not in nuevos):
-        continue
-    ruta_archivo = str(file_path)
-
-    try:
-        # Usamos openpyxl para leer el valor exacto de la celda A1
-        wb = load_workbook(ruta_archivo, data_only=True)
-        ws = wb.active
-        valor_a1 = str(ws["A1"].value).strip() if ws["A1"].value else ""
-        if valor_a1.lower() == "cuenta contable":
-            print(f"'{archivo}' ya tiene 'Cuenta' en A1. Se deja sin modificar.")
-        else:
-            # Leer Excel a partir de la fila 8 (header=7 en pandas)
-            df = pd.read_excel(ruta_archivo, header=7)
-            df.to_excel(ruta_archivo, index=False)
-            print(f"Encabezado actualizado en: {archivo}")
-
-    except Exception as e:
-        print(f"Error procesando '{archivo}': {e}")
+from path_utils import UPLOAD_FOLDER, cargar_manifiesto
+from COMUN import staging
+from COMUN.encabezado import sondear, sondear_libro
+from COMUN.bloques import leer_bloques as leer_por_bloques, FILAS_BLOQUE
+
+# Fila (base 0) donde empieza el encabezado en la exportación cruda del ERP (fila 8 en Excel);
+# se usa si la sonda no encuentra la fila "Cuenta contable"
+FILA_ENCABEZADO = 7
+
+
+def leer(ruta_archivo):
+    """Abre el libro una sola vez: revisa A1 y lo carga con el encabezado correcto.
+    Retorna (df, ya_limpio); ya_limpio=True si A1 ya era 'Cuenta contable'."""
+    with pd.ExcelFile(ruta_archivo) as xl:
+        # pandas abre el libro en modo read-only: la sonda recorre solo las primeras filas de la columna A
+        encabezado = sondear_libro(xl.book, "Cuenta contable")
+        ya_limpio = encabezado.fila_encabezado == 0
+        fila = encabezado.fila_encabezado if encabezado.fila_encabezado is not None else FILA_ENCABEZADO
+        df = xl.parse(header=fila)
+    return df, ya_limpio
+
+
+def leer_bloques(ruta_archivo, filas=FILAS_BLOQUE):
+    """Como leer, pero retorna (iterador de DataFrames de hasta `filas` filas, ya_limpio)."""
+    encabezado = sondear(ruta_archivo, "Cuenta contable")
+    ya_limpio = encabezado.fila_encabezado == 0
+    fila = encabezado.fila_encabezado if encabezado.fila_encabezado is not None else FILA_ENCABEZADO
+    return leer_por_bloques(ruta_archivo, fila, filas), ya_limpio
+
+
+def main():
+    manifiesto = cargar_manifiesto()
+    for file_path in UPLOAD_FOLDER.glob('*.xlsx'):
+        archivo = file_path.name
+        # Solo archivos nuevos o modificados desde la última ejecución
+        if not manifiesto.pendiente(file_path, "clean"):
+            continue
+        ruta_archivo = str(file_path)
+
+        try:
+            df, ya_limpio = leer(ruta_archivo)
+            if ya_limpio:
+                print(f"'{archivo}' ya tiene 'Cuenta' en A1. Se deja sin modificar.")
+            else:
+                staging.escribir(df, ruta_archivo)
+                print(f"Encabezado actualizado en: {archivo}")
+            manifiesto.registrar(file_path, "clean")
+
+        except Exception as e:
+            print(f"Error procesando '{archivo}': {e}")
+    manifiesto.guardar()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,37 +1,52 @@
 import pandas as pd
-from path_utils import UPLOAD_FOLDER, NEW_FILES_LIST
-import re
-patron_final = re.compile(r'^.+ - \d{2}-\d{2}-\d{4}\.xlsx$', re.IGNORECASE)
-if NEW_FILES_LIST.exists():
-    with open(NEW_FILES_LIST, 'r', encoding='utf-8') as f:
-        nuevos = {l.strip() for l in f if l.strip()}
-else:
-    nuevos = None
-
-# Columnas a convertir
-columnas_a_procesar = [
+from path_utils import UPLOAD_FOLDER, cargar_manifiesto
+from COMUN import staging
+
+# Columnas numéricas: se guardan como números; el formato "1.234,56" lo pone el escritor
+columnas_numericas = [
     "Saldo anterior", "Débitos", "Créditos", "Saldo final",
-    "Empresa", "Fecha", "Categoría", "Saldo por Cobrar", "Saldo por Pagar"
+    "Saldo por Cobrar", "Saldo por Pagar"
 ]
+# Columnas de texto a las que se les cambia el punto por coma
+columnas_texto = ["Empresa", "Fecha", "Categoría"]
+
+
+def procesar(df, archivo):
+    """Deja los saldos como float64 (acepta textos con punto o con coma decimal de versiones
+    anteriores) y cambia el punto por coma en las columnas de texto; espera el DataFrame leído con dtype=str."""
+    # Procesa solo si las columnas existen en el archivo
+    for columna in columnas_numericas:
+        if columna in df.columns:
+            texto = df[columna].astype(str).str.strip().str.replace(",", ".", regex=False)
+            df[columna] = pd.to_numeric(texto, errors="coerce").astype("float64")
+    for columna in columnas_texto:
+        if columna in df.columns:
+            # Reemplaza puntos por comas en las celdas no vacías
+            df[columna] = df[columna].astype(str).str.replace(".", ",", regex=False)
+    print(f"Archivo procesado: {archivo}")
+    return df
+
+
+def main():
+    manifiesto = cargar_manifiesto()
+    # Recorre los archivos en la carpeta
+    for file_path in UPLOAD_FOLDER.glob('*.xlsx'):
+        archivo = file_path.name
+        if archivo.endswith(".xlsx") and " - " in archivo:
+            if not manifiesto.pendiente(file_path, "decimales"):
+                continue
+            ruta_archivo = str(file_path)
+            try:
+                df = staging.leer(ruta_archivo, dtype=str)
+                df = procesar(df, archivo)
+
+                # Guarda el archivo sobrescribiendo el original
+                staging.escribir(df, ruta_archivo)
+                manifiesto.registrar(file_path, "decimales")
+            except Exception as e:
+                print(f"Error procesando {archivo}: {e}")
+    manifiesto.guardar()
+
 
-# Recorre los archivos en la carpeta
-for file_path in UPLOAD_FOLDER.glob('*.xlsx'):
-    archivo = file_path.name
-    if archivo.endswith(".xlsx") and " - " in archivo:
-        if patron_final.match(archivo) and (not nuevos or archivo not in nuevos):
-            continue
-        ruta_archivo = str(file_path)
-        try:
-            df = pd.read_excel(ruta_archivo, dtype=str)
-
-            # Procesa solo si las columnas existen en el archivo
-            for columna in columnas_a_procesar:
-                if columna in df.columns:
-                    # Reemplaza puntos por comas en las celdas no vacías
-                    df[columna] = df[columna].astype(str).str.replace(".", ",", regex=False)
-
-            # Guarda el archivo sobrescribiendo el original
-            df.to_excel(ruta_archivo, index=False)
-            print(f"Archivo procesado: {archivo}")
-        except Exception as e:
-            print(f"Error procesando {archivo}: {e}")
+if __name__ == "__main__":
+    main()
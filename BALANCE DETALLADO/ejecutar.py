@@ -1,3 +1,5 @@
+import argparse
+import os
 import subprocess
 import sys
 from pathlib import Path
@@ -12,15 +14,99 @@ scripts = [
     "remplazar.py",
     "categoria.py",
     "unificar.py",
-    "decimales.py"
+    "decimales.py",
+    "base_datos.py"
 ]
 
-for script in scripts:
-    script_path = BASE_DIR / script
-    print(f"\n🟡 Ejecutando {script_path.name}...")
+
+def ejecutar_scripts(informe):
+    """Modo anterior: un intérprete por script, leyendo y escribiendo los Excel en cada etapa."""
+    from path_utils import UPLOAD_FOLDER
+    from COMUN.informe import instantanea, escritos, medicion
+    from COMUN.atomico import escritura
+    # Los lectores (GRAFICOS) ven una generación nueva de la carpeta al terminar
+    with escritura(UPLOAD_FOLDER):
+        for script in scripts:
+            script_path = BASE_DIR / script
+            print(f"\n🟡 Ejecutando {script_path.name}...")
+            antes = instantanea(UPLOAD_FOLDER)
+            try:
+                with informe.etapa(script):
+                    subprocess.run([sys.executable, str(script_path)], check=True)
+                print(f"✅ {script_path.name} ejecutado correctamente.")
+            except subprocess.CalledProcessError as e:
+                print(f"❌ Error al ejecutar {script_path.name}: {e}")
+                informe.error(script, None, e)
+                break
+            finally:
+                # Cada script corre en otro proceso: solo se ve qué archivos escribió (o renombró)
+                for nombre, bytes_escritos in escritos(antes, instantanea(UPLOAD_FOLDER)):
+                    informe.agregar(medicion(script, nombre, bytes_escritos=bytes_escritos))
+        if os.environ.get("CONTA_STAGING"):
+            # Con copias columnares, solo al final se escriben los .xlsx
+            from path_utils import cargar_manifiesto
+            from COMUN.staging import publicar_carpeta
+            print("\n🟡 Publicando .xlsx desde las copias columnares...")
+            with informe.etapa("publicar copias"):
+                publicar_carpeta(UPLOAD_FOLDER, cargar_manifiesto())
+
+
+def vigilar(args):
+    """Modo vigilante: procesa cada lote de archivos nuevos apenas termina de copiarse."""
+    from path_utils import UPLOAD_FOLDER, INFORME_JSONL
+    from COMUN.informe import Informe
+    from COMUN.vigilante import vigilar as vigilar_carpeta
+    import motor
+
+    def procesar(rutas):
+        # Solo el lote que entregó el vigilante; con None (al arrancar) toda la carpeta
+        informe = Informe(INFORME_JSONL, BASE_DIR.name, "vigilante")
+        try:
+            motor.ejecutar(informe=informe, filas_bloque=args.bloques, archivos=rutas)
+        finally:
+            informe.cerrar()
+
+    # Primero se pone al día con lo que llegó mientras no estaba corriendo
+    procesar(None)
+    vigilar_carpeta(UPLOAD_FOLDER, procesar, motor.por_procesar, espera=args.espera, polling=args.polling)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pipeline BALANCE DETALLADO")
+    parser.add_argument("--por-scripts", action="store_true",
+                        help="Ejecuta cada script en un proceso aparte (modo anterior, más lento)")
+    parser.add_argument("--staging", choices=["parquet", "arrow"],
+                        help="Guarda los resultados intermedios en copias columnares ocultas (requiere pyarrow)")
+    parser.add_argument("--bloques", type=int, metavar="FILAS",
+                        help="Procesa cada libro de a bloques de FILAS filas (memoria acotada en archivos muy grandes)")
+    parser.add_argument("--vigilar", action="store_true",
+                        help="Queda corriendo y procesa los archivos nuevos apenas llegan a la carpeta")
+    parser.add_argument("--espera", type=float, default=2.0,
+                        help="Segundos sin cambios antes de procesar un archivo nuevo (con --vigilar)")
+    parser.add_argument("--polling", action="store_true",
+                        help="Con --vigilar, revisa la carpeta periódicamente en vez de usar watchdog")
+    args = parser.parse_args()
+    if args.vigilar and args.por_scripts:
+        parser.error("--vigilar usa el motor; no se puede combinar con --por-scripts")
+    if args.bloques is not None and (args.por_scripts or args.bloques < 1):
+        parser.error("--bloques requiere el motor y un número de filas mayor que cero")
+    if args.staging:
+        os.environ["CONTA_STAGING"] = args.staging
+    if args.vigilar:
+        vigilar(args)
+        return
+    from path_utils import INFORME_JSONL
+    from COMUN.informe import Informe
+    informe = Informe(INFORME_JSONL, BASE_DIR.name, "por-scripts" if args.por_scripts else "motor")
     try:
-        subprocess.run([sys.executable, str(script_path)], check=True)
-        print(f"✅ {script_path.name} ejecutado correctamente.")
-    except subprocess.CalledProcessError as e:
-        print(f"❌ Error al ejecutar {script_path.name}: {e}")
-        break
+        if args.por_scripts:
+            ejecutar_scripts(informe)
+        else:
+            import motor
+            motor.ejecutar(informe=informe, filas_bloque=args.bloques)
+    finally:
+        informe.cerrar()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,33 +1,42 @@
 import pandas as pd
-from path_utils import UPLOAD_FOLDER, NEW_FILES_LIST
-import re
-patron_final = re.compile(r'^.+ - \d{2}-\d{2}-\d{4}\.xlsx$', re.IGNORECASE)
-if NEW_FILES_LIST.exists():
-    with open(NEW_FILES_LIST, 'r', encoding='utf-8') as f:
-        nuevos = {l.strip() for l in f if l.strip()}
-else:
-    nuevos = None
+from path_utils import UPLOAD_FOLDER, cargar_manifiesto
+from COMUN import staging
 
-for file_path in UPLOAD_FOLDER.glob('*.xlsx'):
-    archivo = file_path.name
-    if archivo.endswith(".xlsx") and " - " in archivo:
-        if patron_final.match(archivo) and (not nuevos or archivo not in nuevos):
-            continue
-        ruta_archivo = str(file_path)
-        try:
-            # Cargar el archivo Excel
-            df = pd.read_excel(ruta_archivo)
 
-            # Verificar si la columna existe
-            if "No. Identificación" in df.columns:
-                # Filtrar solo las filas donde la columna "No. Identificación" no esté vacía
-                df_filtrado = df[df["No. Identificación"].notna()]
+def procesar(df, archivo):
+    """Deja solo las filas con "No. Identificación"; None si la columna no existe."""
+    # Verificar si la columna existe
+    if "No. Identificación" not in df.columns:
+        print(f"Columna 'No. Identificación' no encontrada en {archivo}")
+        return None
+    # Filtrar solo las filas donde la columna "No. Identificación" no esté vacía
+    df_filtrado = df[df["No. Identificación"].notna()]
+    print(f"Archivo procesado: {archivo}")
+    return df_filtrado
 
-                # Guardar el archivo sobrescribiendo el original
-                df_filtrado.to_excel(ruta_archivo, index=False)
-                print(f"Archivo procesado: {archivo}")
-            else:
-                print(f"Columna 'No. Identificación' no encontrada en {archivo}")
 
-        except Exception as e:
-            print(f"Error procesando {archivo}: {e}")
+def main():
+    manifiesto = cargar_manifiesto()
+    for file_path in UPLOAD_FOLDER.glob('*.xlsx'):
+        archivo = file_path.name
+        if archivo.endswith(".xlsx") and " - " in archivo:
+            if not manifiesto.pendiente(file_path, "filtros"):
+                continue
+            ruta_archivo = str(file_path)
+            try:
+                # Cargar el archivo Excel
+                df = staging.leer(ruta_archivo)
+                df_filtrado = procesar(df, archivo)
+                if df_filtrado is not None:
+                    # Guardar el archivo sobrescribiendo el original
+                    staging.escribir(df_filtrado, ruta_archivo)
+                # Aunque no aplique, queda registrada para no volver a leer el archivo
+                manifiesto.registrar(file_path, "filtros")
+
+            except Exception as e:
+                print(f"Error procesando {archivo}: {e}")
+    manifiesto.guardar()
+
+
+if __name__ == "__main__":
+    main()
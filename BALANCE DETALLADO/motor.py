@@ -0,0 +1,131 @@
+"""Motor en un solo paso para el pipeline de BALANCE DETALLADO.
+
+Cada libro de DOCUMENTOS se lee una única vez, las etapas (clean → agregar_colum →
+filtros → remplazar → categoria → unificar → decimales) se aplican en memoria sobre el
+DataFrame y el resultado se escribe una sola vez al final; después se carga en la base de
+balances (base_datos). El orden y la semántica son los mismos que al ejecutar cada script
+por separado; el grafo de etapas y el manifiesto de DOCUMENTOS deciden qué etapas le
+faltan a cada archivo (ver COMUN/ejecutor.py). Un archivo que falla en una etapa pasa a
+DOCUMENTOS/_cuarentena y el resto del lote sigue.
+
+Con `filas_bloque` (ejecutar.py --bloques N) cada libro se lee, transforma y escribe de a
+N filas: todas las etapas son por fila y unificar consulta el registro de terceros en
+SQLite, así que la memoria no depende del tamaño del archivo.
+
+A diferencia de INFORME BANCOS, los libros se procesan en serie: unificar registra los NIT
+en el registro de terceros (el primer nombre visto de cada NIT queda como canónico, con
+INSERT OR IGNORE) y base_datos carga cada corte en la base de balances; las dos son bases
+SQLite compartidas por todo el lote y el resultado de unificar depende del orden en que
+llegan los archivos. Repartir los libros en un pool de procesos cambiaría los nombres
+canónicos según qué tarea termine primero.
+"""
+from functools import partial
+
+import rename
+import clean
+import agregar_colum
+import filtros
+import remplazar
+import categoria
+import unificar
+import decimales
+import base_datos
+from path_utils import (UPLOAD_FOLDER, ETAPAS, TERCEROS_DB, BALANCES_DB, INFORME_JSONL,
+                        CUARENTENA_DIR, PATRON_FINAL, cargar_manifiesto)
+from terceros import RegistroTerceros
+from balances import BaseBalances, CargaPorBloques
+from COMUN import staging, ejecutor
+from COMUN.ejecutor import Etapa
+from COMUN.informe import Informe
+from COMUN.atomico import escritura
+
+
+def _unificar(df, archivo, registro):
+    # Registra los NIT nuevos del archivo y reescribe "Tercero" con el nombre canónico
+    unificar.acumular(df, registro, archivo)
+    return unificar.procesar(df, archivo, registro)
+
+
+# Grafo de etapas por archivo (rename es una barrera previa sobre toda la carpeta)
+GRAFO = ejecutor.ordenar([
+    # clean lo aplica la lectura (clean.leer ubica la fila de encabezado)
+    Etapa("clean", None),
+    Etapa("agregar_colum", agregar_colum.procesar, ("clean",), requiere_guion=True, por_filas=True),
+    Etapa("filtros", filtros.procesar, ("clean",), requiere_guion=True, por_filas=True),
+    Etapa("remplazar", remplazar.procesar, ("filtros",), por_filas=True),
+    Etapa("categoria", categoria.procesar, ("remplazar",), por_filas=True),
+    Etapa("unificar", _unificar, ("agregar_colum", "categoria"), "texto", requiere_guion=True, por_filas=True),
+    Etapa("decimales", decimales.procesar, ("unificar",), "texto", requiere_guion=True, modifica=True,
+          por_filas=True),
+    Etapa("base_datos", base_datos.procesar, ("decimales",), requiere_guion=True, posterior=True,
+          por_filas=True),
+])
+assert [e.nombre for e in GRAFO] == [e for e in ETAPAS if e != "rename"]
+
+
+def por_procesar(rutas):
+    """Para el vigilante: las rutas que todavía tienen trabajo según el manifiesto."""
+    return ejecutor.por_procesar(rutas, cargar_manifiesto(), GRAFO, PATRON_FINAL)
+
+
+def ejecutar(informe=None, filas_bloque=None, archivos=None):
+    """Ejecuta el pipeline completo en un solo proceso. Con `filas_bloque` cada libro se
+    procesa de a bloques de ese número de filas (memoria acotada en archivos muy grandes).
+    Con `archivos` solo se procesan esas rutas (el lote del vigilante): rename y la revisión
+    del manifiesto no recorren toda la carpeta."""
+    propio = informe is None
+    if propio:
+        informe = Informe(INFORME_JSONL, "BALANCE DETALLADO", "motor")
+    try:
+        # Los lectores (GRAFICOS) ven una generación nueva de DOCUMENTOS al terminar
+        with escritura(UPLOAD_FOLDER):
+            _ejecutar(informe, filas_bloque, archivos)
+    finally:
+        if propio:
+            informe.cerrar()
+
+
+def _ejecutar(informe, filas_bloque=None, lote=None):
+    print("\n🟡 Ejecutando rename.py...")
+    with informe.etapa("rename"):
+        finales = rename.main(lote)
+
+    manifiesto = cargar_manifiesto()
+    if lote is None:
+        # Copias columnares que dejó una ejecución por scripts interrumpida
+        with informe.etapa("publicar copias"):
+            staging.publicar_carpeta(UPLOAD_FOLDER, manifiesto)
+        finales = ejecutor.archivos(UPLOAD_FOLDER)
+    # Un stat() por archivo: solo entran los que tienen alguna etapa pendiente
+    trabajo = []
+    for f in finales:
+        etapas = ejecutor.pendientes(manifiesto, f, GRAFO)
+        if etapas:
+            trabajo.append((f, etapas))
+    if not trabajo:
+        print("↪️ No hay archivos nuevos para procesar.")
+        return
+
+    # ▶️ Una lectura y una escritura por libro; unificar usa el registro persistente de
+    # terceros y base_datos carga el resultado ya escrito
+    if filas_bloque:
+        print(f"\n🟡 Ejecutando clean → ... → decimales → base_datos por bloques de {filas_bloque} filas ({len(trabajo)} archivos)...")
+    else:
+        print(f"\n🟡 Ejecutando clean → ... → decimales → base_datos en memoria ({len(trabajo)} archivos)...")
+    with RegistroTerceros(TERCEROS_DB) as registro, BaseBalances(BALANCES_DB) as base:
+        for file_path, etapas in trabajo:
+            if filas_bloque:
+                # Lectura, etapas y escritura de a bloques; la carga del corte en la base es
+                # una sola transacción por archivo
+                argumentos = {"unificar": (registro,), "base_datos": (CargaPorBloques(base),)}
+                resultado = ejecutor.procesar_archivo_por_bloques(
+                    file_path, GRAFO, etapas, partial(clean.leer_bloques, filas=filas_bloque), argumentos)
+            else:
+                argumentos = {"unificar": (registro,), "base_datos": (base,)}
+                resultado = ejecutor.procesar_archivo(file_path, GRAFO, etapas, clean.leer, argumentos)
+            ejecutor.registrar_resultado(file_path, resultado, manifiesto, informe, CUARENTENA_DIR)
+    manifiesto.guardar()
+
+
+if __name__ == "__main__":
+    ejecutar()
@@ -1,13 +1,75 @@
+import re
+import sys
 from pathlib import Path
 
 # Directorio base (carpeta donde están los scripts)
 BASE_DIR = Path(__file__).resolve().parent
 
+# Raíz del proyecto: permite importar los módulos compartidos de COMUN
+ROOT_DIR = BASE_DIR.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.append(str(ROOT_DIR))
+
+from COMUN.manifiesto import Manifiesto
+
 # Carpeta DOCUMENTOS (siempre dentro de la carpeta de los scripts)
 UPLOAD_FOLDER = BASE_DIR / "DOCUMENTOS"
 
-# Archivo que guarda los nombres de archivos recién renombrados en la última ejecución
+# Manifiesto con hash, tamaño, mtime y etapas aplicadas de cada archivo
+MANIFIESTO_JSON = UPLOAD_FOLDER / "_manifiesto.json"
+
+# Registro persistente NIT → Tercero que usa unificar.py
+TERCEROS_DB = UPLOAD_FOLDER / "_terceros.sqlite"
+
+# Base con los balances procesados, consultable por empresa, fecha, cuenta y NIT
+BALANCES_DB = UPLOAD_FOLDER / "_balances.sqlite"
+
+# Lista de recién renombrados que usaban las versiones anteriores (solo se lee para migrar)
 NEW_FILES_LIST = UPLOAD_FOLDER / "_archivos_recien_renombrados.txt"
 
+# Informe de cada ejecución (JSON lines): tiempos, filas y bytes por etapa y por archivo
+INFORME_JSONL = UPLOAD_FOLDER / "_informe_ejecuciones.jsonl"
+
+# Archivos que fallaron en alguna etapa del motor (con un .error.txt al lado)
+CUARENTENA_DIR = UPLOAD_FOLDER / "_cuarentena"
+
+# Etapas del pipeline en orden, con su versión (ver COMUN/manifiesto.py antes de subir una)
+ETAPAS = {
+    "rename": 1,
+    "clean": 1,
+    "agregar_colum": 1,
+    "filtros": 1,
+    "remplazar": 1,
+    "categoria": 1,
+    "unificar": 1,
+    "decimales": 2,
+    "base_datos": 1,
+}
+
+# Etapas que existían antes del manifiesto (las únicas que se dan por aplicadas al migrar)
+ETAPAS_ANTERIORES = ["rename", "clean", "agregar_colum", "filtros", "remplazar",
+                     "categoria", "unificar", "decimales"]
+
+# Nombre final que deja rename.py: "EMPRESA - dd-mm-aaaa.xlsx"
+PATRON_FINAL = re.compile(r'^.+ - \d{2}-\d{2}-\d{4}\.xlsx$', re.IGNORECASE)
+
 if not UPLOAD_FOLDER.exists():
     raise FileNotFoundError(f"No se encontró la carpeta DOCUMENTOS en: {UPLOAD_FOLDER}")
+
+
+def cargar_manifiesto():
+    """Carga el manifiesto de DOCUMENTOS. La primera vez adopta como ya procesados los archivos
+    con nombre final que no estaban en la última lista de recién renombrados (la regla anterior)."""
+    manifiesto = Manifiesto(MANIFIESTO_JSON, ETAPAS)
+    if not manifiesto.existia:
+        nuevos = set()
+        if NEW_FILES_LIST.exists():
+            with open(NEW_FILES_LIST, 'r', encoding='utf-8') as f:
+                nuevos = {l.strip() for l in f if l.strip()}
+        for f in UPLOAD_FOLDER.glob('*.xlsx'):
+            if PATRON_FINAL.match(f.name) and f.name not in nuevos:
+                # Procesados antes de existir el manifiesto: versión 1 de cada etapa de entonces
+                manifiesto.adoptar(f, {etapa: 1 for etapa in ETAPAS_ANTERIORES})
+        manifiesto.guardar()
+    manifiesto.limpiar(UPLOAD_FOLDER)
+    return manifiesto
@@ -1,51 +1,87 @@
-import pandas as pd
-from path_utils import UPLOAD_FOLDER, NEW_FILES_LIST
+import json
 import re
-patron_final = re.compile(r'^.+ - \d{2}-\d{2}-\d{4}\.xlsx$', re.IGNORECASE)
-if NEW_FILES_LIST.exists():
-    with open(NEW_FILES_LIST, 'r', encoding='utf-8') as f:
-        nuevos = {l.strip() for l in f if l.strip()}
-else:
-    nuevos = None
-
-# Diccionario con los valores a reemplazar
-reemplazos = {
-    "AMERICAN": ("806010696", "AMERICAN LIGHTING SAS"),
-    "CONSORCIO AMERICAN": ("900779363", "CONSORCIO AMERICAN LIGHTING"),
-    "AGM": ("800186313", "AGM DESARROLLOS SAS"),
-    "CONSORCIO SJC": ("901034269", "CONSORCIO ALUMBRADO PUBLICO SJC"),
-}
-
-# Crear diccionario auxiliar de validación por identificación
-validacion_identificacion = {v[0]: v[1] for v in reemplazos.values()}
-
-for file_path in UPLOAD_FOLDER.glob('*.xlsx'):
-    archivo = file_path.name
-    ruta_archivo = str(file_path)
-    if patron_final.match(archivo) and (not nuevos or archivo not in nuevos):
-        continue
-    try:
-            df = pd.read_excel(ruta_archivo)
-
-            if {"Cuenta contable nombre", "No. Identificación", "Tercero"}.issubset(df.columns):
-                # Primera etapa: reemplazo basado en coincidencias
-                for clave, (identificacion, tercero) in reemplazos.items():
-                    filtro = df["Cuenta contable nombre"].str.contains("OTRAS CXP", na=False) & \
-                             df["Cuenta contable nombre"].str.contains(clave, na=False)
-
-                    df.loc[filtro, "No. Identificación"] = identificacion
-                    df.loc[filtro, "Tercero"] = tercero
-
-                # Segunda etapa: validación global por No. Identificación
-                df["No. Identificación"] = df["No. Identificación"].astype(str)
-                for nit, tercero_correcto in validacion_identificacion.items():
-                    df.loc[df["No. Identificación"] == nit, "Tercero"] = tercero_correcto
+import pandas as pd
+from path_utils import BASE_DIR, UPLOAD_FOLDER, cargar_manifiesto
+from COMUN import staging
+
+# Reglas intercompañía: si "Cuenta contable nombre" contiene filtro_cuenta y la clave,
+# se fuerzan el NIT y el Tercero. Si varias claves coinciden gana la última regla de la lista.
+RUTA_REGLAS = BASE_DIR / "reglas_remplazar.json"
+
+
+def cargar_reglas(ruta=RUTA_REGLAS):
+    """Lee la tabla de reglas y la compila en un solo patrón.
+    Las alternativas van de mayor a menor prioridad para que, en cada posición, la regex tome la
+    de mayor prioridad; el lookahead permite encontrar claves que se solapan."""
+    with open(ruta, 'r', encoding='utf-8') as fh:
+        datos = json.load(fh)
+    tabla = pd.DataFrame(datos["reglas"], columns=["clave", "nit", "tercero"])
+    tabla["nit"] = tabla["nit"].astype(str)
+    alternativas = "|".join(f"(?P<r{i}>{re.escape(c)})" for i, c in reversed(list(enumerate(tabla["clave"]))))
+    patron = re.compile(f"(?=(?:{alternativas}))")
+    # Validación global por No. Identificación (para NIT repetidos, la última regla gana)
+    validacion = dict(zip(tabla["nit"], tabla["tercero"]))
+    return datos.get("filtro_cuenta", ""), patron, tabla, validacion
+
+
+filtro_cuenta, patron_reglas, tabla_reglas, validacion_identificacion = cargar_reglas()
+
 
+def _regla_por_fila(nombres):
+    """Índice de la regla ganadora por fila (solo filas con alguna coincidencia)."""
+    coincidencias = nombres.str.extractall(patron_reglas)
+    if coincidencias.empty:
+        return pd.Series(dtype="int64")
+    # Cada coincidencia trae una sola columna no nula: su número de regla
+    regla = coincidencias.notna().idxmax(axis=1).str[1:].astype("int64")
+    return regla.groupby(level=0).max()
+
+
+def procesar(df, archivo):
+    """Corrige No. Identificación / Tercero de las cuentas intercompañía; None si faltan columnas."""
+    if not {"Cuenta contable nombre", "No. Identificación", "Tercero"}.issubset(df.columns):
+        print(f"Columnas necesarias no encontradas en: {archivo}")
+        return None
+    # Primera etapa: reemplazo basado en coincidencias (un solo recorrido con el patrón compilado)
+    nombres = df["Cuenta contable nombre"]
+    candidatas = nombres[nombres.str.contains(filtro_cuenta, na=False, regex=False)]
+    regla = _regla_por_fila(candidatas)
+    if not regla.empty:
+        valores = tabla_reglas.loc[regla.to_numpy(), ["nit", "tercero"]].to_numpy()
+        # El NIT se asigna como texto: la columna pasa a object antes de mezclar tipos
+        df["No. Identificación"] = df["No. Identificación"].astype(object)
+        df["Tercero"] = df["Tercero"].astype(object)
+        df.loc[regla.index, ["No. Identificación", "Tercero"]] = valores
+
+    # Segunda etapa: validación global por No. Identificación (una sola asignación)
+    df["No. Identificación"] = df["No. Identificación"].astype(str)
+    correcto = df["No. Identificación"].map(validacion_identificacion)
+    df["Tercero"] = correcto.where(correcto.notna(), df["Tercero"])
+
+    print(f"Archivo actualizado con validación de terceros: {archivo}")
+    return df
+
+
+def main():
+    manifiesto = cargar_manifiesto()
+    for file_path in UPLOAD_FOLDER.glob('*.xlsx'):
+        archivo = file_path.name
+        ruta_archivo = str(file_path)
+        if not manifiesto.pendiente(file_path, "remplazar"):
+            continue
+        try:
+            df = staging.leer(ruta_archivo)
+            df = procesar(df, archivo)
+            if df is not None:
                 # Guardar el archivo sobrescribiendo el original
-                df.to_excel(ruta_archivo, index=False)
-                print(f"Archivo actualizado con validación de terceros: {archivo}")
-            else:
-                print(f"Columnas necesarias no encontradas en: {archivo}")
+                staging.escribir(df, ruta_archivo)
+            # Aunque no aplique, queda registrada para no volver a leer el archivo
+            manifiesto.registrar(file_path, "remplazar")
+
+        except Exception as e:
+            print(f"Error procesando {archivo}: {e}")
+    manifiesto.guardar()
+
 
-    except Exception as e:
-        print(f"Error procesando {archivo}: {e}")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -1,32 +1,34 @@
 import os
 import re
-from openpyxl import load_workbook
-from path_utils import UPLOAD_FOLDER, NEW_FILES_LIST
+from pathlib import Path
 
-def main():
-    archivos_excel = [f for f in UPLOAD_FOLDER.glob('*.xlsx')]
-    patron_final = re.compile(r'^.+ - \d{2}-\d{2}-\d{4}\.xlsx$', re.IGNORECASE)
-    nuevos = []
+from path_utils import UPLOAD_FOLDER, PATRON_FINAL, cargar_manifiesto
+from COMUN.encabezado import sondear
+from COMUN.ejecutor import archivos, es_temporal
+
+def main(rutas=None):
+    """Renombra los libros sin nombre final. Con `rutas` (lote del vigilante) solo se revisan
+    esas en vez de toda la carpeta. Retorna las rutas con nombre final de los libros revisados."""
+    if rutas is None:
+        # Sin los archivos de bloqueo "~$..." que deja Excel abierto
+        archivos_excel = archivos(UPLOAD_FOLDER)
+    else:
+        archivos_excel = [Path(r) for r in rutas if Path(r).exists() and not es_temporal(Path(r).name)]
+    manifiesto = cargar_manifiesto()
+    finales = []
     for file_path in archivos_excel:
         archivo = file_path.name
         # Idempotencia: si ya cumple el patrón final, se omite
-        if patron_final.match(archivo):
+        if PATRON_FINAL.match(archivo):
             print(f"↪️ Ya con nombre final, se omite: {archivo}")
+            finales.append(file_path)
             continue
         ruta_archivo = str(file_path)
         try:
-            wb = load_workbook(ruta_archivo, data_only=True)
-            ws = wb.active
-
-            fila_nombre = str(ws["A2"].value)
-            if fila_nombre and "NIT" in fila_nombre:
-                nombre_parte1 = fila_nombre.split("NIT")[0].strip()
-            else:
-                nombre_parte1 = "SIN_NOMBRE"
-
-            fila_fecha = str(ws["A4"].value)
-            match_fecha = re.search(r"-\s*([0-9]{2}/[0-9]{2}/[0-9]{4})", fila_fecha)
-            fecha_final = match_fecha.group(1) if match_fecha else "FECHA_NO_ENCONTRADA"
+            # Solo se leen las primeras filas de la columna A (modo streaming)
+            encabezado = sondear(ruta_archivo)
+            nombre_parte1 = encabezado.empresa if encabezado.empresa is not None else "SIN_NOMBRE"
+            fecha_final = encabezado.fecha_final or "FECHA_NO_ENCONTRADA"
 
             fecha_final_safe = fecha_final.replace("/", "-") if fecha_final != "FECHA_NO_ENCONTRADA" else ""
             # Normalizar parte empresa: espacios múltiples y guiones repetidos
@@ -49,19 +51,17 @@ def main():
 
             if not os.path.exists(nueva_ruta):
                 os.rename(ruta_archivo, nueva_ruta)
-                nuevos.append(nuevo_nombre)
+                # Exportación cruda: el nombre nuevo entra al manifiesto solo con "rename"
+                manifiesto.olvidar(file_path)
+                manifiesto.registrar(nueva_ruta, "rename")
+                finales.append(Path(nueva_ruta))
                 print(f"Renombrado: '{archivo}' → '{nuevo_nombre}'")
             else:
                 print(f"Archivo ya existe: '{nuevo_nombre}' → se omite.")
         except Exception as e:
             print(f"Error procesando '{archivo}': {e}")
-    # Guardar lista de nuevos (puede quedar vacía)
-    try:
-        with open(NEW_FILES_LIST, 'w', encoding='utf-8') as f:
-            for n in nuevos:
-                f.write(n + '\n')
-    except Exception as e:
-        print(f"⚠️ No se pudo escribir lista de nuevos archivos: {e}")
+    manifiesto.guardar()
+    return finales
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,136 @@
+"""Registro persistente NIT → Tercero para unificar.py.
+
+Guarda en SQLite el primer nombre de tercero visto para cada NIT normalizado, de modo que
+el nombre canónico sea el mismo mes a mes y no dependa de qué archivos vienen en el lote.
+La normalización quita puntos, espacios, el prefijo "NIT" y el dígito de verificación
+("806.010.696-1" → "806010696").
+
+El primer nombre puede venir con errores de digitación; para esos casos hay una tabla de
+correcciones manuales que gana sobre lo registrado:
+
+    python terceros.py --corregir 806010696 "NOMBRE CORRECTO S.A.S."
+
+La corrección aplica a los archivos que se procesen después; los ya procesados conservan
+el nombre anterior hasta que se vuelvan a procesar.
+
+El registro no se carga en memoria: cada archivo (o cada bloque, en el modo por bloques)
+consulta solo los NIT que trae, así que el costo no crece con el tamaño del registro.
+"""
+import argparse
+import sqlite3
+from pathlib import Path
+
+import pandas as pd
+
+# Máximo de parámetros por consulta "IN (...)" (SQLite admite 999 en versiones antiguas)
+LOTE_CONSULTA = 900
+
+
+def normalizar_nit(serie):
+    """Clave normalizada de cada identificación (NA si está vacía)."""
+    s = serie.astype("string").str.upper().str.strip()
+    # Identificaciones numéricas que llegaron como float ("806010696.0")
+    s = s.str.replace(r"\.0$", "", regex=True)
+    s = s.str.replace(r"^NIT\.?", "", regex=True)
+    # Dígito de verificación
+    s = s.str.split("-").str[0]
+    s = s.str.replace(r"[\s.,]", "", regex=True)
+    return s.mask(s == "")
+
+
+class RegistroTerceros:
+    def __init__(self, ruta_db):
+        self.ruta_db = Path(ruta_db)
+        self.conexion = sqlite3.connect(str(self.ruta_db))
+        self.conexion.execute(
+            "CREATE TABLE IF NOT EXISTS terceros ("
+            " nit TEXT PRIMARY KEY,"
+            " tercero TEXT NOT NULL,"
+            " origen TEXT,"
+            " creado TEXT DEFAULT CURRENT_TIMESTAMP)"
+        )
+        # Nombres corregidos a mano: ganan sobre el primer nombre registrado
+        self.conexion.execute(
+            "CREATE TABLE IF NOT EXISTS correcciones ("
+            " nit TEXT PRIMARY KEY,"
+            " tercero TEXT NOT NULL,"
+            " corregido TEXT DEFAULT CURRENT_TIMESTAMP)"
+        )
+        self.conexion.commit()
+
+    def cerrar(self):
+        self.conexion.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    def registrar(self, df, origen=None):
+        """Agrega los NIT que aún no están registrados (el primero que aparece gana)."""
+        if "No. Identificación" not in df.columns or "Tercero" not in df.columns:
+            return 0
+        nuevos = pd.DataFrame({
+            "nit": normalizar_nit(df["No. Identificación"]),
+            "tercero": df["Tercero"],
+        }).dropna().drop_duplicates("nit")
+        if nuevos.empty:
+            return 0
+        antes = self.conexion.total_changes
+        self.conexion.executemany(
+            "INSERT OR IGNORE INTO terceros (nit, tercero, origen) VALUES (?, ?, ?)",
+            [(nit, str(tercero), origen) for nit, tercero in nuevos.itertuples(index=False)],
+        )
+        self.conexion.commit()
+        return self.conexion.total_changes - antes
+
+    def corregir(self, nit, nombre):
+        """Fija a mano el nombre canónico de un NIT (reemplaza una corrección anterior)."""
+        clave = normalizar_nit(pd.Series([nit])).iloc[0]
+        if pd.isna(clave) or not str(nombre).strip():
+            raise ValueError(f"NIT o nombre vacío: {nit!r}, {nombre!r}")
+        self.conexion.execute(
+            "INSERT INTO correcciones (nit, tercero) VALUES (?, ?)"
+            " ON CONFLICT(nit) DO UPDATE SET tercero = excluded.tercero, corregido = CURRENT_TIMESTAMP",
+            (clave, str(nombre).strip()),
+        )
+        self.conexion.commit()
+        return clave
+
+    def buscar(self, nits):
+        """{nit: tercero} solo de los NIT pedidos (consulta por lotes a la base, sin cargar
+        todo el registro en memoria); las correcciones manuales ganan sobre el registro."""
+        nits = list(nits)
+        encontrados = {}
+        for i in range(0, len(nits), LOTE_CONSULTA):
+            lote = nits[i:i + LOTE_CONSULTA]
+            marcas = ', '.join('?' * len(lote))
+            encontrados.update(self.conexion.execute(
+                f"SELECT nit, tercero FROM terceros WHERE nit IN ({marcas})", lote))
+            encontrados.update(self.conexion.execute(
+                f"SELECT nit, tercero FROM correcciones WHERE nit IN ({marcas})", lote))
+        return encontrados
+
+    def resolver(self, identificaciones):
+        """Serie con el tercero canónico de cada identificación (NaN si no está registrado)."""
+        claves = normalizar_nit(identificaciones)
+        return claves.map(self.buscar(claves.dropna().unique())).astype(object)
+
+
+def main():
+    from path_utils import TERCEROS_DB
+    parser = argparse.ArgumentParser(description="Registro NIT → Tercero de BALANCE DETALLADO")
+    parser.add_argument("--corregir", nargs=2, metavar=("NIT", "NOMBRE"),
+                        help="Fija el nombre canónico de un NIT (gana sobre el primero registrado)")
+    args = parser.parse_args()
+    if not args.corregir:
+        parser.print_help()
+        return
+    with RegistroTerceros(TERCEROS_DB) as registro:
+        clave = registro.corregir(*args.corregir)
+    print(f"✅ NIT {clave}: {args.corregir[1]}")
+
+
+if __name__ == "__main__":
+    main()
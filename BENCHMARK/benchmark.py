@@ -0,0 +1,254 @@
+"""Benchmark de los dos pipelines sobre datos sintéticos.
+
+Por cada pipeline y modo copia los scripts (y COMUN) a una carpeta temporal, genera las
+exportaciones crudas con generador.py, ejecuta `ejecutar.py` como lo haría el usuario y
+mide:
+
+- tiempo total y tiempo por etapa (desde cada línea "🟡 Ejecutando ..." hasta la siguiente);
+- pico de memoria (RSS): suma de todo el árbol de procesos si psutil está instalado; si no,
+  el proceso más grande según getrusage (solo Linux/macOS);
+- tiempo de una segunda ejecución sin archivos nuevos (debe ser casi nula).
+
+Con el motor, las exportaciones de SALDO BANCOS que traen una columna no registrada deben
+terminar en _cuarentena (y solo esas); si no, el escenario falla.
+
+Los resultados se guardan en BENCHMARK/resultados/benchmark_<fecha>.json.
+
+Uso:
+    python benchmark.py --empresas 10 --meses 3 --filas-balance 5000
+    python benchmark.py --pipeline "INFORME BANCOS" --modo motor --modo por-scripts --workers 4
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from path_utils import ROOT_DIR, PIPELINES, RESULTADOS_DIR
+from generador import generar, con_columna_no_registrada
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Modo → argumentos de ejecutar.py
+MODOS = {
+    "motor": [],
+    "por-scripts": ["--por-scripts"],
+    "staging-parquet": ["--staging", "parquet"],
+}
+
+MARCA_ETAPA = "🟡 "
+
+# Sin psutil, un proceso intermedio reporta el pico de sus descendientes
+_ENVOLTURA = (
+    "import resource, subprocess, sys\n"
+    "codigo = subprocess.call(sys.argv[2:])\n"
+    "with open(sys.argv[1], 'w') as fh:\n"
+    "    fh.write(str(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss))\n"
+    "sys.exit(codigo)\n"
+)
+
+
+def _preparar(pipeline, trabajo):
+    """Copia los scripts del pipeline y COMUN a `trabajo`, con la carpeta de entrada vacía."""
+    destino = trabajo / pipeline
+    destino.mkdir(parents=True)
+    for archivo in (ROOT_DIR / pipeline).iterdir():
+        if archivo.is_file() and archivo.suffix in (".py", ".json"):
+            shutil.copy2(archivo, destino / archivo.name)
+    shutil.copytree(ROOT_DIR / "COMUN", trabajo / "COMUN",
+                    ignore=shutil.ignore_patterns("__pycache__"))
+    entrada = destino / PIPELINES[pipeline]
+    entrada.mkdir()
+    return destino, entrada
+
+
+class _MonitorRSS(threading.Thread):
+    """Muestrea con psutil la memoria de todo el árbol de procesos."""
+
+    def __init__(self, pid, intervalo=0.05):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.intervalo = intervalo
+        self.pico = 0
+        self._fin = threading.Event()
+
+    def run(self):
+        try:
+            raiz = psutil.Process(self.pid)
+        except psutil.Error:
+            return
+        while not self._fin.is_set():
+            total = 0
+            try:
+                for proceso in [raiz, *raiz.children(recursive=True)]:
+                    try:
+                        total += proceso.memory_info().rss
+                    except psutil.Error:
+                        pass
+            except psutil.Error:
+                break
+            self.pico = max(self.pico, total)
+            self._fin.wait(self.intervalo)
+
+    def detener(self):
+        self._fin.set()
+        self.join()
+
+
+def _ejecutar(carpeta, argumentos, log):
+    """Ejecuta ejecutar.py y retorna (segundos, etapas, pico_rss_mb, código de salida)."""
+    entorno = {**os.environ, "PYTHONIOENCODING": "utf-8", "PYTHONUNBUFFERED": "1"}
+    entorno.pop("CONTA_STAGING", None)
+    comando = [sys.executable, "ejecutar.py", *argumentos]
+    archivo_rss = None
+    if psutil is None and hasattr(os, "getuid"):
+        fd, archivo_rss = tempfile.mkstemp(suffix=".rss")
+        os.close(fd)
+        comando = [sys.executable, "-c", _ENVOLTURA, archivo_rss, *comando]
+
+    etapas = {}
+    etapa, inicio_etapa = None, None
+    inicio = time.perf_counter()
+    proceso = subprocess.Popen(comando, cwd=carpeta, env=entorno, stdout=subprocess.PIPE,
+                               stderr=subprocess.STDOUT, text=True, encoding="utf-8", errors="replace")
+    monitor = _MonitorRSS(proceso.pid) if psutil is not None else None
+    if monitor:
+        monitor.start()
+    for linea in proceso.stdout:
+        ahora = time.perf_counter()
+        log.write(linea)
+        texto = linea.strip()
+        if texto.startswith(MARCA_ETAPA):
+            if etapa is not None:
+                etapas[etapa] = etapas.get(etapa, 0) + ahora - inicio_etapa
+            # "🟡 Ejecutando rename (4 procesos)..." → "rename"
+            etapa = texto[len(MARCA_ETAPA):].removeprefix("Ejecutando ").rstrip(".")
+            etapa = re.sub(r"\s*\(.*\)$", "", etapa)
+            inicio_etapa = ahora
+    codigo = proceso.wait()
+    fin = time.perf_counter()
+    if etapa is not None:
+        etapas[etapa] = etapas.get(etapa, 0) + fin - inicio_etapa
+    if monitor:
+        monitor.detener()
+
+    pico_mb = None
+    if monitor:
+        pico_mb = monitor.pico / 2**20
+    elif archivo_rss:
+        try:
+            with open(archivo_rss) as fh:
+                pico = int(fh.read() or 0)
+            # ru_maxrss está en KB en Linux y en bytes en macOS
+            pico_mb = pico / 2**20 if sys.platform == "darwin" else pico / 2**10
+        except (OSError, ValueError):
+            pass
+        finally:
+            os.unlink(archivo_rss)
+    return fin - inicio, {k: round(v, 3) for k, v in etapas.items()}, pico_mb, codigo
+
+
+def medir(pipeline, modo, parametros, workers=None, conservar=None):
+    """Corre un escenario completo y retorna su resultado (dict)."""
+    argumentos = list(MODOS[modo])
+    if workers and pipeline == "INFORME BANCOS" and modo != "por-scripts":
+        argumentos += ["--workers", str(workers)]
+    with tempfile.TemporaryDirectory(prefix="bench_") as tmp:
+        trabajo = Path(tmp)
+        carpeta, entrada = _preparar(pipeline, trabajo)
+        rutas = generar(entrada, pipeline, **parametros)
+        bytes_entrada = sum(r.stat().st_size for r in rutas)
+        esperados = len(con_columna_no_registrada(rutas)) if pipeline == "INFORME BANCOS" else 0
+        with open(trabajo / "ejecucion.log", "w", encoding="utf-8") as log:
+            segundos, etapas, pico_mb, codigo = _ejecutar(carpeta, argumentos, log)
+            # Los scripts por separado solo registran el error; la cuarentena es del motor
+            cuarentena = len(list((entrada / "_cuarentena").glob("*.xlsx")))
+            if modo != "por-scripts":
+                assert cuarentena == esperados, (
+                    f"{pipeline} ({modo}): {cuarentena} archivos en _cuarentena, se esperaban {esperados}")
+            # Segunda ejecución: sin archivos nuevos no debería hacer trabajo
+            segundos_re, _, _, _ = _ejecutar(carpeta, argumentos, log)
+        if conservar:
+            shutil.copy2(trabajo / "ejecucion.log", Path(conservar) / f"{pipeline} - {modo}.log")
+    return {
+        "pipeline": pipeline,
+        "modo": modo,
+        "argumentos": argumentos,
+        "archivos": len(rutas),
+        "bytes_entrada": bytes_entrada,
+        "segundos": round(segundos, 3),
+        "etapas": etapas,
+        "pico_rss_mb": round(pico_mb, 1) if pico_mb is not None else None,
+        "reejecucion_segundos": round(segundos_re, 3),
+        "cuarentena": cuarentena,
+        "codigo_salida": codigo,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de los pipelines con datos sintéticos")
+    parser.add_argument("--pipeline", choices=list(PIPELINES), action="append",
+                        help="Pipeline a medir (por defecto ambos)")
+    parser.add_argument("--modo", choices=list(MODOS), action="append",
+                        help="Modo de ejecutar.py (por defecto motor y por-scripts)")
+    parser.add_argument("--empresas", type=int, default=5)
+    parser.add_argument("--meses", type=int, default=3)
+    parser.add_argument("--filas-balance", type=int, default=2000)
+    parser.add_argument("--filas-bancos", type=int, default=30)
+    parser.add_argument("--semilla", type=int, default=1)
+    parser.add_argument("--workers", type=int, help="Procesos del motor de INFORME BANCOS")
+    parser.add_argument("--salida", type=Path, help="Archivo JSON de resultados")
+    args = parser.parse_args()
+
+    parametros = {
+        "empresas": args.empresas,
+        "meses": args.meses,
+        "filas_balance": args.filas_balance,
+        "filas_bancos": args.filas_bancos,
+        "semilla": args.semilla,
+    }
+    RESULTADOS_DIR.mkdir(exist_ok=True)
+    salida = args.salida or RESULTADOS_DIR / f"benchmark_{datetime.now():%Y%m%d_%H%M%S}.json"
+
+    resultados = []
+    for pipeline in args.pipeline or list(PIPELINES):
+        for modo in args.modo or ["motor", "por-scripts"]:
+            print(f"\n🟡 Midiendo {pipeline} ({modo})...")
+            resultado = medir(pipeline, modo, parametros, args.workers, conservar=RESULTADOS_DIR)
+            resultados.append(resultado)
+            estado = "✅" if resultado["codigo_salida"] == 0 else "❌"
+            rss = f"{resultado['pico_rss_mb']} MB" if resultado["pico_rss_mb"] is not None else "s/d"
+            print(f"{estado} {resultado['segundos']} s, pico {rss}, "
+                  f"reejecución {resultado['reejecucion_segundos']} s")
+            for etapa, segundos in resultado["etapas"].items():
+                print(f"   {segundos:8.3f} s  {etapa}")
+
+    informe = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "maquina": {
+            "plataforma": platform.platform(),
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            "psutil": psutil is not None,
+        },
+        "parametros": parametros,
+        "resultados": resultados,
+    }
+    with open(salida, "w", encoding="utf-8") as fh:
+        json.dump(informe, fh, ensure_ascii=False, indent=2)
+    print(f"\n✅ Resultados en {salida}")
+
+
+if __name__ == "__main__":
+    main()
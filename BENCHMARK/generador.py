@@ -0,0 +1,251 @@
+"""Generador de exportaciones crudas sintéticas del ERP para los dos pipelines.
+
+Los libros tienen el mismo formato que bajan los contadores: bloque de encabezado arriba
+(A1 título, A2 "EMPRESA NIT ...", A4 con las fechas del periodo), la tabla desde la fila 8
+en BALANCE DETALLADO y desde la fila 6 en INFORME BANCOS, filas de subtotal sin tercero y
+fila de TOTALES al final. Con la misma semilla (y el mismo mes de corte) se generan
+exactamente los mismos datos.
+
+Uso:
+    python generador.py --empresas 5 --meses 3 --filas-balance 2000 --filas-bancos 30
+"""
+import argparse
+import calendar
+import random
+from datetime import date
+from pathlib import Path
+
+from openpyxl import Workbook, load_workbook
+
+from path_utils import BASE_DIR, PIPELINES
+
+# Carpeta por defecto de los datos generados (nunca DOCUMENTOS ni SALDO BANCOS reales)
+DATOS_DIR = BASE_DIR / "datos"
+
+BANCOS = [
+    "BANCO DE OCCIDENTE", "BANCOLOMBIA", "BANCO DE BOGOTA", "DAVIVIENDA",
+    "BBVA COLOMBIA", "ACCION FIDUCIARIA", "FIDUCIARIA BOGOTA",
+]
+
+# Cuentas PUC de 6 dígitos: se completan a 8 con un auxiliar. Incluye los prefijos de
+# categorias_puc.json y cuentas "OTRAS CXP" que usa remplazar.py
+CUENTAS = [
+    ("111005", "CTA CTE {banco}"),
+    ("112005", "CTA AHORROS {banco}"),
+    ("130505", "CLIENTES NACIONALES"),
+    ("133005", "ANTICIPOS A PROVEEDORES"),
+    ("137095", "OTROS PRESTAMOS A VINCULADOS"),
+    ("189595", "OTROS DEUDORES VARIOS"),
+    ("220505", "PROVEEDORES NACIONALES"),
+    ("233595", "OTRAS CXP COSTOS Y GASTOS"),
+    ("236540", "RETENCION EN LA FUENTE"),
+    ("236075", "DIVIDENDOS POR PAGAR"),
+    ("239995", "OTRAS CXP VINCULADOS"),
+    ("281505", "INGRESOS RECIBIDOS PARA TERCEROS"),
+    ("371005", "UTILIDADES ACUMULADAS"),
+    ("413595", "INGRESOS OPERACIONALES"),
+    ("513595", "GASTOS DE ADMINISTRACION"),
+]
+
+NOMBRES = ["ALVAREZ", "BENITEZ", "CARDENAS", "DIAZ", "ESCOBAR", "FORERO", "GOMEZ", "HERRERA",
+           "IBARRA", "JIMENEZ", "LOPEZ", "MARTINEZ", "NIETO", "ORTIZ", "PEREZ", "QUINTERO",
+           "RAMIREZ", "SUAREZ", "TORRES", "URIBE", "VARGAS", "ZAPATA"]
+RAZONES = ["SERVICIOS", "INGENIERIA", "SUMINISTROS", "CONSTRUCCIONES", "TRANSPORTES",
+           "ILUMINACION", "INVERSIONES", "SOLUCIONES", "MONTAJES", "ELECTRICOS"]
+
+# Columnas de la exportación de saldos bancarios (estandar.py agrega las que falten)
+COLUMNAS_MOVIMIENTO = [
+    "ABR - Notas contables", "Ajustes y Reclasificaciones", "CE CHEQUES", "CE TRANSF",
+    "Comprobante de Egreso", "Comprobante de Ingreso", "Cuenta Por Pagar",
+    "Documento de Cartera Reversado", "Gastos Bancarios", "GASTOS BANCARIOS AUTOMATICOS",
+    "Legalizacion de anticipos", "Prestamos", "Traslado de Fondos",
+]
+
+# Formas de encabezado que estandar.py resuelve al normalizar (tildes, mayúsculas, espacios)
+VARIANTES_BANCOS = {
+    " Saldo Inicial": "Saldo Inicial",
+    "Legalizacion de anticipos": "Legalización de anticipos",
+    "Prestamos": "Préstamos",
+    "Cheques x Ent": "CHEQUES X ENT",
+}
+
+# Columna que no está en esquema_bancos.json: el motor debe pasar el archivo a _cuarentena
+COLUMNA_NO_REGISTRADA = "Otros Documentos"
+
+
+def _fin_de_mes(anio, mes):
+    return date(anio, mes, calendar.monthrange(anio, mes)[1])
+
+
+def cortes(meses, hasta=None):
+    """Lista de (fecha inicial, fecha final) de los últimos `meses` meses cerrados."""
+    hasta = hasta or date.today()
+    anio, mes = hasta.year, hasta.month
+    resultado = []
+    for _ in range(meses):
+        mes -= 1
+        if mes == 0:
+            anio, mes = anio - 1, 12
+        resultado.append((date(anio, mes, 1), _fin_de_mes(anio, mes)))
+    return list(reversed(resultado))
+
+
+def empresas_sinteticas(cantidad, rng):
+    """Lista de (nombre, nit) de empresas del grupo."""
+    empresas = []
+    for i in range(cantidad):
+        nombre = f"{rng.choice(RAZONES)} {rng.choice(NOMBRES)} {i + 1:02d} S.A.S"
+        empresas.append((nombre, str(900000000 + rng.randrange(1, 99999999))))
+    return empresas
+
+
+def _terceros(cantidad, empresas, rng):
+    """Terceros del balance; incluye las otras empresas del grupo (saldos intercompañía)."""
+    terceros = [(nit, nombre) for nombre, nit in empresas]
+    for _ in range(cantidad):
+        if rng.random() < 0.5:
+            nombre = f"{rng.choice(NOMBRES)} {rng.choice(NOMBRES)} {rng.choice(NOMBRES)}"
+            nit = str(rng.randrange(10000000, 1099999999))
+        else:
+            nombre = f"{rng.choice(RAZONES)} {rng.choice(NOMBRES)} SAS"
+            nit = str(rng.randrange(800000000, 901999999))
+        terceros.append((nit, nombre))
+    return terceros
+
+
+def _digito(nit):
+    return sum(int(d) for d in nit) % 10
+
+
+def _periodo(fecha_inicial, fecha_final):
+    return f"{fecha_inicial:%d/%m/%Y}", f"{fecha_final:%d/%m/%Y}"
+
+
+def generar_balance(ruta, empresa, nit, fecha_inicial, fecha_final, filas, terceros, rng):
+    """Exportación cruda de BALANCE DETALLADO con ~`filas` filas de tercero."""
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    inicio, fin = _periodo(fecha_inicial, fecha_final)
+    ws.append(["BALANCE DE PRUEBA POR TERCERO"])
+    ws.append([f"{empresa} NIT {nit}-{_digito(nit)}"])
+    ws.append([])
+    ws.append([f"Periodo {inicio} - {fin}"])
+    ws.append([])
+    ws.append([])
+    ws.append([])
+    ws.append(["Cuenta contable", "Cuenta contable nombre", "No. Identificación", "Tercero",
+               "Saldo anterior", "Débitos", "Créditos", "Saldo final"])
+    escritas = 0
+    while escritas < filas:
+        prefijo, plantilla = rng.choice(CUENTAS)
+        cuenta = int(f"{prefijo}{rng.randrange(1, 99):02d}")
+        nombre = plantilla.format(banco=f"{rng.randrange(10**8, 10**9)} {rng.choice(BANCOS)}")
+        grupo = min(rng.randrange(1, 40), filas - escritas)
+        # Subtotal de la cuenta: sin tercero (filtros.py lo descarta)
+        ws.append([cuenta, nombre, None, None, None, None, None, round(rng.uniform(-1e9, 1e9), 2)])
+        for _ in range(grupo):
+            tercero_nit, tercero = rng.choice(terceros)
+            anterior = round(rng.uniform(-5e8, 5e8), 2)
+            debitos = round(rng.uniform(0, 1e8), 2) if rng.random() < 0.6 else 0
+            creditos = round(rng.uniform(0, 1e8), 2) if rng.random() < 0.6 else 0
+            ws.append([cuenta, nombre, int(tercero_nit), tercero, anterior, debitos, creditos,
+                       round(anterior + debitos - creditos, 2)])
+        escritas += grupo
+    wb.save(ruta)
+
+
+def generar_bancos(ruta, empresa, nit, fecha_inicial, fecha_final, cuentas, rng):
+    """Exportación cruda de SALDO BANCOS con `cuentas` cuentas bancarias."""
+    # El ERP omite columnas sin movimiento, a veces cambia la forma de los encabezados y
+    # rara vez agrega una columna nueva (cambio de esquema)
+    movimientos = [c for c in COLUMNAS_MOVIMIENTO if rng.random() < 0.85]
+    extra = [COLUMNA_NO_REGISTRADA] if rng.random() < 0.05 else []
+    columnas = ["Cuenta", " Saldo Inicial", *movimientos, *extra, "Saldo Libros", "Cheques x Ent", "Saldo Bancos"]
+    if rng.random() < 0.2:
+        columnas = [VARIANTES_BANCOS.get(c, c) for c in columnas]
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    inicio, fin = _periodo(fecha_inicial, fecha_final)
+    ws.append(["SALDOS BANCOS"])
+    ws.append([f"{empresa} NIT {nit}-{_digito(nit)}"])
+    ws.append([])
+    ws.append([f"Fecha Inicial: {inicio} Fecha Final: {fin}"])
+    ws.append([])
+    ws.append(columnas)
+    totales = [0.0] * (len(columnas) - 1)
+    for _ in range(cuentas):
+        tipo = rng.choice(["AHO", "COR"])
+        cuenta = f"{rng.choice(BANCOS)} {tipo} {rng.randrange(10**9, 10**10)} {rng.choice(RAZONES)}"
+        inicial = round(rng.uniform(0, 5e9), 2)
+        valores = [round(rng.uniform(-5e7, 5e7), 2) if rng.random() < 0.3 else None
+                   for _ in movimientos + extra]
+        libros = round(inicial + sum(v for v in valores if v is not None), 2)
+        cheques = round(rng.uniform(0, 1e6), 2) if rng.random() < 0.1 else 0
+        fila = [inicial, *valores, libros, cheques, round(libros - cheques, 2)]
+        totales = [t + (v or 0) for t, v in zip(totales, fila)]
+        ws.append([cuenta, *fila])
+    ws.append(["TOTALES", *[round(t, 2) for t in totales]])
+    wb.save(ruta)
+
+
+def con_columna_no_registrada(rutas):
+    """Exportaciones de SALDO BANCOS que traen COLUMNA_NO_REGISTRADA en el encabezado."""
+    resultado = []
+    for ruta in rutas:
+        wb = load_workbook(ruta, read_only=True)
+        try:
+            # Fila 6: encabezado de la tabla (después de título, empresa y periodo)
+            encabezado = next(wb.active.iter_rows(min_row=6, max_row=6, values_only=True), ())
+        finally:
+            wb.close()
+        if COLUMNA_NO_REGISTRADA in encabezado:
+            resultado.append(ruta)
+    return resultado
+
+
+def generar(destino, pipeline, empresas=5, meses=3, filas_balance=2000, filas_bancos=30,
+            semilla=1, hasta=None):
+    """Genera las exportaciones crudas de un pipeline en `destino`. Retorna las rutas."""
+    if pipeline not in PIPELINES:
+        raise ValueError(f"Pipeline desconocido: {pipeline}")
+    destino = Path(destino)
+    destino.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(f"{semilla}-{pipeline}")
+    grupo = empresas_sinteticas(empresas, random.Random(semilla))
+    terceros = _terceros(max(20, filas_balance // 10), grupo, rng)
+
+    rutas = []
+    for fecha_inicial, fecha_final in cortes(meses, hasta):
+        for empresa, nit in grupo:
+            # Nombre de descarga del ERP; rename.py lo cambia por "EMPRESA - dd-mm-aaaa.xlsx"
+            ruta = destino / f"export_{len(rutas) + 1:04d}.xlsx"
+            if pipeline == "BALANCE DETALLADO":
+                generar_balance(ruta, empresa, nit, fecha_inicial, fecha_final, filas_balance, terceros, rng)
+            else:
+                generar_bancos(ruta, empresa, nit, fecha_inicial, fecha_final, filas_bancos, rng)
+            rutas.append(ruta)
+    return rutas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera exportaciones crudas sintéticas del ERP")
+    parser.add_argument("--destino", type=Path, default=DATOS_DIR,
+                        help="Carpeta de salida (se crea una subcarpeta por pipeline)")
+    parser.add_argument("--pipeline", choices=list(PIPELINES), action="append",
+                        help="Pipeline a generar (por defecto ambos)")
+    parser.add_argument("--empresas", type=int, default=5)
+    parser.add_argument("--meses", type=int, default=3, help="Cortes mensuales por empresa")
+    parser.add_argument("--filas-balance", type=int, default=2000, help="Filas de tercero por balance")
+    parser.add_argument("--filas-bancos", type=int, default=30, help="Cuentas bancarias por archivo")
+    parser.add_argument("--semilla", type=int, default=1)
+    args = parser.parse_args()
+
+    for pipeline in args.pipeline or list(PIPELINES):
+        rutas = generar(args.destino / pipeline, pipeline, args.empresas, args.meses,
+                        args.filas_balance, args.filas_bancos, args.semilla)
+        print(f"✅ {pipeline}: {len(rutas)} archivos en {args.destino / pipeline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+import sys
+from pathlib import Path
+
+# Directorio base (carpeta donde están los scripts)
+BASE_DIR = Path(__file__).resolve().parent
+
+# Raíz del proyecto: carpetas de los pipelines y módulos compartidos de COMUN
+ROOT_DIR = BASE_DIR.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.append(str(ROOT_DIR))
+
+# Pipelines que se miden: carpeta → subcarpeta de entrada
+PIPELINES = {
+    "BALANCE DETALLADO": "DOCUMENTOS",
+    "INFORME BANCOS": "SALDO BANCOS",
+}
+
+# Resultados de cada corrida del benchmark (un JSON por corrida)
+RESULTADOS_DIR = BASE_DIR / "resultados"
@@ -0,0 +1,262 @@
+"""Escrituras atómicas y marcador de generación de las carpetas de datos.
+
+Todas las escrituras del pipeline (los .xlsx, las copias columnares, el manifiesto y los
+JSON auxiliares) pasan por `reemplazar`: el contenido se escribe en un temporal oculto de
+la misma carpeta (".<nombre>.<pid>.tmp", que no coincide con '*.xlsx'), se fuerza al disco
+con fsync y se cambia por el archivo final con os.replace. Quien lea la carpeta al mismo
+tiempo (GRAFICOS) ve el libro anterior completo o el nuevo completo, nunca uno a medias.
+
+Además cada carpeta tiene un marcador `_generacion.json`:
+
+- {"generacion": n, "en_curso": true} mientras un pipeline está escribiendo;
+- al terminar, la generación sube a n + 1 y en_curso vuelve a false.
+
+Mientras escribe, el pipeline tiene tomado el bloqueo "._generacion.json.lock"; si el
+proceso muere a mitad de camino el marcador queda en true, pero el bloqueo se suelta y los
+lectores dan la escritura por terminada.
+
+Los lectores usan `cargar_consistente`: esperan (con un límite) a que termine una escritura
+en curso y, si la generación cambió mientras leían, vuelven a cargar para no mezclar
+archivos de dos ejecuciones distintas.
+"""
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+MARCADOR = "_generacion.json"
+
+# En Windows os.replace falla si otro proceso tiene abierto el destino en ese instante
+# (p. ej. el dashboard leyéndolo): se reintenta unas veces antes de dar el error
+_REINTENTOS = 10
+_PAUSA = 0.2
+
+
+def _fsync_carpeta(carpeta):
+    """Persiste la entrada del directorio tras el rename (no aplica en Windows)."""
+    if sys.platform.startswith("win"):
+        return
+    try:
+        fd = os.open(str(carpeta), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _reemplazar(temporal, ruta):
+    for intento in range(_REINTENTOS):
+        try:
+            os.replace(temporal, ruta)
+            return
+        except PermissionError:
+            if intento == _REINTENTOS - 1:
+                raise
+            time.sleep(_PAUSA)
+
+
+def temporal_de(ruta):
+    """Ruta del temporal oculto con el que se escribe `ruta`."""
+    ruta = Path(ruta)
+    return ruta.with_name(f".{ruta.name}.{os.getpid()}.tmp")
+
+
+def confirmar(temporal, ruta):
+    """fsync del temporal y reemplazo atómico del archivo final."""
+    with open(temporal, "rb+") as fh:
+        os.fsync(fh.fileno())
+    _reemplazar(temporal, ruta)
+    _fsync_carpeta(Path(ruta).parent)
+
+
+def descartar(temporal):
+    """Borra el temporal si quedó (escritura fallida o ya confirmada)."""
+    try:
+        Path(temporal).unlink()
+    except OSError:
+        pass
+
+
+@contextmanager
+def reemplazar(ruta):
+    """Entrega la ruta de un temporal; al salir sin error lo cambia atómicamente por `ruta`.
+    Si el bloque falla, el temporal se borra y `ruta` queda como estaba."""
+    temporal = temporal_de(ruta)
+    try:
+        yield temporal
+        confirmar(temporal, ruta)
+    finally:
+        if temporal.exists():
+            descartar(temporal)
+
+
+def escribir_json(ruta, datos):
+    """json.dump atómico (indentado, sin escapar acentos)."""
+    with reemplazar(ruta) as temporal:
+        with open(temporal, "w", encoding="utf-8") as fh:
+            json.dump(datos, fh, ensure_ascii=False, indent=2)
+
+
+def _ruta_bloqueo(ruta):
+    ruta = Path(ruta)
+    return ruta.with_name(f".{ruta.name}.lock")
+
+
+def _tomar(fh, esperar=True):
+    """Bloqueo exclusivo sobre el archivo abierto `fh`. Con esperar=False no espera: retorna
+    False si otro proceso lo tiene."""
+    if sys.platform.startswith("win"):
+        import msvcrt
+        fh.seek(0)
+        while True:
+            try:
+                # LK_LOCK reintenta unos segundos y falla: se vuelve a intentar
+                msvcrt.locking(fh.fileno(), msvcrt.LK_LOCK if esperar else msvcrt.LK_NBLCK, 1)
+                return True
+            except OSError:
+                if not esperar:
+                    return False
+                time.sleep(_PAUSA)
+    import fcntl
+    try:
+        fcntl.flock(fh.fileno(), fcntl.LOCK_EX if esperar else fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return False
+    return True
+
+
+def _soltar(fh):
+    if sys.platform.startswith("win"):
+        import msvcrt
+        fh.seek(0)
+        msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        import fcntl
+        fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+
+
+@contextmanager
+def bloqueo(ruta):
+    """Bloqueo exclusivo entre procesos para leer-modificar-escribir `ruta` (p. ej. un índice
+    que actualizan varios procesos del pool). Usa un archivo oculto ".<nombre>.lock" al lado."""
+    fh = open(_ruta_bloqueo(ruta), "a+b")
+    try:
+        _tomar(fh)
+        try:
+            yield
+        finally:
+            _soltar(fh)
+    finally:
+        fh.close()
+
+
+# ------------------------------------------------------------ generación
+
+def _escritor_vivo(carpeta):
+    """True si algún proceso tiene tomado el bloqueo de escritura de la carpeta. Un pipeline
+    que murió (kill, corte de luz) lo suelta con el proceso aunque el marcador diga en_curso."""
+    ruta = _ruta_bloqueo(Path(carpeta) / MARCADOR)
+    try:
+        fh = open(ruta, "rb+")
+    except OSError:
+        return False  # nadie ha escrito la carpeta con bloqueo
+    try:
+        if not _tomar(fh, esperar=False):
+            return True
+        _soltar(fh)
+        return False
+    finally:
+        fh.close()
+
+
+def leer_generacion(carpeta):
+    """(generación, en_curso) de la carpeta; (0, False) si aún no tiene marcador. en_curso
+    solo es True si el proceso que marcó la escritura sigue vivo."""
+    try:
+        with open(Path(carpeta) / MARCADOR, "r", encoding="utf-8") as fh:
+            datos = json.load(fh)
+        generacion, en_curso = int(datos.get("generacion", 0)), bool(datos.get("en_curso", False))
+    except (OSError, ValueError):
+        return 0, False
+    return generacion, en_curso and _escritor_vivo(carpeta)
+
+
+def _marcar(carpeta, generacion, en_curso):
+    escribir_json(Path(carpeta) / MARCADOR, {
+        "generacion": generacion,
+        "en_curso": en_curso,
+        "pid": os.getpid(),
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+    })
+
+
+@contextmanager
+def escritura(carpeta):
+    """Marca la carpeta como en escritura durante el bloque y publica una generación nueva
+    al terminar (también si el bloque falla: lo que alcanzó a escribirse ya es visible).
+    Durante el bloque el proceso tiene el bloqueo ".<marcador>.lock": si muere sin cerrar la
+    generación, los lectores no lo siguen esperando (el pid del marcador queda solo como
+    diagnóstico)."""
+    generacion, _ = leer_generacion(carpeta)
+    fh = None
+    try:
+        fh = open(_ruta_bloqueo(Path(carpeta) / MARCADOR), "a+b")
+        # Un lector lo toma solo un instante para ver si hay escritor; si sigue tomado es que
+        # otro pipeline escribe la carpeta, y su bloqueo basta para los lectores
+        for _ in range(_REINTENTOS):
+            if _tomar(fh, esperar=False):
+                break
+            time.sleep(_PAUSA)
+        else:
+            fh.close()
+            fh = None
+        _marcar(carpeta, generacion, True)
+    except OSError as e:
+        print(f"⚠️ No se pudo actualizar {MARCADOR}: {e}")
+    try:
+        yield
+    finally:
+        try:
+            _marcar(carpeta, generacion + 1, False)
+        except OSError as e:
+            print(f"⚠️ No se pudo actualizar {MARCADOR}: {e}")
+        if fh is not None:
+            _soltar(fh)
+            fh.close()
+
+
+def _esperar_escritura(carpeta, limite):
+    """Espera hasta `limite` (time.monotonic) a que la carpeta no esté en escritura.
+    Retorna (generación, en_curso) al salir."""
+    generacion, en_curso = leer_generacion(carpeta)
+    while en_curso and time.monotonic() < limite:
+        time.sleep(_PAUSA)
+        generacion, en_curso = leer_generacion(carpeta)
+    return generacion, en_curso
+
+
+def cargar_consistente(carpeta, cargar, intentos=3, espera=10.0):
+    """Ejecuta `cargar()` con la carpeta fuera de escritura y repite si la generación cambió
+    mientras leía. Si un pipeline está escribiendo se espera hasta `espera` segundos en
+    total; agotados el tiempo o los intentos se avisa y se retorna la última lectura."""
+    limite = time.monotonic() + espera
+    antes, en_curso = _esperar_escritura(carpeta, limite)
+    for _ in range(intentos):
+        resultado = cargar()
+        despues, escribiendo = leer_generacion(carpeta)
+        if despues == antes and not (en_curso or escribiendo):
+            return resultado
+        antes, en_curso = _esperar_escritura(carpeta, limite)
+        if en_curso:
+            # La escritura no terminó dentro del límite: releer no cambia nada
+            break
+    print(f"⚠️ {Path(carpeta).name}: se leyó mientras un pipeline escribía la carpeta "
+          f"(generación {antes}); los datos pueden mezclar dos ejecuciones.")
+    return resultado
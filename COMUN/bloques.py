@@ -0,0 +1,56 @@
+"""Lectura por bloques de filas de los libros de entrada (modo por bloques de los motores).
+
+`leer_bloques` recorre la hoja con openpyxl en modo read-only (streaming) y entrega
+DataFrames de a `filas` filas. Cada bloque pasa por el mismo TextParser que usa
+pd.read_excel, así que los nombres de columna ("Unnamed: i", "X.1"), las celdas vacías
+(NaN), las filas vacías (se omiten), los textos numéricos y `dtype=str` quedan igual que
+al leer el libro completo. Los tipos se infieren por bloque: una columna con enteros y
+celdas vacías puede quedar int64 en un bloque y float64 en otro (los valores son los
+mismos, y las etapas que leen con dtype=str no notan la diferencia).
+
+La memoria de la lectura depende del tamaño del bloque, no del archivo.
+"""
+from pandas.io.parsers import TextParser
+from openpyxl import load_workbook
+
+FILAS_BLOQUE = 50000
+
+
+def _celda(v):
+    # Igual que el lector openpyxl de pandas: vacías como "", enteros guardados como float a int
+    if v is None:
+        return ""
+    if isinstance(v, float) and v.is_integer():
+        return int(v)
+    return v
+
+
+def _armar(encabezado, filas, dtype):
+    return TextParser([encabezado, *filas], header=0, dtype=dtype).read()
+
+
+def leer_bloques(ruta, fila_encabezado=0, filas=FILAS_BLOQUE, dtype=None):
+    """Genera DataFrames de hasta `filas` filas (al menos uno, aunque la hoja no tenga datos).
+    `fila_encabezado` es base 0 y `dtype` se pasa tal cual, como en pd.read_excel."""
+    libro = load_workbook(ruta, read_only=True, data_only=True)
+    try:
+        hoja = libro.active
+        recorrido = hoja.iter_rows(min_row=fila_encabezado + 1, values_only=True)
+        encabezado = [_celda(v) for v in next(recorrido, None) or ()]
+        # pandas descarta las celdas vacías al final de cada fila
+        while encabezado and encabezado[-1] == "":
+            encabezado.pop()
+        ancho = len(encabezado)
+        bloque, emitidos = [], 0
+        for fila in recorrido:
+            valores = [_celda(v) for v in fila[:ancho]]
+            valores += [""] * (ancho - len(valores))
+            bloque.append(valores)
+            if len(bloque) >= filas:
+                yield _armar(encabezado, bloque, dtype)
+                emitidos += 1
+                bloque = []
+        if bloque or not emitidos:
+            yield _armar(encabezado, bloque, dtype)
+    finally:
+        libro.close()
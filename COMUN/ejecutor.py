@@ -0,0 +1,387 @@
+"""Ejecutor común de los motores: etapas por archivo declaradas como un grafo (DAG).
+
+Cada motor declara sus etapas con `Etapa` (qué función aplica, de qué etapas depende, con
+qué tipos recibe el DataFrame) y el ejecutor:
+
+- ordena el grafo (orden topológico; falla si hay ciclos o dependencias desconocidas);
+- calcula las etapas pendientes de cada archivo con el manifiesto: una etapa está
+  pendiente si el manifiesto lo dice o si lo está alguna de las etapas de las que depende;
+- lee el libro una vez, aplica en memoria las pendientes, lo escribe una sola vez y
+  luego aplica las etapas posteriores a la escritura (p. ej. la carga en la base);
+- si una etapa falla, no sigue con ese archivo: el proceso principal lo mueve a la
+  carpeta de cuarentena con un .error.txt al lado y el resto del lote continúa.
+
+`procesar_archivo_por_bloques` hace lo mismo de a bloques de filas (lectura en streaming,
+etapas por_filas sobre cada bloque, escritura en streaming): la memoria queda acotada por
+el tamaño del bloque y no por el del archivo.
+
+El avance por archivo y por etapa queda en el manifiesto, así que la siguiente ejecución
+solo retoma lo pendiente. `procesar_archivo` no toca el manifiesto ni el informe: se puede
+ejecutar en un proceso del pool y devolver su Resultado al proceso principal.
+"""
+import contextlib
+import io
+import os
+import shutil
+import time
+import warnings
+from collections import namedtuple
+from datetime import datetime
+from pathlib import Path
+
+from COMUN import staging
+from COMUN.escritor import guardar_excel, EscritorBloques
+from COMUN.informe import medicion, tamano
+from COMUN.tipos_excel import como_releido, como_texto
+
+# entrada: "releido" (tipos de pd.read_excel) o "texto" (dtype=str)
+# requiere_guion: solo aplica a archivos con nombre "EMPRESA - fecha"; en los demás se marca
+#   como aplicada sin tocarlos (como hacían los scripts)
+# modifica: la etapa siempre reescribe el archivo aunque su resultado no cambie (decimales)
+# posterior: se aplica después de escribir el archivo y no lo modifica (p. ej. base_datos)
+# por_filas: el resultado de cada fila depende solo de esa fila (y de estado externo, como el
+#   registro de terceros): la etapa se puede aplicar por bloques de filas
+Etapa = namedtuple(
+    "Etapa", "nombre procesar depende_de entrada requiere_guion modifica posterior por_filas",
+    defaults=((), "releido", False, False, False, False),
+)
+
+# Resultado de procesar un archivo. error es (etapa, mensaje) o None;
+# cuarentena indica si el error es del contenido del archivo (no de la escritura)
+Resultado = namedtuple("Resultado", "log aplicadas mediciones error cuarentena")
+
+CONVERSIONES = {"releido": como_releido, "texto": como_texto}
+
+
+def ordenar(etapas):
+    """Orden topológico del grafo; entre etapas listas se respeta el orden declarado."""
+    por_nombre = {e.nombre: e for e in etapas}
+    for e in etapas:
+        for dependencia in e.depende_de:
+            if dependencia not in por_nombre:
+                raise ValueError(f"La etapa '{e.nombre}' depende de '{dependencia}', que no está declarada")
+    ordenadas, hechas = [], set()
+    while len(ordenadas) < len(etapas):
+        listas = [e for e in etapas if e.nombre not in hechas and all(d in hechas for d in e.depende_de)]
+        if not listas:
+            ciclo = [e.nombre for e in etapas if e.nombre not in hechas]
+            raise ValueError(f"Las etapas {ciclo} forman un ciclo")
+        ordenadas.append(listas[0])
+        hechas.add(listas[0].nombre)
+    return ordenadas
+
+
+def pendientes(manifiesto, ruta, etapas):
+    """Nombres de las etapas pendientes del archivo (con sus dependientes), en orden."""
+    resultado = set()
+    for e in etapas:
+        if manifiesto.pendiente(ruta, e.nombre) or any(d in resultado for d in e.depende_de):
+            resultado.add(e.nombre)
+    return [e.nombre for e in etapas if e.nombre in resultado]
+
+
+def es_temporal(nombre):
+    """Archivos de bloqueo que deja Excel mientras un libro está abierto ("~$archivo.xlsx")."""
+    return nombre.startswith("~$")
+
+
+def archivos(carpeta):
+    """Libros de la carpeta (sin subcarpetas ni archivos de bloqueo de Excel)."""
+    return [f for f in Path(carpeta).glob('*.xlsx') if not es_temporal(f.name)]
+
+
+def por_procesar(rutas, manifiesto, etapas, patron_final):
+    """Rutas que aún tienen trabajo: sin nombre final (falta rename) o con etapas pendientes."""
+    resultado = []
+    for ruta in rutas:
+        if not Path(ruta).exists():
+            continue
+        if not patron_final.match(Path(ruta).name) or pendientes(manifiesto, ruta, etapas):
+            resultado.append(ruta)
+    return resultado
+
+
+def _aviso(emitidos):
+    """Texto de los warnings capturados durante una etapa (None si no hubo)."""
+    return "; ".join(dict.fromkeys(str(w.message) for w in emitidos)) or None
+
+
+def _aplicar(etapa, df, archivo, argumentos, mediciones):
+    """Aplica una etapa. Retorna (df, aplicada); las excepciones suben al llamador."""
+    entrada = CONVERSIONES[etapa.entrada](df)
+    inicio = time.perf_counter()
+    # Los warnings que emite la etapa quedan como aviso en su medición (informe de ejecución)
+    with warnings.catch_warnings(record=True) as emitidos:
+        warnings.simplefilter("always")
+        try:
+            resultado = etapa.procesar(entrada.copy(), archivo, *argumentos.get(etapa.nombre, ()))
+        except Exception as e:
+            mediciones.append(medicion(etapa.nombre, archivo, time.perf_counter() - inicio,
+                                       len(entrada), error=str(e), aviso=_aviso(emitidos)))
+            raise
+    aviso = _aviso(emitidos)
+    if aviso:
+        print(f"⚠️ {aviso}")
+    if etapa.posterior:
+        filas = resultado if isinstance(resultado, int) else len(entrada)
+        mediciones.append(medicion(etapa.nombre, archivo, time.perf_counter() - inicio, len(entrada), filas,
+                                   aviso=aviso))
+        return df, resultado is not None
+    filas_salida = len(resultado) if resultado is not None else len(entrada)
+    mediciones.append(medicion(etapa.nombre, archivo, time.perf_counter() - inicio, len(entrada), filas_salida,
+                               aviso=aviso))
+    if resultado is None:
+        # No aplica: el DataFrame sigue igual (como si el script no escribiera)
+        return entrada, False
+    return resultado, True
+
+
+def _procesar(ruta, etapas, pendientes_archivo, leer, argumentos, mediciones):
+    archivo = os.path.basename(ruta)
+    aplicadas = []
+    inicio = time.perf_counter()
+    try:
+        df, ya_limpio = leer(str(ruta))
+    except Exception as e:
+        print(f"Error procesando '{archivo}': {e}")
+        mediciones.append(medicion("lectura", archivo, time.perf_counter() - inicio,
+                                   bytes_leidos=tamano(ruta), error=str(e)))
+        return aplicadas, ("lectura", str(e)), True
+    mediciones.append(medicion("lectura", archivo, time.perf_counter() - inicio,
+                               filas_salida=len(df), bytes_leidos=tamano(ruta)))
+
+    modificado = False
+    for etapa in etapas:
+        if etapa.nombre not in pendientes_archivo or etapa.posterior:
+            continue
+        if etapa.procesar is None:
+            # clean: la lectura ya ubicó el encabezado
+            modificado = not ya_limpio
+            if ya_limpio:
+                print(f"'{archivo}' ya tiene 'Cuenta' en A1. Se deja sin modificar.")
+            else:
+                print(f"Encabezado actualizado en: {archivo}")
+        elif not etapa.requiere_guion or " - " in archivo:
+            try:
+                df, aplicada = _aplicar(etapa, df, archivo, argumentos, mediciones)
+            except Exception as e:
+                print(f"Error procesando {archivo} en {etapa.nombre}: {e}")
+                return [], (etapa.nombre, str(e)), True
+            modificado = modificado or aplicada or etapa.modifica
+        aplicadas.append(etapa.nombre)
+
+    if modificado:
+        inicio = time.perf_counter()
+        try:
+            guardar_excel(df, str(ruta))
+            # Con --staging, copia columnar de la salida final para GRAFICOS
+            staging.guardar_copia(df, ruta, publicado=True)
+            print(f"✅ Guardado: {archivo}")
+        except Exception as e:
+            # Error de escritura (p. ej. el libro está abierto en Excel): se reintenta en la
+            # siguiente ejecución, el archivo no va a cuarentena
+            print(f"❌ Error guardando {archivo}: {e}")
+            mediciones.append(medicion("escritura", archivo, time.perf_counter() - inicio,
+                                       len(df), error=str(e)))
+            return [], ("escritura", str(e)), False
+        mediciones.append(medicion("escritura", archivo, time.perf_counter() - inicio,
+                                   len(df), len(df), bytes_escritos=tamano(ruta)))
+
+    for etapa in etapas:
+        if etapa.nombre not in pendientes_archivo or not etapa.posterior:
+            continue
+        if not etapa.requiere_guion or " - " in archivo:
+            try:
+                _aplicar(etapa, df, archivo, argumentos, mediciones)
+            except Exception as e:
+                # El archivo ya quedó escrito: se registra lo anterior y la etapa se reintenta
+                print(f"Error procesando {archivo} en {etapa.nombre}: {e}")
+                return aplicadas, (etapa.nombre, str(e)), False
+        aplicadas.append(etapa.nombre)
+    return aplicadas, None, False
+
+
+def procesar_archivo(ruta, etapas, pendientes_archivo, leer, argumentos=None, capturar=False):
+    """Lee el archivo una vez, aplica las etapas pendientes, lo escribe y aplica las posteriores.
+    `argumentos` es {etapa: tupla de argumentos extra de su procesar}. Con capturar=True
+    el log se devuelve en el Resultado en vez de imprimirse (tareas del pool)."""
+    mediciones = []
+    salida = io.StringIO()
+    with contextlib.redirect_stdout(salida) if capturar else contextlib.nullcontext():
+        aplicadas, error, cuarentena = _procesar(ruta, etapas, pendientes_archivo, leer,
+                                                 argumentos or {}, mediciones)
+    return Resultado(salida.getvalue(), aplicadas, mediciones, error, cuarentena)
+
+
+def _acumular(acumuladas, mediciones):
+    """Suma las mediciones de un bloque a las del archivo (una por etapa)."""
+    for med in mediciones:
+        total = acumuladas.get(med["etapa"])
+        if total is None:
+            acumuladas[med["etapa"]] = dict(med)
+            continue
+        total["segundos"] = round(total["segundos"] + med["segundos"], 4)
+        for campo in ("filas_entrada", "filas_salida", "bytes_leidos", "bytes_escritos"):
+            if med[campo] is not None:
+                total[campo] = (total[campo] or 0) + med[campo]
+        total["error"] = total["error"] or med["error"]
+        total["aviso"] = total.get("aviso") or med.get("aviso")
+
+
+def _terminar_argumentos(argumentos, archivo, completo):
+    """Avisa el fin del archivo a los argumentos con estado por archivo (p. ej. una
+    transacción abierta entre bloques)."""
+    for extra in argumentos.values():
+        for argumento in extra:
+            if hasattr(argumento, "terminar"):
+                argumento.terminar(archivo, completo)
+
+
+def _procesar_bloques(ruta, etapas, pendientes_archivo, leer_bloques, argumentos, acumuladas):
+    archivo = os.path.basename(ruta)
+    activas = [e for e in etapas if e.nombre in pendientes_archivo]
+    previas = [e for e in activas if not e.posterior]
+    posteriores = [e for e in activas if e.posterior]
+    escritor = None
+    modificado = None
+    error_posterior = None
+    silencio = io.StringIO()
+
+    inicio = time.perf_counter()
+    try:
+        bloques, ya_limpio = leer_bloques(str(ruta))
+        for n, df in enumerate(bloques):
+            filas_leidas = len(df)
+            mediciones = [medicion("lectura", archivo, time.perf_counter() - inicio, filas_salida=filas_leidas,
+                                   bytes_leidos=tamano(ruta) if n == 0 else 0)]
+            # Los mensajes de las etapas se muestran una vez por archivo, no una por bloque
+            with contextlib.redirect_stdout(silencio) if n else contextlib.nullcontext():
+                aplicada_alguna = False
+                for etapa in previas:
+                    if etapa.procesar is None:
+                        if n == 0:
+                            if ya_limpio:
+                                print(f"'{archivo}' ya tiene 'Cuenta' en A1. Se deja sin modificar.")
+                            else:
+                                print(f"Encabezado actualizado en: {archivo}")
+                        aplicada_alguna = aplicada_alguna or not ya_limpio
+                    elif not etapa.requiere_guion or " - " in archivo:
+                        try:
+                            df, aplicada = _aplicar(etapa, df, archivo, argumentos, mediciones)
+                        except Exception as e:
+                            print(f"Error procesando {archivo} en {etapa.nombre}: {e}")
+                            raise _FallaEtapa(etapa.nombre, e)
+                        aplicada_alguna = aplicada_alguna or aplicada or etapa.modifica
+                if modificado is None:
+                    # Las etapas aplican o no según las columnas: el primer bloque decide
+                    modificado = aplicada_alguna
+                if modificado:
+                    inicio_escritura = time.perf_counter()
+                    if escritor is None:
+                        escritor = EscritorBloques(ruta)
+                    escritor.escribir(df)
+                    mediciones.append(medicion("escritura", archivo, time.perf_counter() - inicio_escritura,
+                                               len(df), len(df)))
+                for etapa in posteriores:
+                    if error_posterior is None and (not etapa.requiere_guion or " - " in archivo):
+                        try:
+                            _aplicar(etapa, df, archivo, argumentos, mediciones)
+                        except Exception as e:
+                            print(f"Error procesando {archivo} en {etapa.nombre}: {e}")
+                            error_posterior = (etapa.nombre, str(e))
+            _acumular(acumuladas, mediciones)
+            inicio = time.perf_counter()
+    except _FallaEtapa as falla:
+        if escritor is not None:
+            escritor.descartar()
+        _terminar_argumentos(argumentos, archivo, False)
+        return [], (falla.etapa, str(falla.error)), True
+    except Exception as e:
+        # Error leyendo el libro (al abrirlo o a mitad de la hoja)
+        print(f"Error procesando '{archivo}': {e}")
+        if escritor is not None:
+            escritor.descartar()
+        _terminar_argumentos(argumentos, archivo, False)
+        _acumular(acumuladas, [medicion("lectura", archivo, time.perf_counter() - inicio,
+                                        bytes_leidos=tamano(ruta), error=str(e))])
+        return [], ("lectura", str(e)), True
+
+    if escritor is not None:
+        inicio = time.perf_counter()
+        try:
+            escritor.cerrar()
+            print(f"✅ Guardado: {archivo}")
+        except Exception as e:
+            print(f"❌ Error guardando {archivo}: {e}")
+            _terminar_argumentos(argumentos, archivo, False)
+            _acumular(acumuladas, [medicion("escritura", archivo, time.perf_counter() - inicio, error=str(e))])
+            return [], ("escritura", str(e)), False
+        _acumular(acumuladas, [medicion("escritura", archivo, time.perf_counter() - inicio,
+                                        bytes_escritos=tamano(ruta))])
+    _terminar_argumentos(argumentos, archivo, error_posterior is None)
+
+    aplicadas = [e.nombre for e in previas]
+    if error_posterior is not None:
+        # El archivo ya quedó escrito: se registra lo anterior y la etapa se reintenta
+        return aplicadas, error_posterior, False
+    return aplicadas + [e.nombre for e in posteriores], None, False
+
+
+class _FallaEtapa(Exception):
+    def __init__(self, etapa, error):
+        super().__init__(str(error))
+        self.etapa = etapa
+        self.error = error
+
+
+def procesar_archivo_por_bloques(ruta, etapas, pendientes_archivo, leer_bloques, argumentos=None,
+                                 capturar=False):
+    """Como procesar_archivo, pero de a bloques de filas. `leer_bloques(ruta)` retorna
+    (iterador de DataFrames, ya_limpio); todas las etapas pendientes deben ser por_filas.
+    Las mediciones quedan sumadas por etapa (una por archivo, no una por bloque)."""
+    no_aptas = [e.nombre for e in etapas
+                if e.nombre in pendientes_archivo and e.procesar is not None and not e.por_filas]
+    if no_aptas:
+        raise ValueError(f"Las etapas {no_aptas} no se pueden aplicar por bloques")
+    acumuladas = {}
+    salida = io.StringIO()
+    with contextlib.redirect_stdout(salida) if capturar else contextlib.nullcontext():
+        aplicadas, error, cuarentena = _procesar_bloques(ruta, etapas, pendientes_archivo, leer_bloques,
+                                                         argumentos or {}, acumuladas)
+    return Resultado(salida.getvalue(), aplicadas, list(acumuladas.values()), error, cuarentena)
+
+
+def poner_en_cuarentena(ruta, carpeta_cuarentena, etapa, mensaje):
+    """Mueve el archivo a la carpeta de cuarentena con un .error.txt que explica la falla.
+    Retorna la ruta nueva."""
+    ruta = Path(ruta)
+    carpeta = Path(carpeta_cuarentena)
+    carpeta.mkdir(exist_ok=True)
+    destino = carpeta / ruta.name
+    if destino.exists():
+        destino = carpeta / f"{ruta.stem} ({datetime.now():%Y%m%d-%H%M%S}){ruta.suffix}"
+    shutil.move(str(ruta), str(destino))
+    # Las copias columnares son derivadas: se descartan
+    for copia in staging.rutas_copia(ruta):
+        if copia.exists():
+            copia.unlink()
+    with open(destino.with_name(destino.name + ".error.txt"), "w", encoding="utf-8") as fh:
+        fh.write(f"Archivo: {ruta.name}\nEtapa: {etapa}\nFecha: {datetime.now():%Y-%m-%d %H:%M:%S}\n"
+                 f"Error: {mensaje}\n\nCorrija el archivo y vuelva a copiarlo a {ruta.parent.name}.\n")
+    return destino
+
+
+def registrar_resultado(ruta, resultado, manifiesto, informe, carpeta_cuarentena):
+    """En el proceso principal: informe, manifiesto y cuarentena según el Resultado."""
+    for med in resultado.mediciones:
+        informe.agregar(med)
+    if resultado.aplicadas:
+        manifiesto.registrar(ruta, *resultado.aplicadas)
+    if resultado.error and resultado.cuarentena:
+        etapa, mensaje = resultado.error
+        try:
+            destino = poner_en_cuarentena(ruta, carpeta_cuarentena, etapa, mensaje)
+            manifiesto.olvidar(ruta)
+            print(f"🚧 En cuarentena: {Path(ruta).name} → {destino.parent.name}/ ({etapa}: {mensaje})")
+        except Exception as e:
+            print(f"⚠️ No se pudo mover {Path(ruta).name} a cuarentena: {e}")
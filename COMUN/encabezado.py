@@ -0,0 +1,67 @@
+"""Lectura liviana del encabezado de las exportaciones del ERP.
+
+rename.py y clean.py solo necesitan las primeras celdas de la columna A (A1, A2, A4 y la
+fila donde empieza la tabla). La sonda abre el libro en modo read-only (streaming) y lee
+solo esas filas, sin construir las celdas del resto de la hoja.
+"""
+import re
+from collections import namedtuple
+
+from openpyxl import load_workbook
+
+# fila_encabezado es base 0, como el parámetro header de pandas (None si no se encontró)
+Encabezado = namedtuple("Encabezado", "a1 a2 a4 empresa nit fecha_inicial fecha_final fila_encabezado")
+
+MAX_FILAS = 15
+_FECHA = r"([0-9]{2}/[0-9]{2}/[0-9]{4})"
+
+
+def _texto(valor):
+    return str(valor).strip() if valor is not None else ""
+
+
+def _buscar(patrones, texto):
+    for patron in patrones:
+        m = re.search(patron, texto)
+        if m:
+            return m.group(1)
+    return ""
+
+
+def sondear_libro(wb, etiqueta=None, max_filas=MAX_FILAS):
+    """Lee la columna A de las primeras filas de un libro ya abierto (idealmente read-only).
+    `etiqueta` es el texto de la primera columna de la tabla ("Cuenta contable", "Cuenta")."""
+    ws = wb.active
+    columna_a = [fila[0] if fila else None
+                 for fila in ws.iter_rows(min_row=1, max_row=max_filas, max_col=1, values_only=True)]
+    columna_a += [None] * (4 - len(columna_a))
+    a1, a2, a4 = columna_a[0], columna_a[1], columna_a[3]
+
+    # A2: "EMPRESA NIT 900.000.000-1"
+    fila_nombre = str(a2)
+    empresa, nit = None, None
+    if "NIT" in fila_nombre:
+        empresa, _, nit = fila_nombre.partition("NIT")
+        empresa, nit = empresa.strip(), nit.strip(" :")
+
+    # A4: "Fecha Inicial: dd/mm/aaaa Fecha Final: dd/mm/aaaa" o "Periodo dd/mm/aaaa - dd/mm/aaaa"
+    fila_fecha = str(a4)
+    fecha_inicial = _buscar([rf"Fecha Inicial:\s*{_FECHA}", rf"{_FECHA}\s*-"], fila_fecha)
+    fecha_final = _buscar([rf"Fecha Final:\s*{_FECHA}", rf"-\s*{_FECHA}"], fila_fecha)
+
+    fila_encabezado = None
+    if etiqueta:
+        for i, valor in enumerate(columna_a):
+            if _texto(valor).lower() == etiqueta.lower():
+                fila_encabezado = i
+                break
+    return Encabezado(a1, a2, a4, empresa, nit, fecha_inicial, fecha_final, fila_encabezado)
+
+
+def sondear(ruta, etiqueta=None, max_filas=MAX_FILAS):
+    """Abre el archivo en modo streaming y devuelve su Encabezado."""
+    wb = load_workbook(ruta, read_only=True, data_only=True)
+    try:
+        return sondear_libro(wb, etiqueta, max_filas)
+    finally:
+        wb.close()
@@ -0,0 +1,169 @@
+"""Escritura de los .xlsx de salida de los pipelines.
+
+Equivale a `df.to_excel(ruta, index=False)`, pero las columnas numéricas (float) quedan
+como números reales con formato de miles y dos decimales. El código de formato de Excel
+es independiente del idioma: en un Excel en español se ve "1.234.567,89", y al leer el
+archivo con pandas la columna vuelve como float64 sin conversiones de texto.
+
+Si xlsxwriter está instalado, el libro se escribe en streaming (constant_memory): las
+filas se vuelcan al disco a medida que se escriben, así que la memoria del escritor no
+crece con el número de filas. Sin xlsxwriter se usa openpyxl como antes.
+
+El libro se escribe en un temporal y reemplaza al archivo final de forma atómica (ver
+COMUN/atomico.py): quien lea la carpeta nunca ve un .xlsx a medio escribir.
+"""
+import datetime
+import math
+from pathlib import Path
+
+import pandas as pd
+
+from COMUN import atomico
+from COMUN.atomico import reemplazar
+
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+FORMATO_NUMERO = "#,##0.00"
+
+# Filas que se materializan a la vez al volcar un DataFrame a la hoja
+FILAS_BLOQUE = 5000
+
+
+def columnas_numericas(df):
+    """Posiciones (base 0) de las columnas float del DataFrame."""
+    return [i for i, col in enumerate(df.columns) if pd.api.types.is_float_dtype(df.iloc[:, i])]
+
+
+def _vacio(v):
+    return v is None or v is pd.NaT or v is pd.NA or (isinstance(v, float) and math.isnan(v))
+
+
+def _abrir_libro(ruta, formato):
+    """Libro xlsxwriter en modo constant_memory con la hoja y los formatos de salida."""
+    libro = xlsxwriter.Workbook(str(ruta), {
+        "constant_memory": True,
+        "strings_to_urls": False,
+        "nan_inf_to_errors": True,
+    })
+    hoja = libro.add_worksheet("Sheet1")
+    formatos = {
+        # Mismo estilo de encabezado que usa pandas
+        "encabezado": libro.add_format({"bold": True, "border": 1, "align": "center", "valign": "top"}),
+        "numero": libro.add_format({"num_format": formato}),
+        "fecha": libro.add_format({"num_format": "yyyy-mm-dd hh:mm:ss"}),
+    }
+    return libro, hoja, formatos
+
+
+def _escribir_encabezado(hoja, columnas, formatos):
+    for c, nombre in enumerate(columnas):
+        hoja.write(0, c, nombre, formatos["encabezado"])
+
+
+def _escribir_filas(hoja, df, fila_inicial, formatos):
+    """Escribe las filas del DataFrame desde `fila_inicial` (0 es el encabezado)."""
+    numericas = set(columnas_numericas(df))
+    fmt_numero, fmt_fecha = formatos["numero"], formatos["fecha"]
+    r = fila_inicial
+    # Por bloques de filas: no se arma una copia en listas de todo el DataFrame
+    for inicio in range(0, len(df), FILAS_BLOQUE):
+        for fila in df.iloc[inicio:inicio + FILAS_BLOQUE].itertuples(index=False, name=None):
+            for c, v in enumerate(fila):
+                if _vacio(v):
+                    continue
+                if c in numericas:
+                    hoja.write_number(r, c, v, fmt_numero)
+                elif isinstance(v, (datetime.datetime, datetime.date)):
+                    hoja.write_datetime(r, c, v, fmt_fecha)
+                elif isinstance(v, str):
+                    # Texto literal: no se interpreta como fórmula ni como URL
+                    hoja.write_string(r, c, v)
+                else:
+                    # Escalares de numpy dentro de columnas object
+                    if hasattr(v, "item"):
+                        v = v.item()
+                    hoja.write(r, c, v)
+            r += 1
+
+
+def _guardar_streaming(df, ruta, formato):
+    """Escritura fila por fila con xlsxwriter en modo constant_memory."""
+    libro, hoja, formatos = _abrir_libro(ruta, formato)
+    try:
+        _escribir_encabezado(hoja, df.columns, formatos)
+        _escribir_filas(hoja, df, 1, formatos)
+    finally:
+        libro.close()
+
+
+class EscritorBloques:
+    """Escribe un .xlsx de salida bloque por bloque (modo por bloques de los motores).
+
+    Con xlsxwriter cada bloque se vuelca al disco apenas se escribe, así que la memoria no
+    depende del tamaño del archivo; sin xlsxwriter los bloques se juntan y se guardan al
+    cerrar con guardar_excel. El archivo final solo se reemplaza en `cerrar()`."""
+
+    def __init__(self, ruta, formato=FORMATO_NUMERO):
+        self.ruta = Path(ruta)
+        self.formato = formato
+        self.filas = 0
+        self._encabezado = False
+        self._bloques = []
+        self._libro = None
+        if xlsxwriter is not None:
+            self._temporal = atomico.temporal_de(self.ruta)
+            self._libro, self._hoja, self._formatos = _abrir_libro(self._temporal, formato)
+
+    def escribir(self, df):
+        if self._libro is None:
+            self._bloques.append(df)
+        else:
+            if not self._encabezado:
+                _escribir_encabezado(self._hoja, df.columns, self._formatos)
+                self._encabezado = True
+            _escribir_filas(self._hoja, df, self.filas + 1, self._formatos)
+        self.filas += len(df)
+
+    def cerrar(self):
+        """Termina el libro y reemplaza el archivo final de forma atómica."""
+        if self._libro is None:
+            guardar_excel(pd.concat(self._bloques, ignore_index=True), self.ruta, self.formato)
+            self._bloques = []
+            return
+        try:
+            self._libro.close()
+            atomico.confirmar(self._temporal, self.ruta)
+        finally:
+            atomico.descartar(self._temporal)
+
+    def descartar(self):
+        """Abandona la escritura: el archivo final queda como estaba."""
+        self._bloques = []
+        if self._libro is not None:
+            try:
+                self._libro.close()
+            except Exception:
+                pass
+            atomico.descartar(self._temporal)
+
+
+def guardar_excel(df, ruta, formato=FORMATO_NUMERO):
+    """Guarda el DataFrame sin índice, con formato numérico en las columnas float."""
+    with reemplazar(ruta) as temporal:
+        if xlsxwriter is not None:
+            _guardar_streaming(df, temporal, formato)
+        else:
+            _guardar_openpyxl(df, temporal, formato)
+
+
+def _guardar_openpyxl(df, ruta, formato):
+    posiciones = columnas_numericas(df)
+    with pd.ExcelWriter(ruta, engine="openpyxl") as writer:
+        df.to_excel(writer, index=False)
+        ws = writer.sheets[next(iter(writer.sheets))]
+        for i in posiciones:
+            for (celda,) in ws.iter_rows(min_row=2, max_row=len(df) + 1, min_col=i + 1, max_col=i + 1):
+                celda.number_format = formato
@@ -0,0 +1,145 @@
+"""Informe de ejecución de los pipelines (JSON lines).
+
+Cada ejecución de `ejecutar.py` agrega líneas a `_informe_ejecuciones.jsonl` en la carpeta
+de entrada, todas con el mismo id de ejecución:
+
+- {"tipo": "archivo", ...}: una etapa aplicada a un archivo (segundos, filas antes y
+  después, bytes leídos / escritos, error o aviso si lo hubo);
+- {"tipo": "etapa", ...}: duración total de una etapa del flujo;
+- {"tipo": "resumen", ...}: totales por etapa al terminar.
+
+Al cerrar se imprime la misma tabla de resumen. Las mediciones por archivo son dicts
+simples (ver `medicion`), así que se pueden armar dentro de un proceso del pool y
+devolverse al proceso principal, que es el único que escribe el informe.
+"""
+import json
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+# Archivos que cuenta `instantanea`: salidas .xlsx y copias columnares de staging
+EXTENSIONES = (".xlsx", ".parquet", ".arrow")
+
+CAMPOS = ["segundos", "archivos", "filas_entrada", "filas_salida", "bytes_leidos", "bytes_escritos", "errores",
+          "avisos"]
+
+
+def medicion(etapa, archivo, segundos=0.0, filas_entrada=None, filas_salida=None,
+             bytes_leidos=0, bytes_escritos=0, error=None, aviso=None):
+    """Medición de una etapa sobre un archivo. `aviso`: algo que se descartó o corrigió sin
+    que la etapa fallara (p. ej. columnas sin encabezado)."""
+    return {
+        "etapa": etapa,
+        "archivo": archivo,
+        "segundos": round(segundos, 4),
+        "filas_entrada": filas_entrada,
+        "filas_salida": filas_salida,
+        "bytes_leidos": bytes_leidos,
+        "bytes_escritos": bytes_escritos,
+        "error": error,
+        "aviso": aviso,
+    }
+
+
+def tamano(ruta):
+    """Tamaño del archivo en bytes (0 si no existe)."""
+    try:
+        return os.path.getsize(ruta)
+    except OSError:
+        return 0
+
+
+def instantanea(carpeta):
+    """{nombre: (tamaño, mtime)} de los archivos de datos de la carpeta (solo stat())."""
+    resultado = {}
+    for f in Path(carpeta).iterdir():
+        if f.suffix.lower() in EXTENSIONES:
+            st = f.stat()
+            resultado[f.name] = (st.st_size, st.st_mtime_ns)
+    return resultado
+
+
+def escritos(antes, despues):
+    """[(nombre, tamaño)] de los archivos nuevos o modificados entre dos instantáneas."""
+    return [(nombre, huella[0]) for nombre, huella in despues.items() if antes.get(nombre) != huella]
+
+
+class Informe:
+    def __init__(self, ruta_jsonl, pipeline, modo):
+        self.ruta_jsonl = Path(ruta_jsonl)
+        self.pipeline = pipeline
+        self.modo = modo
+        self.id = f"{datetime.now():%Y%m%d-%H%M%S}-{os.getpid()}"
+        # etapa -> totales (en orden de aparición)
+        self.totales = {}
+        self._inicio = time.perf_counter()
+        try:
+            self._fh = open(self.ruta_jsonl, "a", encoding="utf-8")
+        except OSError as e:
+            print(f"⚠️ No se pudo abrir el informe de ejecución ({self.ruta_jsonl.name}): {e}")
+            self._fh = None
+
+    def _escribir(self, tipo, datos):
+        if self._fh is None:
+            return
+        linea = {"ejecucion": self.id, "pipeline": self.pipeline, "modo": self.modo, "tipo": tipo, **datos}
+        self._fh.write(json.dumps(linea, ensure_ascii=False) + "\n")
+        self._fh.flush()
+
+    def _total(self, etapa):
+        if etapa not in self.totales:
+            self.totales[etapa] = {campo: 0 for campo in CAMPOS}
+        return self.totales[etapa]
+
+    def agregar(self, med):
+        """Registra una medición por archivo (ver `medicion`)."""
+        total = self._total(med["etapa"])
+        total["archivos"] += 1
+        total["segundos"] += med["segundos"] or 0
+        total["filas_entrada"] += med["filas_entrada"] or 0
+        total["filas_salida"] += med["filas_salida"] or 0
+        total["bytes_leidos"] += med["bytes_leidos"] or 0
+        total["bytes_escritos"] += med["bytes_escritos"] or 0
+        total["errores"] += 1 if med["error"] else 0
+        total["avisos"] += 1 if med.get("aviso") else 0
+        self._escribir("archivo", med)
+
+    @contextmanager
+    def etapa(self, nombre):
+        """Mide la duración total de una etapa del flujo (no usar el nombre de una etapa
+        que ya se mide por archivo: se sumaría dos veces)."""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            segundos = time.perf_counter() - inicio
+            self._total(nombre)["segundos"] += segundos
+            self._escribir("etapa", {"etapa": nombre, "segundos": round(segundos, 4)})
+
+    def error(self, etapa, archivo, mensaje):
+        """Error fuera de una medición (p. ej. un script que terminó con código de error)."""
+        self.agregar(medicion(etapa, archivo, error=str(mensaje)))
+
+    def cerrar(self):
+        """Escribe el resumen, cierra el archivo e imprime la tabla."""
+        segundos = time.perf_counter() - self._inicio
+        self._escribir("resumen", {
+            "segundos": round(segundos, 4),
+            "etapas": {nombre: {**t, "segundos": round(t["segundos"], 4)} for nombre, t in self.totales.items()},
+        })
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+        self.imprimir(segundos)
+
+    def imprimir(self, segundos):
+        print(f"\n📊 Resumen de la ejecución {self.id} ({self.pipeline}, {self.modo})")
+        print(f"{'Etapa':<28}{'Seg.':>9}{'Archivos':>10}{'Filas ent.':>12}{'Filas sal.':>12}"
+              f"{'MB leídos':>11}{'MB escritos':>13}{'Errores':>9}{'Avisos':>8}")
+        for nombre, t in self.totales.items():
+            print(f"{nombre[:27]:<28}{t['segundos']:>9.2f}{t['archivos']:>10}{t['filas_entrada']:>12}"
+                  f"{t['filas_salida']:>12}{t['bytes_leidos'] / 2**20:>11.2f}"
+                  f"{t['bytes_escritos'] / 2**20:>13.2f}{t['errores']:>9}{t['avisos']:>8}")
+        print(f"{'Total':<28}{segundos:>9.2f}")
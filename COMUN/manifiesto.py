@@ -0,0 +1,106 @@
+"""Manifiesto persistente por carpeta (DOCUMENTOS / SALDO BANCOS).
+
+Por cada archivo guarda el hash del contenido, el tamaño, el mtime y las etapas ya
+aplicadas con su versión. Cada etapa pregunta `pendiente(ruta, etapa)` antes de tocar un
+archivo y llama `registrar(ruta, etapa)` después de escribirlo, así:
+
+- una carpeta sin cambios cuesta un stat() por archivo (el hash solo se calcula si cambió
+  el tamaño o el mtime);
+- un archivo modificado por fuera del pipeline vuelve a pasar por todas las etapas;
+- una etapa no idempotente (p. ej. decimales) no se aplica dos veces sobre el mismo archivo.
+
+Subir la versión de una etapa hace que se vuelva a aplicar sobre los archivos ya procesados,
+por eso solo debe subirse en etapas que se pueden re-aplicar sobre su propia salida.
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from COMUN.atomico import escribir_json
+
+
+def hash_archivo(ruta, bloque=1 << 20):
+    """SHA-256 del contenido del archivo, leído por bloques."""
+    h = hashlib.sha256()
+    with open(ruta, 'rb') as fh:
+        for trozo in iter(lambda: fh.read(bloque), b''):
+            h.update(trozo)
+    return h.hexdigest()
+
+
+class Manifiesto:
+    def __init__(self, ruta_json, etapas):
+        """`etapas` es un dict ordenado nombre de etapa -> versión actual."""
+        self.ruta_json = Path(ruta_json)
+        self.etapas = dict(etapas)
+        self.archivos = {}
+        self.existia = self.ruta_json.exists()
+        if self.existia:
+            try:
+                with open(self.ruta_json, 'r', encoding='utf-8') as fh:
+                    self.archivos = json.load(fh).get("archivos", {})
+            except Exception as e:
+                print(f"⚠️ Manifiesto ilegible ({self.ruta_json.name}), se reconstruye: {e}")
+                self.archivos = {}
+
+    def guardar(self):
+        try:
+            escribir_json(self.ruta_json, {"archivos": self.archivos})
+        except Exception as e:
+            print(f"⚠️ No se pudo escribir el manifiesto: {e}")
+
+    def _huella(self, ruta, con_hash=True):
+        st = os.stat(ruta)
+        huella = {"tamano": st.st_size, "mtime": st.st_mtime_ns}
+        if con_hash:
+            huella["hash"] = hash_archivo(ruta)
+        return huella
+
+    def entrada(self, ruta):
+        """Entrada vigente del archivo (None si no está registrado).
+        Si el contenido cambió por fuera del pipeline, la entrada se reinicia sin etapas."""
+        ruta = Path(ruta)
+        registro = self.archivos.get(ruta.name)
+        if registro is None:
+            return None
+        huella = self._huella(ruta, con_hash=False)
+        if huella["tamano"] == registro.get("tamano") and huella["mtime"] == registro.get("mtime"):
+            return registro
+        # El stat cambió: solo el hash decide si el contenido es otro
+        contenido = hash_archivo(ruta)
+        if contenido != registro.get("hash"):
+            registro["hash"] = contenido
+            registro["etapas"] = {}
+        registro.update(huella)
+        return registro
+
+    def pendiente(self, ruta, etapa):
+        """True si la etapa aún no se aplicó (en su versión actual) al contenido actual del archivo."""
+        registro = self.entrada(ruta)
+        if registro is None:
+            return True
+        return registro.get("etapas", {}).get(etapa, 0) < self.etapas[etapa]
+
+    def registrar(self, ruta, *etapas):
+        """Marca las etapas como aplicadas y guarda la huella del contenido que dejaron.
+        Se llama después de escribir, siempre tras haber consultado `pendiente`."""
+        ruta = Path(ruta)
+        previas = dict(self.archivos.get(ruta.name, {}).get("etapas", {}))
+        for etapa in etapas:
+            previas[etapa] = self.etapas[etapa]
+        self.archivos[ruta.name] = {**self._huella(ruta), "etapas": previas}
+
+    def olvidar(self, ruta):
+        """Quita la entrada de un archivo (p. ej. el nombre anterior tras un rename)."""
+        self.archivos.pop(Path(ruta).name, None)
+
+    def adoptar(self, ruta, versiones=None):
+        """Registra un archivo existente como ya procesado por todas las etapas
+        (con `versiones` si se procesó con versiones anteriores de las etapas)."""
+        self.archivos[Path(ruta).name] = {**self._huella(ruta), "etapas": dict(versiones or self.etapas)}
+
+    def limpiar(self, carpeta):
+        """Elimina entradas de archivos que ya no existen en la carpeta."""
+        for nombre in [n for n in self.archivos if not (Path(carpeta) / n).exists()]:
+            del self.archivos[nombre]
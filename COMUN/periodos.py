@@ -0,0 +1,215 @@
+"""Índice de periodos de SALDO BANCOS (SQLite).
+
+Un registro por corte ("EMPRESA - dd-mm-aaaa.xlsx"): empresa, fecha inicial, fecha final,
+hash de la exportación original y estado ("pendiente", "procesado" o "cuarentena").
+Reemplaza a _fechas_iniciales.json:
+
+- rename.py registra la fecha inicial (A4) y el hash al renombrar la exportación;
+- al final de cada ejecución `sincronizar` deja el índice igual a la carpeta (agrega los
+  archivos finales que no tenía, actualiza el estado según el manifiesto y borra los
+  cortes cuyo archivo ya no existe, en vez de acumular nombres viejos);
+- los dashboards consultan fechas, empresas y cortes aquí sin abrir ningún Excel.
+
+Las fechas se guardan ISO ("2025-08-31"), así el orden y el mes (primeros 7 caracteres)
+salen directo de SQL.
+"""
+import re
+import sqlite3
+from datetime import date, datetime
+from pathlib import Path
+
+# "EMPRESA - 31-08-2025.xlsx"
+_PATRON_ARCHIVO = re.compile(r'^(?P<empresa>.+) - (?P<d>\d{2})-(?P<m>\d{2})-(?P<a>\d{4})\.xlsx$', re.IGNORECASE)
+_PATRON_FECHA = re.compile(r'^(\d{2})/(\d{2})/(\d{4})$')
+
+def corte_de_archivo(archivo):
+    """(empresa, fecha final ISO) a partir del nombre final del archivo, o None."""
+    m = _PATRON_ARCHIVO.match(Path(archivo).name)
+    if not m:
+        return None
+    return m.group("empresa").strip(), f"{m.group('a')}-{m.group('m')}-{m.group('d')}"
+
+
+def fecha_iso(fecha):
+    """"01/08/2025" → "2025-08-01" (None si está vacía o no tiene ese formato)."""
+    m = _PATRON_FECHA.match(str(fecha or "").strip())
+    return f"{m.group(3)}-{m.group(2)}-{m.group(1)}" if m else None
+
+
+def fecha_dmy(iso):
+    """"2025-08-01" → "01/08/2025" (formato de la columna Fecha Inicial)."""
+    return f"{iso[8:10]}/{iso[5:7]}/{iso[0:4]}" if iso else ""
+
+
+def _meses(desde, hasta):
+    """Meses "aaaa-mm" entre dos meses "aaaa-mm", ambos incluidos."""
+    anio, mes = int(desde[:4]), int(desde[5:7])
+    resultado = []
+    while f"{anio:04d}-{mes:02d}" <= hasta:
+        resultado.append(f"{anio:04d}-{mes:02d}")
+        anio, mes = (anio + 1, 1) if mes == 12 else (anio, mes + 1)
+    return resultado
+
+
+class IndicePeriodos:
+    def __init__(self, ruta_db, solo_lectura=False):
+        """Con solo_lectura=True (dashboards) no se crea el archivo ni se bloquea la escritura
+        del pipeline; si la base no existe se lanza sqlite3.OperationalError."""
+        self.ruta_db = Path(ruta_db)
+        if solo_lectura:
+            self.conexion = sqlite3.connect(f"{self.ruta_db.resolve().as_uri()}?mode=ro", uri=True, timeout=10)
+            return
+        self.conexion = sqlite3.connect(str(self.ruta_db), timeout=10)
+        self.conexion.executescript(
+            "CREATE TABLE IF NOT EXISTS periodos ("
+            " archivo TEXT PRIMARY KEY,"
+            " empresa TEXT NOT NULL,"
+            " fecha_inicial TEXT,"
+            " fecha_final TEXT NOT NULL,"
+            " hash TEXT,"
+            " estado TEXT NOT NULL DEFAULT 'pendiente',"
+            " actualizado TEXT);"
+            "CREATE INDEX IF NOT EXISTS ix_periodos_corte ON periodos (empresa, fecha_final);"
+            "CREATE INDEX IF NOT EXISTS ix_periodos_fecha ON periodos (fecha_final);"
+        )
+        self.conexion.commit()
+
+    def cerrar(self):
+        self.conexion.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    # ------------------------------------------------------------------ escritura
+
+    def _guardar(self, archivo, fecha_inicial=None, hash_origen=None, estado=None):
+        corte = corte_de_archivo(archivo)
+        if corte is None:
+            return False
+        empresa, fecha_final = corte
+        self.conexion.execute(
+            "INSERT INTO periodos (archivo, empresa, fecha_inicial, fecha_final, hash, estado, actualizado)"
+            " VALUES (?, ?, ?, ?, ?, COALESCE(?, 'pendiente'), ?)"
+            " ON CONFLICT(archivo) DO UPDATE SET"
+            "  fecha_inicial = COALESCE(excluded.fecha_inicial, fecha_inicial),"
+            "  hash = COALESCE(excluded.hash, hash),"
+            "  estado = COALESCE(?, estado),"
+            "  actualizado = excluded.actualizado",
+            (Path(archivo).name, empresa, fecha_iso(fecha_inicial), fecha_final, hash_origen, estado,
+             datetime.now().isoformat(timespec="seconds"), estado),
+        )
+        return True
+
+    def registrar(self, archivo, fecha_inicial=None, hash_origen=None, estado=None):
+        """Crea o actualiza el corte del archivo (`fecha_inicial` en "dd/mm/aaaa"); los valores
+        None no pisan lo que ya estaba. Retorna False si el archivo no tiene nombre final."""
+        registrado = self._guardar(archivo, fecha_inicial, hash_origen, estado)
+        self.conexion.commit()
+        return registrado
+
+    def importar_json(self, fechas_iniciales):
+        """Migración: {archivo: "dd/mm/aaaa"} del antiguo _fechas_iniciales.json."""
+        for archivo, fecha_inicial in fechas_iniciales.items():
+            self._guardar(archivo, fecha_inicial)
+        self.conexion.commit()
+
+    def sincronizar(self, carpeta, manifiesto, etapas, carpeta_cuarentena=None):
+        """Deja el índice igual a la carpeta: un corte por cada archivo final, con estado
+        "procesado" si el manifiesto tiene todas las `etapas`, "cuarentena" si está en
+        `carpeta_cuarentena` y "pendiente" si no; borra los cortes sin archivo."""
+        carpeta = Path(carpeta)
+        presentes = {}
+        for f in carpeta.glob("*.xlsx"):
+            if corte_de_archivo(f.name) is None or f.name.startswith("~$"):
+                continue
+            registro = manifiesto.archivos.get(f.name, {})
+            aplicadas = registro.get("etapas", {})
+            completo = all(aplicadas.get(e, 0) >= v for e, v in etapas.items())
+            presentes[f.name] = ("procesado" if completo else "pendiente", registro.get("hash"))
+        if carpeta_cuarentena is not None and Path(carpeta_cuarentena).exists():
+            for f in Path(carpeta_cuarentena).glob("*.xlsx"):
+                if corte_de_archivo(f.name) is not None and f.name not in presentes:
+                    presentes[f.name] = ("cuarentena", None)
+        ya = {fila[0]: fila[1] for fila in self.conexion.execute("SELECT archivo, hash FROM periodos")}
+        for archivo, (estado, hash_actual) in presentes.items():
+            # El hash es el de la exportación (lo guarda rename); el del manifiesto solo si no había
+            self._guardar(archivo, hash_origen=None if ya.get(archivo) else hash_actual, estado=estado)
+        self.conexion.executemany("DELETE FROM periodos WHERE archivo = ?",
+                                  [(a,) for a in ya if a not in presentes])
+        self.conexion.commit()
+
+    # ------------------------------------------------------------------ consultas
+
+    def fechas_iniciales(self):
+        """{archivo: "dd/mm/aaaa"} de los cortes con fecha inicial (lo que usa agregar_colum)."""
+        return {archivo: fecha_dmy(inicial) for archivo, inicial in self.conexion.execute(
+            "SELECT archivo, fecha_inicial FROM periodos WHERE fecha_inicial IS NOT NULL")}
+
+    def cortes(self, empresa=None, estado="procesado"):
+        """[(empresa, fecha_inicial, fecha_final, archivo, estado)] ordenados por fecha final."""
+        sql = "SELECT empresa, fecha_inicial, fecha_final, archivo, estado FROM periodos WHERE 1 = 1"
+        parametros = []
+        if empresa is not None:
+            sql += " AND empresa = ?"
+            parametros.append(empresa)
+        if estado is not None:
+            sql += " AND estado = ?"
+            parametros.append(estado)
+        return self.conexion.execute(sql + " ORDER BY fecha_final, empresa", parametros).fetchall()
+
+    def fechas(self, estado="procesado"):
+        """Fechas finales (ISO) distintas, de la más antigua a la más reciente."""
+        return [f for (f,) in self.conexion.execute(
+            "SELECT DISTINCT fecha_final FROM periodos WHERE estado = ? ORDER BY fecha_final", (estado,))]
+
+    def empresas(self, estado="procesado"):
+        return [e for (e,) in self.conexion.execute(
+            "SELECT DISTINCT empresa FROM periodos WHERE estado = ? ORDER BY empresa", (estado,))]
+
+    def ultimo_corte_por_mes(self, empresa=None, estado="procesado"):
+        """[(empresa, mes "aaaa-mm", fecha_final, archivo)]: el corte más reciente de cada mes."""
+        # En SQLite las columnas sueltas junto a MAX() salen de la fila del máximo
+        sql = ("SELECT empresa, substr(fecha_final, 1, 7) AS mes, MAX(fecha_final), archivo"
+               " FROM periodos WHERE estado = ?")
+        parametros = [estado]
+        if empresa is not None:
+            sql += " AND empresa = ?"
+            parametros.append(empresa)
+        sql += " GROUP BY empresa, mes ORDER BY empresa, mes"
+        return self.conexion.execute(sql, parametros).fetchall()
+
+    def meses_faltantes(self, empresa, desde=None, hasta=None, estado="procesado"):
+        """Meses "aaaa-mm" sin ningún corte de la empresa entre `desde` y `hasta` (por defecto,
+        entre su primer y su último corte)."""
+        meses = {mes for _, mes, _, _ in self.ultimo_corte_por_mes(empresa, estado)}
+        if not meses:
+            return []
+        return [m for m in _meses(desde or min(meses), hasta or max(meses)) if m not in meses]
+
+
+def consultar(carpeta, nombre="_periodos.sqlite"):
+    """Índice de la carpeta en solo lectura, o None si el pipeline aún no lo ha creado."""
+    ruta = Path(carpeta) / nombre
+    if not ruta.exists():
+        return None
+    try:
+        return IndicePeriodos(ruta, solo_lectura=True)
+    except sqlite3.Error:
+        return None
+
+
+def fechas_corte(carpeta):
+    """Fechas finales (datetime.date) de los cortes procesados, para los dropdowns de los
+    dashboards; None si la carpeta aún no tiene índice."""
+    indice = consultar(carpeta)
+    if indice is None:
+        return None
+    try:
+        return [date.fromisoformat(f) for f in indice.fechas()]
+    except sqlite3.Error:
+        return None
+    finally:
+        indice.cerrar()
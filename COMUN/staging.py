@@ -0,0 +1,147 @@
+"""Copias columnares (Parquet / Arrow IPC) entre etapas.
+
+Modo opcional, se activa con la variable de entorno CONTA_STAGING=parquet|arrow (o con
+`ejecutar.py --staging ...`). Con el modo activo, las etapas intermedias no reescriben el
+.xlsx: guardan el DataFrame en una copia oculta junto al archivo, con el mismo nombre
+(".EMPRESA - 31-07-2025.parquet"), y la siguiente etapa la lee en milisegundos. Al final
+`publicar_carpeta` escribe el .xlsx que abren los contadores y la copia queda disponible
+para GRAFICOS.
+
+Una copia solo es vigente si es más reciente que el .xlsx; si el .xlsx se modifica por
+fuera, la copia se ignora. Si pyarrow no está instalado o un DataFrame no se puede guardar
+en formato columnar (p. ej. columnas con números y texto mezclados), se escribe el .xlsx
+como siempre.
+"""
+import os
+from pathlib import Path
+
+import pandas as pd
+
+from COMUN.tipos_excel import como_releido, como_texto
+from COMUN.escritor import guardar_excel
+from COMUN.atomico import reemplazar
+
+try:
+    import pyarrow  # noqa: F401
+    PYARROW_OK = True
+except ImportError:
+    PYARROW_OK = False
+
+FORMATOS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+
+def formato():
+    """Formato configurado ("parquet", "arrow") o None si el modo está apagado."""
+    valor = os.environ.get("CONTA_STAGING", "").strip().lower()
+    return valor if valor in FORMATOS and PYARROW_OK else None
+
+
+def rutas_copia(ruta):
+    """Rutas posibles de la copia oculta de un .xlsx (una por formato)."""
+    ruta = Path(ruta)
+    return [ruta.with_name(f".{ruta.stem}{ext}") for ext in FORMATOS.values()]
+
+
+def copia_vigente(ruta):
+    """Copia columnar más reciente que el .xlsx, o None."""
+    ruta = Path(ruta)
+    if not PYARROW_OK:
+        return None
+    try:
+        mtime_xlsx = ruta.stat().st_mtime_ns if ruta.exists() else -1
+    except OSError:
+        return None
+    for copia in rutas_copia(ruta):
+        if copia.exists() and copia.stat().st_mtime_ns >= mtime_xlsx:
+            return copia
+    return None
+
+
+def _leer_copia(copia):
+    if copia.suffix == ".arrow":
+        return pd.read_feather(copia)
+    return pd.read_parquet(copia)
+
+
+def leer(ruta, dtype=None):
+    """Como pd.read_excel(ruta[, dtype=str]), pero usando la copia columnar si está vigente."""
+    copia = copia_vigente(ruta)
+    if copia is not None:
+        try:
+            df = _leer_copia(copia)
+            # Mismos tipos que devolvería el .xlsx
+            return como_texto(df) if dtype is str else como_releido(df)
+        except Exception as e:
+            print(f"⚠️ No se pudo leer la copia {copia.name}, se usa el .xlsx: {e}")
+    return pd.read_excel(ruta, dtype=dtype)
+
+
+def _sincronizar(ruta, copia):
+    """Deja la copia con el mismo mtime del .xlsx: representa exactamente su contenido."""
+    st = Path(ruta).stat()
+    os.utime(copia, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+
+def guardar_copia(df, ruta, fmt=None, publicado=False):
+    """Escribe la copia columnar del DataFrame. Retorna True si se pudo.
+    publicado=True indica que el .xlsx ya tiene este mismo contenido (salida final de un motor)."""
+    fmt = fmt or formato()
+    if fmt is None:
+        return False
+    ruta = Path(ruta)
+    copia = ruta.with_name(f".{ruta.stem}{FORMATOS[fmt]}")
+    try:
+        datos = df.reset_index(drop=True)
+        with reemplazar(copia) as temporal:
+            if fmt == "arrow":
+                datos.to_feather(temporal)
+            else:
+                datos.to_parquet(temporal, index=False)
+    except Exception as e:
+        print(f"⚠️ {ruta.name}: no se pudo guardar en formato {fmt} ({e}); se usa el .xlsx")
+        if copia.exists():
+            copia.unlink()
+        return False
+    # Solo una copia por archivo
+    for otra in rutas_copia(ruta):
+        if otra != copia and otra.exists():
+            otra.unlink()
+    if publicado:
+        _sincronizar(ruta, copia)
+    return True
+
+
+def escribir(df, ruta):
+    """Salida de una etapa intermedia: copia columnar si el modo está activo, si no .xlsx."""
+    if guardar_copia(df, ruta):
+        return
+    guardar_excel(df, ruta)
+
+
+def publicar(ruta):
+    """Escribe el .xlsx desde la copia vigente y deja la copia vigente para GRAFICOS.
+    Retorna True si hubo algo que publicar."""
+    ruta = Path(ruta)
+    copia = copia_vigente(ruta)
+    if copia is None:
+        return False
+    if ruta.exists() and copia.stat().st_mtime_ns == ruta.stat().st_mtime_ns:
+        return False  # ya publicado
+    guardar_excel(_leer_copia(copia), ruta)
+    # La copia sigue representando al .xlsx recién escrito
+    _sincronizar(ruta, copia)
+    return True
+
+
+def publicar_carpeta(carpeta, manifiesto=None):
+    """Publica todos los .xlsx con copia pendiente y actualiza su huella en el manifiesto."""
+    for f in Path(carpeta).glob('*.xlsx'):
+        try:
+            if publicar(f):
+                print(f"✅ Publicado: {f.name}")
+                if manifiesto is not None:
+                    manifiesto.registrar(f)
+        except Exception as e:
+            print(f"❌ Error publicando {f.name}: {e}")
+    if manifiesto is not None:
+        manifiesto.guardar()
@@ -0,0 +1,50 @@
+"""Conversión de tipos equivalente a guardar un DataFrame en Excel y volver a leerlo.
+
+Los pipelines ejecutaban cada etapa como un script que escribía el .xlsx y la siguiente
+lo volvía a leer con pandas. Los motores en memoria aplican estas funciones entre etapas
+para conservar exactamente los mismos tipos (p. ej. remplazar compara el NIT como texto).
+"""
+import math
+
+import pandas as pd
+
+
+def _valor_releido(v):
+    # openpyxl devuelve como int los números enteros guardados como float
+    if isinstance(v, float) and not math.isnan(v) and v.is_integer():
+        return int(v)
+    # Las celdas con texto vacío se leen como NaN
+    if isinstance(v, str) and v == "":
+        return None
+    return v
+
+
+def como_releido(df):
+    """Reproduce en memoria los tipos que devolvería pd.read_excel tras un df.to_excel."""
+    df = df.copy()
+    for col in df.columns:
+        serie = df[col]
+        if pd.api.types.is_float_dtype(serie):
+            no_nulos = serie.dropna()
+            if len(no_nulos) == len(serie) and len(serie) and (no_nulos % 1 == 0).all():
+                df[col] = serie.astype("int64")
+        elif serie.dtype == object or pd.api.types.is_string_dtype(serie):
+            valores = serie.map(_valor_releido)
+            df[col] = pd.Series(list(valores), index=serie.index).infer_objects()
+    return df.reset_index(drop=True)
+
+
+def _valor_texto(v):
+    v = _valor_releido(v)
+    if v is None or (isinstance(v, float) and math.isnan(v)):
+        return float("nan")
+    return str(v)
+
+
+def como_texto(df):
+    """Equivalente en memoria de pd.read_excel(..., dtype=str) sobre el archivo guardado."""
+    df = como_releido(df)
+    for col in df.columns:
+        df[col] = pd.Series([_valor_texto(v) for v in df[col].astype(object)],
+                            index=df.index, dtype=object)
+    return df
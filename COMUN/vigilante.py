@@ -0,0 +1,172 @@
+"""Modo vigilante de los pipelines (`ejecutar.py --vigilar`).
+
+Queda corriendo sobre la carpeta de entrada (DOCUMENTOS / SALDO BANCOS) y procesa los
+.xlsx nuevos o modificados apenas terminan de copiarse, sin esperar a que alguien ejecute
+el pipeline a mano:
+
+- detecta los cambios con watchdog (inotify en Linux, ReadDirectoryChangesW en Windows)
+  si está instalado; si no, revisa la carpeta cada `intervalo` segundos (solo stat());
+- ignora los archivos de bloqueo de Excel ("~$..."), las copias columnares ocultas y las
+  subcarpetas (p. ej. _cuarentena);
+- antirrebote: un archivo entra al lote cuando su tamaño y mtime no cambian durante
+  `espera` segundos y se puede abrir (Windows no deja abrir un archivo que se está
+  copiando);
+- antes de procesar un lote se descartan los archivos que ya no tienen trabajo según el
+  manifiesto: así las escrituras del propio pipeline no disparan otra ejecución.
+
+El lote se procesa con el motor de siempre, que solo toma lo pendiente del manifiesto.
+"""
+import os
+import threading
+import time
+from pathlib import Path
+
+from COMUN.ejecutor import es_temporal
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    Observer = None
+    FileSystemEventHandler = object
+
+
+def es_libro(ruta):
+    """True para los .xlsx que procesa el pipeline (sin bloqueos de Excel ni copias ocultas)."""
+    nombre = Path(ruta).name
+    return nombre.lower().endswith(".xlsx") and not es_temporal(nombre) and not nombre.startswith(".")
+
+
+def _huella(ruta):
+    try:
+        st = os.stat(ruta)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+def _se_puede_abrir(ruta):
+    try:
+        with open(ruta, "rb"):
+            return True
+    except OSError:
+        return False
+
+
+class _Eventos(FileSystemEventHandler):
+    """Anota las rutas que watchdog reporta como creadas, modificadas o movidas."""
+
+    def __init__(self, vigilante):
+        super().__init__()
+        self.vigilante = vigilante
+
+    def on_any_event(self, event):
+        # "opened" / "closed_no_write" los generan las propias lecturas: se ignoran
+        if event.is_directory or event.event_type not in ("created", "modified", "moved", "closed"):
+            return
+        for ruta in (getattr(event, "src_path", None), getattr(event, "dest_path", None)):
+            if ruta:
+                self.vigilante.marcar(ruta)
+
+
+class Vigilante:
+    def __init__(self, carpeta, procesar, por_procesar=None, espera=2.0, intervalo=1.0, polling=False):
+        """`procesar(rutas)` procesa un lote; `por_procesar(rutas)` retorna las que aún tienen
+        trabajo (None: todas). Con polling=True no se usa watchdog aunque esté instalado."""
+        self.carpeta = Path(carpeta)
+        self.procesar = procesar
+        self.por_procesar = por_procesar
+        self.espera = espera
+        self.intervalo = intervalo
+        self.usar_watchdog = Observer is not None and not polling
+        # ruta -> (huella, instante en que se vio esa huella por primera vez)
+        self._candidatos = {}
+        self._marcadas = set()
+        self._cerrojo = threading.Lock()
+        self._fin = threading.Event()
+        self._anterior = {}
+
+    def marcar(self, ruta):
+        """Registra un posible cambio (llamado desde el hilo de watchdog)."""
+        if es_libro(ruta) and Path(ruta).parent == self.carpeta:
+            with self._cerrojo:
+                self._marcadas.add(str(ruta))
+
+    def _sondear(self):
+        """Modo polling: marca los libros cuya huella cambió desde la última revisión."""
+        actual = {}
+        for f in self.carpeta.iterdir():
+            if f.is_file() and es_libro(f):
+                actual[str(f)] = _huella(f)
+        for ruta, huella in actual.items():
+            if self._anterior.get(ruta) != huella:
+                self.marcar(ruta)
+        self._anterior = actual
+
+    def listos(self):
+        """Rutas que ya terminaron de escribirse (antirrebote); las retira de los candidatos."""
+        with self._cerrojo:
+            marcadas, self._marcadas = self._marcadas, set()
+        ahora = time.monotonic()
+        for ruta in marcadas:
+            self._candidatos.setdefault(ruta, (None, ahora))
+        resultado = []
+        for ruta, (huella_vista, desde) in list(self._candidatos.items()):
+            huella = _huella(ruta)
+            if huella is None:
+                # Se borró o se renombró: el evento del nombre nuevo lo vuelve a marcar
+                del self._candidatos[ruta]
+            elif huella != huella_vista or ruta in marcadas:
+                self._candidatos[ruta] = (huella, ahora)
+            elif ahora - desde >= self.espera and _se_puede_abrir(ruta):
+                del self._candidatos[ruta]
+                resultado.append(ruta)
+        return sorted(resultado)
+
+    def revisar(self):
+        """Una vuelta del ciclo: procesa el lote de archivos listos, si hay."""
+        if not self.usar_watchdog:
+            self._sondear()
+        rutas = self.listos()
+        if rutas and self.por_procesar is not None:
+            rutas = self.por_procesar(rutas)
+        if not rutas:
+            return []
+        print(f"\n👀 {len(rutas)} archivo(s) nuevo(s) o modificado(s) en {self.carpeta.name}: "
+              + ", ".join(Path(r).name for r in rutas))
+        try:
+            self.procesar(rutas)
+        except Exception as e:
+            # El vigilante sigue corriendo: el lote se reintenta cuando el archivo vuelva a cambiar
+            print(f"❌ Error procesando el lote: {e}")
+        return rutas
+
+    def detener(self):
+        self._fin.set()
+
+    def ejecutar(self):
+        """Vigila la carpeta hasta Ctrl+C (o `detener()`)."""
+        observador = None
+        if self.usar_watchdog:
+            observador = Observer()
+            observador.schedule(_Eventos(self), str(self.carpeta), recursive=False)
+            observador.start()
+        else:
+            # Los archivos ya presentes los toma la ejecución inicial, no el primer sondeo
+            self._anterior = {str(f): _huella(f) for f in self.carpeta.iterdir() if f.is_file() and es_libro(f)}
+        modo = "watchdog" if observador else f"revisión cada {self.intervalo:g} s"
+        print(f"\n👀 Vigilando {self.carpeta} ({modo}). Ctrl+C para terminar.")
+        try:
+            while not self._fin.wait(self.intervalo):
+                self.revisar()
+        except KeyboardInterrupt:
+            print("\n⏹️ Vigilante detenido.")
+        finally:
+            if observador is not None:
+                observador.stop()
+                observador.join()
+
+
+def vigilar(carpeta, procesar, por_procesar=None, espera=2.0, intervalo=1.0, polling=False):
+    """Atajo: crea el Vigilante y lo deja corriendo."""
+    Vigilante(carpeta, procesar, por_procesar, espera, intervalo, polling).ejecutar()
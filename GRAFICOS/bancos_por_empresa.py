@@ -1,8 +1,9 @@
+import sys
 from pathlib import Path
-from io import StringIO
 import pandas as pd
 from dash import html, dcc, Input, Output
 from dash import dash_table
+import datos_bancos
 
 # Formato numérico (intenta usar API avanzada; si falla, fallback a None)
 try:
@@ -14,22 +15,10 @@ except Exception:
 BASE_DIR = Path(__file__).resolve().parent
 SALDO_BANCOS_DIR = BASE_DIR.parent / 'INFORME BANCOS' / 'SALDO BANCOS'
 
-# Columnas que componen Movimientos (igual a cuadro_banc.py)
-MOV_COLS = [
-    'ABR - Notas contables',
-    'Ajustes y Reclasificaciones',
-    'CE CHEQUES',
-    'CE TRANSF',
-    'Comprobante de Egreso',
-    'Cuenta Por Pagar',
-    'Comprobante de Ingreso',
-    'Documento de Cartera Reversado',
-    'Gastos Bancarios',
-    'GASTOS BANCARIOS AUTOMATICOS',
-    'Legalizacion de anticipos',
-    'Prestamos',
-    'Traslado de Fondos',
-]
+# Raíz del proyecto en sys.path para usar COMUN (índice de periodos de SALDO BANCOS)
+if str(BASE_DIR.parent) not in sys.path:
+    sys.path.append(str(BASE_DIR.parent))
+from COMUN.periodos import fechas_corte
 
 # Formateo de fechas en español (texto largo)
 MESES_ES = ['enero','febrero','marzo','abril','mayo','junio','julio','agosto','septiembre','octubre','noviembre','diciembre']
@@ -45,144 +34,22 @@ def fecha_es(d) -> str:
 
 def cargar_datos() -> pd.DataFrame:
     """Carga datos desde archivos de SALDO BANCOS y calcula métricas base.
-    Requiere columnas: Empresa, Fecha, Cuenta, Saldo Inicial, Saldo Libros y columnas de MOV_COLS si existen.
+    Requiere columnas: Empresa, Fecha, Cuenta, Saldo Inicial, Saldo Libros y columnas de datos_bancos.MOV_COLS si existen.
     Retorna DataFrame agregado por ['Empresa','Fecha','Fecha Inicial','Banco','Cuenta'] (las que existan) con columnas:
       ['Adiciones','Salidas','Saldo Inicial','Movimientos','Saldo Libros','Variacion']
     """
-    archivos = [f for f in SALDO_BANCOS_DIR.glob('*.xlsx') if not f.name.startswith('~$')]
-    if not archivos:
-        return pd.DataFrame(columns=['Empresa','Fecha','Fecha Inicial','Banco','Cuenta','Adiciones','Salidas','Saldo Inicial','Movimientos','Saldo Libros','Variacion'])
-    frames = []
-    for f in archivos:
-        try:
-            raw = pd.read_excel(f, dtype=str)
-            cols_map = {c.lower().strip(): c for c in raw.columns}
-            col_empresa = cols_map.get('empresa')
-            col_fecha = cols_map.get('fecha')
-            # Cuenta puede venir como 'Cuenta' o 'Cuenta bancaria'
-            col_cuenta = None
-            for c in raw.columns:
-                if c.strip().lower() in ('cuenta','cuenta bancaria','nombre cuenta','cuenta banco'):
-                    col_cuenta = c
-                    break
-            # Banco: priorizar coincidencia EXACTA 'Banco'; evitar tomar columnas de cuenta que contengan 'banc'
-            col_banco = None
-            for c in raw.columns:
-                if c.strip().lower() == 'banco':
-                    col_banco = c
-                    break
-            if not col_banco:
-                for c in raw.columns:
-                    lc = c.strip().lower()
-                    if 'banco' in lc and 'cuenta' not in lc:
-                        col_banco = c
-                        break
-            # Saldo Inicial y Saldo Libros
-            col_saldo_inicial = None
-            for c in raw.columns:
-                if c.strip().lower().replace(' ','') in ('saldoinicial','saldo_inicial'):
-                    col_saldo_inicial = c
-                    break
-            col_saldo_libros = None
-            for c in raw.columns:
-                if c.strip().lower().replace(' ','') in ('saldolibros','saldo_libros'):
-                    col_saldo_libros = c
-                    break
-            if not (col_empresa and col_fecha and col_cuenta and col_saldo_inicial and col_saldo_libros):
-                continue
-            # Fecha Inicial puede o no estar
-            col_fecha_inicial = None
-            for c in raw.columns:
-                if c.strip().lower().replace('í','i') == 'fecha inicial':
-                    col_fecha_inicial = c
-                    break
-
-            needed = [col_empresa, col_fecha, col_cuenta, col_saldo_inicial, col_saldo_libros] \
-                      + ([col_fecha_inicial] if col_fecha_inicial else []) \
-                      + ([col_banco] if col_banco else [])
-            available_movs = []
-            for mc in MOV_COLS:
-                found = None
-                for c in raw.columns:
-                    if c.strip().lower() == mc.strip().lower():
-                        found = c
-                        break
-                if found:
-                    available_movs.append(found)
-            keep_cols = needed + available_movs
-            rename_map = {
-                col_empresa: 'Empresa',
-                col_fecha: 'Fecha',
-                col_cuenta: 'Cuenta',
-                col_saldo_inicial: 'Saldo Inicial',
-                col_saldo_libros: 'Saldo Libros'
-            }
-            if 'col_fecha_inicial' in locals() and col_fecha_inicial:
-                rename_map[col_fecha_inicial] = 'Fecha Inicial'
-            if col_banco:
-                rename_map[col_banco] = 'Banco'
-            df = raw[keep_cols].rename(columns=rename_map)
-            # Limpieza numérica: solo coma a punto
-            for col in ['Saldo Inicial','Saldo Libros'] + available_movs:
-                if col in df.columns:
-                    df[col] = (df[col].astype(str)
-                                        .str.strip()
-                                        .str.replace('\u00a0','', regex=False)
-                                        .str.replace(',', '.', regex=False))
-                    df[col] = pd.to_numeric(df[col], errors='coerce')
-            # Asegurar tipo float
-            for col in ['Saldo Inicial','Saldo Libros','Movimientos','Adiciones','Salidas']:
-                if col in df.columns:
-                    df[col] = df[col].astype(float)
-            # Calcular Adiciones/Salidas/Movimientos
-            if available_movs:
-                movimientos_src = df[available_movs]
-                df['Adiciones'] = movimientos_src.clip(lower=0).sum(axis=1, min_count=1)
-                df['Salidas'] = movimientos_src.clip(upper=0).sum(axis=1, min_count=1)
-                df['Movimientos'] = movimientos_src.sum(axis=1, min_count=1)
-            else:
-                df['Adiciones'] = 0.0
-                df['Salidas'] = 0.0
-                df['Movimientos'] = 0.0
-
-            df['Fecha'] = pd.to_datetime(df['Fecha'], dayfirst=True, errors='coerce')
-            if 'Fecha Inicial' in df.columns:
-                df['Fecha Inicial'] = pd.to_datetime(df['Fecha Inicial'], dayfirst=True, errors='coerce')
-            df.dropna(subset=['Fecha'], inplace=True)
-
-            base_cols = ['Empresa','Fecha'] \
-                        + (['Fecha Inicial'] if 'Fecha Inicial' in df.columns else []) \
-                        + (['Banco'] if 'Banco' in df.columns else []) + [
-                'Cuenta','Saldo Inicial','Adiciones','Salidas','Movimientos','Saldo Libros'
-            ]
-            frames.append(df[base_cols])
-        except Exception as e:
-            print(f"⚠️ Error leyendo {f.name}: {e}")
-
-    if not frames:
-        return pd.DataFrame(columns=['Empresa','Fecha','Fecha Inicial','Banco','Cuenta','Adiciones','Salidas','Saldo Inicial','Movimientos','Saldo Libros','Variacion'])
-
-    data = pd.concat(frames, ignore_index=True)
-    # Agregado base
-    group_cols = [c for c in ['Empresa','Fecha','Fecha Inicial','Banco','Cuenta'] if c in data.columns]
-    agg_map = {'Adiciones':'sum','Salidas':'sum','Saldo Inicial':'sum','Movimientos':'sum','Saldo Libros':'sum'}
-    data = data.groupby(group_cols, as_index=False).agg(agg_map)
-
-    # Variación (%): Movimientos / Saldo Inicial * 100
-    import numpy as np
-    data['Variacion'] = np.where((data['Saldo Inicial'] != 0) & (~data['Saldo Inicial'].isna()),
-                                 (data['Movimientos'] / data['Saldo Inicial']) * 100,
-                                 float('nan'))
-
-    sort_cols = [c for c in ['Fecha','Empresa','Banco','Cuenta'] if c in data.columns]
-    data.sort_values(sort_cols, inplace=True)
-    return data
+    # Los libros se leen una vez (datos_bancos); el agregado se recalcula solo si cambió la carpeta.
+    # Solo lo lee layout(): se entrega sin copiar
+    return datos_bancos.movimientos_por_cuenta(orden=('Fecha','Empresa','Banco','Cuenta'), copia=False)
 
 
 def layout():
     df = cargar_datos()
     empresas = sorted(df['Empresa'].unique()) if not df.empty else []
-    fechas = sorted(df['Fecha'].dt.date.unique()) if not df.empty else []
+    # Fechas del índice de periodos (sin recorrer las filas); sin índice, de los datos
+    fechas = fechas_corte(SALDO_BANCOS_DIR)
+    if fechas is None:
+        fechas = sorted(df['Fecha'].dt.date.unique()) if not df.empty else []
     bancos = sorted(df['Banco'].unique()) if (not df.empty and 'Banco' in df.columns) else []
 
     # Fecha Inicial por defecto (mínima disponible)
@@ -304,8 +171,8 @@ def register(app):
         prevent_initial_call=False
     )
     def refrescar(_):
-        df = cargar_datos()
-        return df.to_json(date_format='iso', orient='split')
+        # En el Store solo va el token del cubo; el cubo queda en el servidor (datos_bancos)
+        return datos_bancos.publicar('cubo', datos_bancos.cubo)
 
     @app.callback(
         Output('be-table','data'),
@@ -317,35 +184,24 @@ def register(app):
         Input('be-fecha-dropdown','value'),
         Input('be-metrica-dropdown','value')
     )
-    def actualizar(data_json, empresas_sel, bancos_sel, fecha_sel, metrica):
-        if not data_json:
+    def actualizar(token, empresas_sel, bancos_sel, fecha_sel, metrica):
+        cubo = datos_bancos.resolver(token, copia=False)  # solo se rebana
+        if cubo is None:
             # columnas mínimas
             base_cols = [{'name':'Empresa','id':'Empresa'}]
             base_cols.append({'name':'TOTAL','id':'TOTAL'} if NUM_FORMAT is None else {'name':'TOTAL','id':'TOTAL','type':'numeric','format':NUM_FORMAT})
             return [], base_cols, '—'
 
-        df = pd.read_json(StringIO(data_json), orient='split')
-        # Tipos
-        if 'Fecha' in df.columns:
-            df['Fecha'] = pd.to_datetime(df['Fecha'], errors='coerce')
-        if 'Fecha Inicial' in df.columns:
-            df['Fecha Inicial'] = pd.to_datetime(df['Fecha Inicial'], errors='coerce')
-        df = df.dropna(subset=['Fecha'])
-
-        # Filtros
-        if empresas_sel:
-            df = df[df['Empresa'].isin(empresas_sel)]
+        # Filtros: corte, empresas y bancos sobre el cubo (sin cuentas CXP)
+        fecha_dt = None
         if fecha_sel:
             try:
                 fecha_dt = pd.to_datetime([fecha_sel], errors='coerce')[0].normalize()
-                if pd.notna(fecha_dt):
-                    df = df[df['Fecha'].dt.normalize() == fecha_dt]
+                if pd.isna(fecha_dt):
+                    fecha_dt = None
             except Exception:
                 pass
-        if 'Cuenta' in df.columns:
-            df = df[~df['Cuenta'].str.contains('CXP', case=False, na=False)]
-        if bancos_sel and 'Banco' in df.columns:
-            df = df[df['Banco'].isin(bancos_sel)]
+        df = datos_bancos.rebanar(cubo, fecha_dt, empresas_sel, bancos_sel, sin_cxp=True)
 
         if df.empty:
             base_cols = [{'name':'Empresa','id':'Empresa'}]
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-def _build_context_bancos(data_json: str, max_rows: int = 1000) -> str:
+def _build_context_bancos(df: pd.DataFrame, max_rows: int = 1000) -> str:
     """
     Construye un resumen textual del DataFrame enfocado en BANCO + EMPRESA + PERIODO.
     Este contexto complementa los ya existentes, sin reemplazarlos.
@@ -13,9 +13,9 @@ def _build_context_bancos(data_json: str, max_rows: int = 1000) -> str:
     - Siempre omitiendo cuentas que contengan 'CXP'
     """
 
-    if not data_json:
+    if df is None:
         return "No hay datos bancarios disponibles."
-    df = pd.read_json(io.StringIO(data_json), orient='split')
+    df = df.copy()
 
     # Limpieza básica
     if 'Fecha' in df.columns:
@@ -82,11 +82,11 @@ def _build_context_bancos(data_json: str, max_rows: int = 1000) -> str:
     return "\n".join(lines)
 from dash import dcc, html, Input, Output, State, ctx
 import pandas as pd
-import io
 from pathlib import Path
 
 # Reusar datos y lógica de grafic_time
 from grafic_time import cargar_datos
+import datos_bancos
 
 # Cliente OpenAI: asegurar que el paquete 'API' (carpeta hermana) esté en sys.path
 import sys as _sys
@@ -113,7 +113,7 @@ def layout():
         html.H2('Asistente Financiero (IA)'),
         html.P('Haz preguntas en lenguaje natural sobre las métricas de tiempo (Saldo Inicial, Saldo Libros, Movimientos).'),
         dcc.Store(id='ai-conv-store', storage_type='session'),  # memoria de conversación en sesión
-        dcc.Store(id='ai-data-store'),  # snapshot de datos en JSON
+        dcc.Store(id='ai-data-store'),  # token del snapshot de datos (el DataFrame queda en el servidor)
         html.Div([
             html.Div([
                 html.Label('Modelo'),
@@ -147,11 +147,11 @@ def layout():
     ], style={'fontFamily':'Arial','padding':'18px'})
 
 
-def _df_snapshot_json() -> str:
+def _df_snapshot() -> pd.DataFrame:
     df = cargar_datos()
     if df.empty:
         df = pd.DataFrame(columns=['Empresa','Fecha','Fecha Inicial','Banco','Saldo Inicial','Saldo Libros','Movimientos'])
-    return df.to_json(date_format='iso', orient='split')
+    return df
 
 
 def _system_prompt() -> str:
@@ -164,13 +164,13 @@ def _system_prompt() -> str:
     )
 
 
-def _build_context_from_df(data_json: str, max_rows: int = 1000) -> str:
+def _build_context_from_df(df: pd.DataFrame, max_rows: int = 1000) -> str:
     """Construye un resumen textual del DataFrame (agregado básico) para dar contexto a la IA.
     Usamos agregaciones clave para mantener tokens controlados.
     """
-    if not data_json:
+    if df is None:
         return "No hay datos disponibles."
-    df = pd.read_json(io.StringIO(data_json), orient='split')
+    df = df.copy()
     # Tipos y limpieza
     if 'Fecha' in df.columns:
         df['Fecha'] = pd.to_datetime(df['Fecha'], errors='coerce')
@@ -206,7 +206,7 @@ def _build_context_from_df(data_json: str, max_rows: int = 1000) -> str:
 
 
 def _build_rich_context_from_df(
-    data_json: str,
+    df: pd.DataFrame,
     max_periods: int = 12,
     top_bancos: int = 6,
     max_lines: int = 1500,
@@ -216,10 +216,9 @@ def _build_rich_context_from_df(
 
     Tamaño controlado: limita últimos `max_periods` y top `top_bancos` por SL reciente.
     """
-    if not data_json:
+    if df is None or df.empty:
         return "Contexto avanzado: no hay datos disponibles."
-
-    df = pd.read_json(io.StringIO(data_json), orient='split')
+    df = df.copy()
     if df.empty:
         return "Contexto avanzado: no hay datos disponibles."
 
@@ -373,7 +372,7 @@ def register(app):
         prevent_initial_call=False
     )
     def _snapshot_on_tab(_):
-        return _df_snapshot_json()
+        return datos_bancos.publicar('chat_ai', _df_snapshot)
 
     # Chat: limpiar o enviar en un solo callback (evita salidas duplicadas)
     @app.callback(
@@ -387,7 +386,7 @@ def register(app):
         State('ai-temp','value'),
         prevent_initial_call=True
     )
-    def _chat(send_clicks, clear_clicks, user_text, conv, data_json, model, temp):
+    def _chat(send_clicks, clear_clicks, user_text, conv, token, model, temp):
         trig = ctx.triggered_id if ctx else None
         conv = conv or []
 
@@ -402,9 +401,12 @@ def register(app):
                 return conv
 
             # Contextos de datos (resúmenes agregados) para grounding
-            context_text = _build_context_from_df(data_json)
-            context_text_adv = _build_rich_context_from_df(data_json)
-            context_text_bancos = _build_context_bancos(data_json)
+            df = datos_bancos.resolver(token)
+            context_text = _build_context_from_df(df)
+            context_text_adv = _build_rich_context_from_df(df)
+            context_text_bancos = _build_context_bancos(df)
+            # Los agentes de API reciben el JSON; se genera solo aquí, al enviar una pregunta
+            data_json = df.to_json(date_format='iso', orient='split') if df is not None else None
 
             # Orquestación AGNO: decidir agente y obtener análisis especializado como grounding extra
             orch_result = _ORCH.handle_query(
@@ -0,0 +1,461 @@
+"""Acceso compartido a los datos de SALDO BANCOS para todos los dashboards.
+
+Antes cada dashboard tenía su propio cargar_datos() y cada layout() volvía a leer todos
+los libros de la carpeta. Aquí cada libro se lee y se normaliza a lo sumo una vez por
+(ruta, mtime, tamaño) y el resultado queda en memoria (un DataFrame por archivo):
+
+- en cada consulta solo se hace un stat() por archivo; los nuevos o modificados se leen,
+  los borrados salen de la caché;
+- las vistas agregadas (p. ej. movimientos por cuenta) se guardan con la firma de la
+  carpeta y solo se recalculan cuando algún archivo cambió;
+- si el pipeline publica una generación nueva mientras se consulta, se repite la consulta
+  (ver COMUN/atomico.py).
+
+Además cada libro normalizado se guarda en disco (Parquet, en _cache_bancos/) con el hash
+de su contenido y la versión del lector en el nombre. Al reiniciar la app solo se leen
+esos Parquet; Excel se vuelve a parsear únicamente para los libros nuevos o modificados.
+El hash sale del manifiesto del pipeline si el tamaño y el mtime coinciden (sin releer el
+archivo). Sin pyarrow la caché en disco se omite y todo funciona igual.
+
+Los libros que sí hay que parsear (arranque sin caché, varios cortes nuevos) se reparten
+en un pool de procesos: openpyxl es Python puro y con hilos no se gana nada. Los errores
+de cada libro se siguen informando uno por uno desde el proceso principal.
+
+Las vistas se entregan como copia: los callbacks pueden modificarlas sin tocar la caché.
+Con copia=False se entrega la guardada, para quien solo la lee o la rebana (p. ej. el cubo
+que se publica).
+
+Los dcc.Store de los dashboards no llevan el dataset en JSON sino un token de versión
+("nombre:n", ver `publicar`); cada callback lo resuelve aquí (`resolver`) al DataFrame ya
+tipado que queda en el servidor, sin mandar megabytes al navegador ni volver a parsearlos.
+El token solo cambia cuando cambia la firma de la carpeta (archivos, mtime y tamaño) con
+que se calculó el dataset; no se comparan los DataFrames.
+Lo que se publica es el cubo Empresa × Banco × Cuenta × Fecha (y su resumen mensual), que
+se calcula una vez por versión de los datos; los callbacks solo lo rebanan y suman.
+"""
+import json
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parent
+SALDO_BANCOS_DIR = BASE_DIR.parent / 'INFORME BANCOS' / 'SALDO BANCOS'
+
+# Raíz del proyecto en sys.path para usar COMUN (copias columnares de SALDO BANCOS)
+if str(BASE_DIR.parent) not in sys.path:
+    sys.path.append(str(BASE_DIR.parent))
+from COMUN.staging import leer as leer_saldo, PYARROW_OK
+from COMUN.atomico import cargar_consistente, reemplazar
+from COMUN.manifiesto import hash_archivo
+
+if not SALDO_BANCOS_DIR.exists():
+    raise FileNotFoundError(f'No se encontró la carpeta de datos: {SALDO_BANCOS_DIR}')
+
+# Columnas que componen Movimientos
+MOV_COLS = [
+    'ABR - Notas contables',
+    'Ajustes y Reclasificaciones',
+    'CE CHEQUES',
+    'CE TRANSF',
+    'Comprobante de Egreso',
+    'Cuenta Por Pagar',
+    'Comprobante de Ingreso',
+    'Documento de Cartera Reversado',
+    'Gastos Bancarios',
+    'GASTOS BANCARIOS AUTOMATICOS',
+    'Legalizacion de anticipos',
+    'Prestamos',
+    'Traslado de Fondos',
+]
+
+# Caché en disco de los libros normalizados: "<hash del contenido>-v<VERSION_LECTOR>.parquet"
+CACHE_DIR = BASE_DIR / '_cache_bancos'
+# Subir al cambiar normalizar() o MOV_COLS: lo guardado con otra versión deja de usarse
+VERSION_LECTOR = 1
+# Libro que no aplica (p. ej. una exportación cruda): se guarda un marcador vacío
+_OMITIDO = '.omitido'
+# Procesos para parsear libros; CONTA_PROCESOS_GRAFICOS=1 fuerza la lectura en serie
+PROCESOS = int(os.environ.get('CONTA_PROCESOS_GRAFICOS') or 0) or os.cpu_count() or 1
+
+COLUMNAS_MOVIMIENTOS = ['Empresa','Fecha','Fecha Inicial','Banco','Cuenta','Adiciones','Salidas',
+                        'Saldo Inicial','Movimientos','Saldo Libros','Variacion']
+
+# ruta -> ((mtime, tamaño), clave en disco, DataFrame normalizado o None si el libro no aplica)
+_archivos = {}
+# nombre del dataset -> (función de carga, [(token, firma, DataFrame)] de la más antigua a la más reciente)
+_publicados = {}
+# Versiones que se conservan por dataset (otras pestañas del navegador pueden tener un token anterior)
+_VERSIONES = 4
+# clave de la vista -> (firma de la carpeta, DataFrame)
+_vistas = {}
+# Dash atiende callbacks en varios hilos: la caché se actualiza de a uno
+_cerrojo = threading.RLock()
+# Firma de la carpeta de la última vista que entregó `vista` en este hilo (ver publicar)
+_leida = threading.local()
+
+
+def _huella(f: Path):
+    st = f.stat()
+    return st.st_mtime_ns, st.st_size
+
+
+def _buscar_columnas(raw: pd.DataFrame) -> dict:
+    """Columnas del libro que corresponden a cada nombre normalizado (None si no está)."""
+    cols_map = {c.lower().strip(): c for c in raw.columns}
+    encontradas = {'Empresa': cols_map.get('empresa'), 'Fecha': cols_map.get('fecha')}
+    # Cuenta puede venir como 'Cuenta' o 'Cuenta bancaria'
+    encontradas['Cuenta'] = next((c for c in raw.columns if c.strip().lower() in
+                                  ('cuenta','cuenta bancaria','nombre cuenta','cuenta banco')), None)
+    # Banco: priorizar coincidencia EXACTA 'Banco'; evitar tomar columnas de cuenta que contengan 'banc'
+    encontradas['Banco'] = (next((c for c in raw.columns if c.strip().lower() == 'banco'), None)
+                            or next((c for c in raw.columns if 'banco' in c.strip().lower()
+                                     and 'cuenta' not in c.strip().lower()), None))
+    encontradas['Saldo Inicial'] = next((c for c in raw.columns if c.strip().lower().replace(' ','')
+                                         in ('saldoinicial','saldo_inicial')), None)
+    encontradas['Saldo Libros'] = next((c for c in raw.columns if c.strip().lower().replace(' ','')
+                                        in ('saldolibros','saldo_libros')), None)
+    encontradas['Fecha Inicial'] = next((c for c in raw.columns if c.strip().lower().replace('í','i')
+                                         == 'fecha inicial'), None)
+    return encontradas
+
+
+def _numero(serie: pd.Series) -> pd.Series:
+    # Limpieza numérica: SOLO cambiar coma decimal a punto, NO eliminar puntos (para no perder decimales)
+    texto = (serie.astype(str)
+                  .str.strip()
+                  .str.replace('\u00a0','', regex=False)  # espacios duros
+                  .str.replace(',', '.', regex=False))
+    return pd.to_numeric(texto, errors='coerce').astype(float)
+
+
+def normalizar(raw: pd.DataFrame):
+    """Libro leído con dtype=str → DataFrame tipado con Empresa, Fecha, Fecha Inicial, Banco,
+    Cuenta, Saldo Inicial, Saldo Libros, Adiciones, Salidas y Movimientos (las que existan).
+    None si al libro le faltan Empresa, Fecha o Saldo Libros (p. ej. una exportación cruda)."""
+    cols = _buscar_columnas(raw)
+    if not (cols['Empresa'] and cols['Fecha'] and cols['Saldo Libros']):
+        return None
+    renombres = {origen: destino for destino, origen in cols.items() if origen}
+    df = raw[list(renombres)].rename(columns=renombres)
+    for col in ['Saldo Inicial','Saldo Libros']:
+        if col in df.columns:
+            df[col] = _numero(df[col])
+    # Calcular Movimientos + Adiciones (positivos) y Salidas (negativos)
+    movs = []
+    for mc in MOV_COLS:
+        # buscar case-insensitive
+        found = next((c for c in raw.columns if c.strip().lower() == mc.strip().lower()), None)
+        if found:
+            movs.append(found)
+    if movs:
+        movimientos_src = pd.DataFrame({c: _numero(raw[c]) for c in movs}, index=raw.index)
+        df['Adiciones'] = movimientos_src.clip(lower=0).sum(axis=1, min_count=1)
+        df['Salidas'] = movimientos_src.clip(upper=0).sum(axis=1, min_count=1)
+        df['Movimientos'] = movimientos_src.sum(axis=1, min_count=1)
+    else:
+        df['Adiciones'] = 0.0
+        df['Salidas'] = 0.0
+        df['Movimientos'] = 0.0
+    df['Fecha'] = pd.to_datetime(df['Fecha'], dayfirst=True, errors='coerce')
+    if 'Fecha Inicial' in df.columns:
+        df['Fecha Inicial'] = pd.to_datetime(df['Fecha Inicial'], dayfirst=True, errors='coerce')
+    return df.dropna(subset=['Fecha'])
+
+
+class _Manifiesto:
+    """Hashes del manifiesto del pipeline, leído solo si hace falta y una vez por consulta."""
+
+    def __init__(self):
+        self._archivos = None
+
+    def hash(self, f: Path, huella):
+        if self._archivos is None:
+            try:
+                with open(SALDO_BANCOS_DIR / '_manifiesto.json', 'r', encoding='utf-8') as fh:
+                    self._archivos = json.load(fh).get('archivos', {})
+            except (OSError, ValueError):
+                self._archivos = {}
+        registro = self._archivos.get(f.name, {})
+        if registro.get('hash') and (registro.get('mtime'), registro.get('tamano')) == huella:
+            return registro['hash']
+        return hash_archivo(f)
+
+
+def _desde_disco(clave):
+    """(True, DataFrame o None) si la clave está en la caché en disco; (False, None) si no."""
+    if not PYARROW_OK:
+        return False, None
+    if (CACHE_DIR / f'{clave}{_OMITIDO}').exists():
+        return True, None
+    ruta = CACHE_DIR / f'{clave}.parquet'
+    if not ruta.exists():
+        return False, None
+    try:
+        return True, pd.read_parquet(ruta)
+    except Exception as e:
+        print(f'⚠️ Caché ilegible {ruta.name}, se vuelve a leer el libro: {e}')
+        return False, None
+
+
+def _a_disco(clave, df):
+    if not PYARROW_OK:
+        return
+    try:
+        CACHE_DIR.mkdir(exist_ok=True)
+        if df is None:
+            (CACHE_DIR / f'{clave}{_OMITIDO}').touch()
+            return
+        with reemplazar(CACHE_DIR / f'{clave}.parquet') as temporal:
+            df.to_parquet(temporal, index=False)
+    except Exception as e:
+        print(f'⚠️ No se pudo guardar la caché {clave}: {e}')
+
+
+def _podar(claves):
+    """Borra de la caché en disco lo que ya no corresponde a ningún libro de la carpeta."""
+    if not CACHE_DIR.exists():
+        return
+    for ruta in CACHE_DIR.iterdir():
+        if ruta.suffix in ('.parquet', _OMITIDO) and ruta.stem not in claves:
+            try:
+                ruta.unlink()
+            except OSError:
+                pass
+
+
+def _parsear(ruta):
+    """Tarea del pool: (libro normalizado o None si no aplica, mensaje de error o None)."""
+    try:
+        df = normalizar(leer_saldo(Path(ruta), dtype=str))  # usa la copia columnar si está vigente
+    except Exception as e:
+        return None, str(e)
+    return (None if df is None else df.reset_index(drop=True)), None
+
+
+def _parsear_todos(rutas):
+    """Resultados de `_parsear` en el orden de `rutas`; con más de un libro, en paralelo."""
+    procesos = min(PROCESOS, len(rutas))
+    # Dentro de un proceso hijo (p. ej. un worker del pool) no se abre otro pool
+    if procesos <= 1 or multiprocessing.parent_process() is not None:
+        return [_parsear(r) for r in rutas]
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        return list(pool.map(_parsear, rutas))
+
+
+def _actualizar():
+    """Lee solo los libros nuevos o modificados. Retorna (firma de la carpeta, frames en orden)."""
+    archivos = sorted(f for f in SALDO_BANCOS_DIR.glob('*.xlsx') if not f.name.startswith('~$'))
+    manifiesto = _Manifiesto()
+    vigentes, por_parsear, nuevos = {}, [], False
+    for f in archivos:
+        try:
+            huella = _huella(f)
+            previo = _archivos.get(f)
+            if previo is None or previo[0] != huella:
+                # La huella se toma antes de leer: si el archivo cambia mientras se lee, se relee después
+                clave = f'{manifiesto.hash(f, huella)}-v{VERSION_LECTOR}'
+                encontrado, df = _desde_disco(clave)
+                previo = (huella, clave, df)
+                nuevos = True
+                if not encontrado:
+                    por_parsear.append(f)
+        except OSError:
+            continue  # se borró o se reemplazó entre el glob y la lectura
+        vigentes[f] = previo
+    for f, (df, error) in zip(por_parsear, _parsear_todos([str(f) for f in por_parsear])):
+        huella, clave, _ = vigentes[f]
+        if error is not None:
+            print(f'⚠️ Error leyendo {f.name}: {error}')
+            continue  # sin caché en disco: se vuelve a intentar cuando el archivo cambie
+        vigentes[f] = (huella, clave, df)
+        _a_disco(clave, df)
+    if nuevos or len(vigentes) != len(_archivos):
+        _podar({clave for _, clave, _ in vigentes.values()})
+    _archivos.clear()
+    _archivos.update(vigentes)
+    firma = tuple((f.name, huella) for f, (huella, _, _) in vigentes.items())
+    return firma, [df for _, _, df in vigentes.values() if df is not None]
+
+
+def _calculada(clave, construir, firma, datos):
+    guardada = _vistas.get(clave)
+    if guardada is None or guardada[0] != firma:
+        guardada = _vistas[clave] = (firma, construir(datos))
+    return guardada[1]
+
+
+def vista(clave, construir, base=None, copia=True) -> pd.DataFrame:
+    """`construir(frames)` sobre los libros normalizados, recalculado solo si la carpeta cambió.
+    Con `base=(clave, construir)` recibe esa otra vista (también en caché) en vez de los libros.
+    Con copia=False se entrega la guardada: solo para quien no la modifica."""
+    def cargar():
+        with _cerrojo:
+            firma, frames = _actualizar()
+            datos = frames if base is None else _calculada(*base, firma, frames)
+            _leida.firma = firma
+            return _calculada(clave, construir, firma, datos)
+    # Si el pipeline publica una generación nueva mientras se lee, se vuelve a leer
+    df = cargar_consistente(SALDO_BANCOS_DIR, cargar)
+    return df.copy() if copia else df
+
+
+# ------------------ Vistas compartidas ------------------
+
+def _movimientos(frames, orden) -> pd.DataFrame:
+    frames = [df for df in frames if 'Cuenta' in df.columns and 'Saldo Inicial' in df.columns]
+    if not frames:
+        return pd.DataFrame(columns=COLUMNAS_MOVIMIENTOS)
+    base = ['Empresa','Fecha','Fecha Inicial','Banco','Cuenta','Saldo Inicial','Adiciones','Salidas','Movimientos','Saldo Libros']
+    data = pd.concat([df[[c for c in base if c in df.columns]] for df in frames], ignore_index=True)
+    # Agregar (sumar) por Empresa, Fecha Final, Fecha Inicial (si existe), Banco y Cuenta
+    group_cols = [c for c in ['Empresa','Fecha','Fecha Inicial','Banco','Cuenta'] if c in data.columns]
+    agg_map = {'Adiciones':'sum','Salidas':'sum','Saldo Inicial':'sum','Movimientos':'sum','Saldo Libros':'sum'}
+    data = data.groupby(group_cols, as_index=False).agg(agg_map)
+    # Variación (%): Movimientos / Saldo Inicial * 100. Evitar división por cero.
+    data['Variacion'] = np.where((data['Saldo Inicial'] != 0) & (~data['Saldo Inicial'].isna()),
+                                 (data['Movimientos'] / data['Saldo Inicial']) * 100,
+                                 float('nan'))
+    sort_cols = [c for c in orden if c in data.columns]
+    data.sort_values(sort_cols, inplace=True)
+    return data
+
+
+def movimientos_por_cuenta(orden=('Fecha','Empresa','Banco','Cuenta'), copia=True) -> pd.DataFrame:
+    """Agregado por ['Empresa','Fecha','Fecha Inicial','Banco','Cuenta'] (las que existan) con
+    Adiciones, Salidas, Saldo Inicial, Movimientos, Saldo Libros y Variacion, ordenado por `orden`."""
+    orden = tuple(orden)
+    return vista(('movimientos', orden), lambda frames: _movimientos(frames, orden), copia=copia)
+
+
+# ------------------ Datasets publicados (token en dcc.Store) ------------------
+
+def _cargar(cargar):
+    """(DataFrame, firma de la carpeta con que se calculó); firma None si `cargar` no pasó por `vista`."""
+    _leida.firma = None
+    df = cargar()
+    return df, _leida.firma
+
+
+def _guardar_version(nombre, cargar, df, firma):
+    """Guarda `df` como versión más reciente de `nombre` y retorna su token."""
+    _, versiones = _publicados.get(nombre, (cargar, []))
+    if versiones and (versiones[-1][2] is df or (firma is not None and versiones[-1][1] == firma)):
+        token = versiones[-1][0]  # misma carpeta: el navegador conserva el mismo token
+    else:
+        numero = int(versiones[-1][0].rsplit(':', 1)[1]) + 1 if versiones else 1
+        token = f'{nombre}:{numero}'
+        versiones = (versiones + [(token, firma, df)])[-_VERSIONES:]
+    _publicados[nombre] = (cargar, versiones)
+    return token
+
+
+def publicar(nombre, cargar) -> str:
+    """Carga el dataset con `cargar()`, lo deja en el servidor y retorna el token de versión
+    que va en el dcc.Store (unos bytes en lugar del DataFrame en JSON). `cargar` debe
+    depender solo de los libros de la carpeta (a través de `vista`): el token cambia cuando
+    cambia la firma de la carpeta."""
+    df, firma = _cargar(cargar)
+    with _cerrojo:
+        return _guardar_version(nombre, cargar, df, firma)
+
+
+def resolver(token, copia=True):
+    """DataFrame del token, o None si el Store está vacío. Si la versión ya no está (se
+    reinició el servidor o la desplazaron otras más nuevas) se vuelve a cargar.
+    Con copia=False se entrega el guardado: solo para callbacks que lo rebanan sin modificarlo."""
+    if not token:
+        return None
+    nombre = token.rsplit(':', 1)[0]
+    with _cerrojo:
+        cargar, versiones = _publicados.get(nombre, (None, []))
+        for guardado, _, df in versiones:
+            if guardado == token:
+                return df.copy() if copia else df
+    if cargar is None:
+        return None  # nadie ha publicado este dataset en este proceso
+    df, firma = _cargar(cargar)
+    with _cerrojo:
+        _guardar_version(nombre, cargar, df, firma)
+    return df.copy() if copia else df
+
+
+# ------------------ Cubo Empresa × Banco × Cuenta × Fecha ------------------
+
+DIMENSIONES_CUBO = ['Empresa','Fecha','Fecha Inicial','Banco','Cuenta']
+MEDIDAS_CUBO = ['Adiciones','Salidas','Saldo Inicial','Movimientos','Saldo Libros']
+
+
+def _cubo(frames) -> pd.DataFrame:
+    """Medidas sumadas por Empresa × Fecha × Fecha Inicial × Banco × Cuenta, con el mes de cada
+    fecha ('Mes', 'Mes Inicial'), la marca 'CXP' y las marcas de apertura y cierre de mes.
+    Los libros sin alguna columna (Cuenta, Saldo Inicial, ...) entran con ella vacía y las
+    filas sin banco quedan como 'Sin Banco'."""
+    columnas = DIMENSIONES_CUBO + MEDIDAS_CUBO
+    if not frames:
+        return pd.DataFrame(columns=columnas + ['Mes','Mes Inicial','CXP','Apertura','Cierre'])
+    data = pd.concat([df[[c for c in columnas if c in df.columns]] for df in frames],
+                     ignore_index=True).reindex(columns=columnas)
+    # Columnas que no trae ningún libro: vacías, pero con el tipo que esperan .dt y .str
+    data['Fecha Inicial'] = pd.to_datetime(data['Fecha Inicial'])
+    data['Cuenta'] = data['Cuenta'].astype(object)
+    data['Banco'] = data['Banco'].fillna('Sin Banco')
+    # min_count=1: una celda sin ningún valor (p. ej. sin Saldo Libros) queda vacía, no en cero
+    cubo = data.groupby(DIMENSIONES_CUBO, as_index=False, dropna=False)[MEDIDAS_CUBO].sum(min_count=1)
+    cubo['Mes'] = cubo['Fecha'].dt.to_period('M').astype(str)
+    cubo['Mes Inicial'] = cubo['Fecha Inicial'].dt.to_period('M').astype(str).where(cubo['Fecha Inicial'].notna())
+    cubo['CXP'] = cubo['Cuenta'].str.contains('CXP', case=False, na=False)
+    # Como en la evolución mensual (sin CXP): el saldo de apertura es el de la primera fecha
+    # inicial del mes y el de cierre el del último corte del mes, por Empresa/Banco
+    validas = cubo[~cubo['CXP']]
+    primera = validas.groupby(['Empresa','Banco','Mes Inicial'])['Fecha Inicial'].transform('min')
+    ultima = validas.groupby(['Empresa','Banco','Mes'])['Fecha'].transform('max')
+    cubo['Apertura'] = (validas['Fecha Inicial'] == primera).reindex(cubo.index, fill_value=False)
+    cubo['Cierre'] = (validas['Fecha'] == ultima).reindex(cubo.index, fill_value=False)
+    cubo.sort_values(['Fecha','Empresa','Banco','Cuenta'], inplace=True, kind='stable')
+    return cubo.reset_index(drop=True)
+
+
+def _cubo_mensual(cubo) -> pd.DataFrame:
+    """Empresa × Banco × Mes sin CXP: Saldo Apertura, Saldo Cierre y los totales del mes.
+    Las celdas sin apertura (o sin cortes) en ese mes quedan vacías, no en cero."""
+    cubo = cubo[~cubo['CXP']]
+    claves = ['Empresa','Banco','Mes']
+    apertura = (cubo[cubo['Apertura']].groupby(['Empresa','Banco','Mes Inicial'])['Saldo Inicial'].sum()
+                .rename('Saldo Apertura').rename_axis(claves))
+    cierre = cubo[cubo['Cierre']].groupby(claves)['Saldo Libros'].sum().rename('Saldo Cierre')
+    totales = cubo.groupby(claves)[['Saldo Inicial','Movimientos','Saldo Libros']].sum()
+    mensual = pd.concat([apertura, cierre, totales], axis=1)
+    mensual.index.names = claves
+    return mensual.sort_index().reset_index()
+
+
+def cubo() -> pd.DataFrame:
+    """Cubo de saldos y movimientos (ver _cubo), ordenado por Fecha; se calcula una vez por
+    versión de la carpeta y los callbacks solo lo rebanan y suman (se entrega sin copiar)."""
+    return vista('cubo', _cubo, copia=False)
+
+
+def cubo_mensual() -> pd.DataFrame:
+    """Resumen mensual Empresa × Banco × Mes del cubo (evolución y radares por banco)."""
+    return vista('cubo_mensual', _cubo_mensual, base=('cubo', _cubo), copia=False)
+
+
+def rebanar(cubo, fecha=None, empresas=None, bancos=None, sin_cxp=False) -> pd.DataFrame:
+    """Filas del cubo para los filtros de los dashboards. La fecha se busca por rango sobre
+    el cubo ordenado (todas las horas de ese día), sin recorrer el resto del historial."""
+    if fecha is not None:
+        desde = pd.Timestamp(fecha).normalize()
+        inicio, fin = cubo['Fecha'].searchsorted([desde, desde + pd.Timedelta(days=1)])
+        cubo = cubo.iloc[inicio:fin]
+    if sin_cxp:
+        cubo = cubo[~cubo['CXP']]
+    if empresas:
+        cubo = cubo[cubo['Empresa'].isin(empresas)]
+    if bancos:
+        cubo = cubo[cubo['Banco'].isin(bancos)]
+    return cubo
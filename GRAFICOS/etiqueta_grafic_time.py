@@ -1,10 +1,10 @@
 from __future__ import annotations
 
 from typing import Optional, List
-import io
 import pandas as pd
 from dash import dcc, html, Input, Output
 import plotly.graph_objects as go
+import datos_bancos
 
 
 def layout():
@@ -220,21 +220,12 @@ def register(app):
         Input('gt-empresa-dropdown', 'value'),
         Input('gt-banco-dropdown', 'value'),
     )
-    def actualizar_radars(hoverData, data_json: Optional[str], empresas_sel, bancos_sel):
-        if not data_json:
+    def actualizar_radars(hoverData, token: Optional[str], empresas_sel, bancos_sel):
+        # Mismo resumen mensual del cubo que grafic_time (Empresa × Banco × Mes, en el servidor)
+        df = datos_bancos.resolver(token, copia=False)  # solo se rebana
+        if df is None:
             return _empty_polar('Sin datos'), _empty_polar('Sin datos')
 
-        # Reconstruir DF como en grafic_time
-        df = pd.read_json(io.StringIO(data_json), orient='split')
-        if 'Fecha' in df.columns:
-            df['Fecha'] = pd.to_datetime(df['Fecha'], errors='coerce')
-        if 'Fecha Inicial' in df.columns:
-            df['Fecha Inicial'] = pd.to_datetime(df['Fecha Inicial'], errors='coerce')
-        for c in ['Saldo Libros', 'Saldo Inicial', 'Movimientos']:
-            if c in df.columns:
-                df[c] = pd.to_numeric(df[c], errors='coerce')
-        df = df.dropna(subset=['Fecha'])
-
         # Filtros por dropdown (igual que en grafic_time)
         if empresas_sel:
             df = df[df['Empresa'].isin(empresas_sel)]
@@ -243,11 +234,6 @@ def register(app):
         if df.empty:
             return _empty_polar('Sin datos tras filtros'), _empty_polar('Sin datos tras filtros')
 
-        # Construir periodos
-        df['PeriodoLib'] = df['Fecha'].dt.to_period('M').astype(str)
-        if 'Fecha Inicial' in df.columns:
-            df['PeriodoIni'] = df['Fecha Inicial'].dt.to_period('M').astype(str)
-
         # Determinar periodo a partir del hover (x)
         periodo_sel = None
         try:
@@ -258,33 +244,18 @@ def register(app):
 
         # Fallback: usar último periodo disponible
         if not periodo_sel:
-            cats = set(df['PeriodoLib'].dropna().unique()) if 'PeriodoLib' in df.columns else set()
-            if 'PeriodoIni' in df.columns:
-                cats = cats.union(set(df['PeriodoIni'].dropna().unique()))
+            cats = set(df['Mes'].dropna().unique())
             if not cats:
                 return _empty_polar('Sin datos'), _empty_polar('Sin datos')
             periodo_sel = sorted(cats)[-1]
 
-        # AGRUPACIONES por banco siguiendo la misma lógica del gráfico madre
-        # Inicial: primer día por Empresa/Banco/PeriodoIni
-        ini_por_banco = pd.Series(dtype=float)
-        if 'PeriodoIni' in df.columns and 'Saldo Inicial' in df.columns:
-            dfi = df.dropna(subset=['PeriodoIni', 'Fecha Inicial']).copy()
-            dfi = dfi[dfi['PeriodoIni'] == periodo_sel]
-            if not dfi.empty:
-                min_dates = dfi.groupby(['Empresa', 'Banco', 'PeriodoIni'])['Fecha Inicial'].transform('min')
-                dfi_firstday = dfi[dfi['Fecha Inicial'] == min_dates]
-                ini_por_banco = dfi_firstday.groupby('Banco')['Saldo Inicial'].sum()
-
-        # Libros: último día por Empresa/Banco/PeriodoLib
-        lib_por_banco = pd.Series(dtype=float)
-        if 'Saldo Libros' in df.columns:
-            dfl = df.dropna(subset=['PeriodoLib', 'Fecha']).copy()
-            dfl = dfl[dfl['PeriodoLib'] == periodo_sel]
-            if not dfl.empty:
-                max_dates = dfl.groupby(['Empresa', 'Banco', 'PeriodoLib'])['Fecha'].transform('max')
-                dfl_lastday = dfl[dfl['Fecha'] == max_dates]
-                lib_por_banco = dfl_lastday.groupby('Banco')['Saldo Libros'].sum()
+        # AGRUPACIONES por banco siguiendo la misma lógica del gráfico madre: el mes
+        # seleccionado del cubo mensual (apertura = primer día, cierre = último corte)
+        dfm = df[df['Mes'] == periodo_sel]
+        # Inicial: primer día por Empresa/Banco del mes
+        ini_por_banco = dfm.dropna(subset=['Saldo Apertura']).groupby('Banco')['Saldo Apertura'].sum()
+        # Libros: último corte por Empresa/Banco del mes
+        lib_por_banco = dfm.dropna(subset=['Saldo Cierre']).groupby('Banco')['Saldo Cierre'].sum()
 
         # Preparar ejes del radar (bancos) y valores en el mismo orden
         bancos_cats = sorted(set(ini_por_banco.index).union(set(lib_por_banco.index)))
@@ -1,99 +1,44 @@
+import sys
 from pathlib import Path
 import pandas as pd
 from dash import dcc, html, Input, Output
 import plotly.express as px
 import plotly.graph_objects as go
+import datos_bancos
 
 # ------------------ Configuración de rutas ------------------
 BASE_DIR = Path(__file__).resolve().parent
 SALDO_BANCOS_DIR = BASE_DIR.parent / 'INFORME BANCOS' / 'SALDO BANCOS'
 
+# Raíz del proyecto en sys.path para usar COMUN (índice de periodos de SALDO BANCOS)
+if str(BASE_DIR.parent) not in sys.path:
+    sys.path.append(str(BASE_DIR.parent))
+from COMUN.periodos import fechas_corte
+
 if not SALDO_BANCOS_DIR.exists():
     raise FileNotFoundError(f'No se encontró la carpeta de datos: {SALDO_BANCOS_DIR}')
 
 # ------------------ Carga de datos ------------------
 
 def cargar_datos() -> pd.DataFrame:
-    """Carga y normaliza datos incluyendo Saldo Libros y Banco.
-    Retorna columnas: Empresa, Fecha (datetime), Banco, Saldo Libros, Saldo Inicial (opcional)."""
-    archivos = [f for f in SALDO_BANCOS_DIR.glob('*.xlsx') if not f.name.startswith('~$')]
-    if not archivos:
-        return pd.DataFrame(columns=['Empresa', 'Fecha', 'Banco', 'Saldo Libros', 'Saldo Inicial'])
-    frames = []
-    for f in archivos:
-        try:
-            df = pd.read_excel(f, dtype=str)
-            col_empresa = None
-            col_fecha = None
-            col_saldo_libros = None
-            col_saldo_inicial = None
-            col_banco = None
-            col_cuenta = None
-            for c in df.columns:
-                key = c.strip().lower().replace('\u00a0','')
-                if key == 'empresa':
-                    col_empresa = c
-                elif key == 'fecha':
-                    col_fecha = c
-                elif key in ('saldo libros','saldolibros','saldo_libros'):
-                    col_saldo_libros = c
-                elif key in ('saldo inicial','saldoinicial','saldo_inicial'):
-                    col_saldo_inicial = c
-                elif key in ('banco','nombrebanco','nombre banco','cuenta bancaria','cuentabancaria') and col_banco is None:
-                    col_banco = c
-                elif key in ('cuenta','cuenta bancaria','cuentabanco','cuentabancaria','nombre cuenta') and col_cuenta is None:
-                    col_cuenta = c
-            if not (col_empresa and col_fecha and col_saldo_libros):
-                continue
-            if not col_banco:
-                # Si no hay banco, crear una columna default
-                df['__BancoTmp__'] = 'Sin Banco'
-                col_banco = '__BancoTmp__'
-            cols_select = [col_empresa, col_fecha, col_banco, col_saldo_libros] + ([col_saldo_inicial] if col_saldo_inicial else []) + ([col_cuenta] if col_cuenta else [])
-            sub = df[cols_select].rename(columns={
-                col_empresa: 'Empresa',
-                col_fecha: 'Fecha',
-                col_banco: 'Banco',
-                col_saldo_libros: 'Saldo Libros',
-                **({col_saldo_inicial: 'Saldo Inicial'} if col_saldo_inicial else {}),
-                **({col_cuenta: 'Cuenta'} if col_cuenta else {})
-            })
-            # Limpieza numérica
-            for cnum in [c for c in ['Saldo Libros','Saldo Inicial'] if c in sub.columns]:
-                sub[cnum] = (sub[cnum].astype(str)
-                                    .str.strip()
-                                    .str.replace('\u00a0','', regex=False)
-                                    .str.replace(',', '.', regex=False))
-                sub[cnum] = pd.to_numeric(sub[cnum], errors='coerce')
-                sub[cnum] = sub[cnum].astype(float)
-            sub['Fecha'] = pd.to_datetime(sub['Fecha'], dayfirst=True, errors='coerce')
-            sub.dropna(subset=['Fecha', 'Saldo Libros'], inplace=True)
-            # Filtrar cuentas que contengan 'CXP'
-            if 'Cuenta' in sub.columns:
-                sub = sub[~sub['Cuenta'].str.contains('CXP', case=False, na=False)]
-            if sub.empty:
-                continue
-            frames.append(sub[['Empresa','Fecha','Banco'] + ([ 'Saldo Inicial'] if 'Saldo Inicial' in sub.columns else []) + ['Saldo Libros']])
-        except Exception as e:
-            print(f'⚠️ Error leyendo {f.name}: {e}')
-    if not frames:
-        return pd.DataFrame(columns=['Empresa', 'Fecha', 'Banco', 'Saldo Libros', 'Saldo Inicial'])
-    data = pd.concat(frames, ignore_index=True)
-    # Agregar sumas por Empresa, Fecha, Banco
-    agg_cols = {'Saldo Libros':'sum'}
-    if 'Saldo Inicial' in data.columns:
-        agg_cols['Saldo Inicial'] = 'sum'
-    data = (data.groupby(['Empresa','Fecha','Banco'], as_index=False)
-                 .agg(agg_cols))
-    data.sort_values(['Fecha','Empresa','Banco'], inplace=True)
-    return data
+    """Filas del cubo que grafica el tablero (ver _saldos). Las opciones de los filtros salen
+    de aquí, de los mismos datos que las barras (se entrega sin copiar: solo se lee)."""
+    return _saldos(datos_bancos.cubo())
+
+
+def _saldos(cubo) -> pd.DataFrame:
+    """Filas del cubo con Saldo Libros y sin cuentas CXP (los libros sin banco vienen como 'Sin Banco')."""
+    return cubo[~cubo['CXP'] & cubo['Saldo Libros'].notna()]
 
 # ------------------ Layout ------------------
 
 def layout():
     df = cargar_datos()
     empresas = sorted(df['Empresa'].dropna().unique()) if not df.empty else []
-    fechas = sorted(df['Fecha'].dt.date.unique()) if not df.empty else []
+    # Fechas del índice de periodos (sin recorrer las filas); sin índice, de los datos
+    fechas = fechas_corte(SALDO_BANCOS_DIR)
+    if fechas is None:
+        fechas = sorted(df['Fecha'].dt.date.unique()) if not df.empty else []
     bancos = sorted(df['Banco'].dropna().unique()) if (not df.empty and 'Banco' in df.columns) else []
     # Formateo amigable en español: 'DD de mes de YYYY'
     meses_es = ['enero','febrero','marzo','abril','mayo','junio','julio','agosto','septiembre','octubre','noviembre','diciembre']
@@ -165,8 +110,8 @@ def register(app):
         prevent_initial_call=False
     )
     def refrescar_datos(_):
-        df = cargar_datos()
-        return df.to_json(date_format='iso', orient='split')
+        # En el Store solo va el token del cubo; el cubo queda en el servidor (datos_bancos)
+        return datos_bancos.publicar('cubo', datos_bancos.cubo)
 
     @app.callback(
         Output('grafico-bancos-stacked', 'figure'),
@@ -175,31 +120,25 @@ def register(app):
         Input('empresa-dropdown', 'value'),
         Input('banco-dropdown', 'value')
     )
-    def actualizar_barras(data_json, fecha_sel, empresas_sel, bancos_sel):
-        if not data_json:
+    def actualizar_barras(token, fecha_sel, empresas_sel, bancos_sel):
+        cubo = datos_bancos.resolver(token, copia=False)  # solo se rebana
+        if cubo is None:
             return px.bar(title='Sin datos disponibles')
-        df = pd.read_json(data_json, orient='split')
-        if 'Fecha' in df.columns:
-            df['Fecha'] = pd.to_datetime(df['Fecha'], errors='coerce')
-        df = df.dropna(subset=['Fecha'])
         # Filtro fecha única
+        fecha_dt = None
         if fecha_sel:
             try:
                 fecha_dt = pd.to_datetime([fecha_sel], errors='coerce')[0]
-                df = df[df['Fecha'].dt.normalize() == fecha_dt.normalize()]
+                if pd.isna(fecha_dt):
+                    fecha_dt = None
             except Exception:
                 pass
-        # Filtro empresas
-        if empresas_sel:
-            df = df[df['Empresa'].isin(empresas_sel)]
-        # Filtro bancos
-        if bancos_sel and 'Banco' in df.columns:
-            df = df[df['Banco'].isin(bancos_sel)]
-        if df.empty:
+        # Corte, empresas y bancos sobre el cubo (sin cuentas CXP)
+        df = _saldos(datos_bancos.rebanar(cubo, fecha_dt, empresas_sel, bancos_sel))
+        # Agrupar para gráfico: Empresa × Banco
+        grp = df.groupby(['Empresa','Banco'], as_index=False)['Saldo Libros'].sum()
+        if grp.empty:
             return px.bar(title='Sin datos tras filtros')
-        # Agrupar para gráfico
-        grp = (df.groupby(['Empresa','Banco'], as_index=False)
-                 .agg({'Saldo Libros':'sum'}))
         # Ordenar empresas por total descendente
         totales = grp.groupby('Empresa')['Saldo Libros'].sum().sort_values(ascending=False)
         orden_empresas = list(totales.index)
@@ -1,10 +1,10 @@
 from pathlib import Path
-import io
 import pandas as pd
 from dash import dcc, html, Input, Output
 import plotly.express as px
 import plotly.graph_objects as go
 import cuadro_banc
+import datos_bancos
 import etiqueta_grafic_time as egd
 
 BASE_DIR = Path(__file__).resolve().parent
@@ -100,8 +100,8 @@ def register(app):
         prevent_initial_call=False
     )
     def refrescar(_):
-        df = cargar_datos()
-        return df.to_json(date_format='iso', orient='split')
+        # En el Store solo va el token del resumen mensual del cubo (queda en el servidor)
+        return datos_bancos.publicar('cubo_mensual', datos_bancos.cubo_mensual)
 
     @app.callback(
         Output('grafico-time','figure'),
@@ -109,54 +109,29 @@ def register(app):
         Input('gt-empresa-dropdown','value'),
         Input('gt-banco-dropdown','value')
     )
-    def actualizar(data_json, empresas_sel, bancos_sel):
-        if not data_json:
+    def actualizar(token, empresas_sel, bancos_sel):
+        df = datos_bancos.resolver(token, copia=False)  # solo se rebana
+        if df is None:
             return go.Figure()
-        df = pd.read_json(io.StringIO(data_json), orient='split')
-        if 'Fecha' in df.columns:
-            df['Fecha'] = pd.to_datetime(df['Fecha'], errors='coerce')
-        if 'Fecha Inicial' in df.columns:
-            df['Fecha Inicial'] = pd.to_datetime(df['Fecha Inicial'], errors='coerce')
-        # Asegurar numéricos
-        for c in ['Saldo Libros','Saldo Inicial','Movimientos']:
-            if c in df.columns:
-                df[c] = pd.to_numeric(df[c], errors='coerce')
-        df = df.dropna(subset=['Fecha'])
         if empresas_sel:
             df = df[df['Empresa'].isin(empresas_sel)]
         if bancos_sel:
             df = df[df['Banco'].isin(bancos_sel)]
         if df.empty:
             return go.Figure()
-        # Construir periodos YYYY-MM para agrupar categorías
-        df['PeriodoLib'] = df['Fecha'].dt.to_period('M').astype(str)
-        if 'Fecha Inicial' in df.columns:
-            df['PeriodoIni'] = df['Fecha Inicial'].dt.to_period('M').astype(str)
 
         empresas = sorted(df['Empresa'].unique())
         # Mapear colores por empresa, con paletas distintas para cada serie
         color_map_ini = {emp: PALETTE_INI[i % len(PALETTE_INI)] for i, emp in enumerate(empresas)}
         color_map_lib = {emp: PALETTE_LIB[i % len(PALETTE_LIB)] for i, emp in enumerate(empresas)}
-        # Selección por mes: Inicial = primer día encontrado; Libros = último día encontrado, por Empresa/Banco/mes
-        # Luego, agregar por Empresa para las barras apiladas
-        grp_ini = pd.DataFrame()
-        if 'PeriodoIni' in df.columns and 'Saldo Inicial' in df.columns:
-            dfi = df.dropna(subset=['PeriodoIni', 'Fecha Inicial']).copy()
-            if not dfi.empty:
-                # Obtener la fecha inicial mínima por Empresa/Banco/Periodo
-                min_dates = dfi.groupby(['Empresa', 'Banco', 'PeriodoIni'])['Fecha Inicial'].transform('min')
-                dfi_firstday = dfi[dfi['Fecha Inicial'] == min_dates]
-                # Agregar por periodo y empresa (suma de todas las filas de ese día)
-                grp_ini = dfi_firstday.groupby(['PeriodoIni', 'Empresa'], as_index=False)['Saldo Inicial'].sum()
-        grp_lib = pd.DataFrame()
-        if 'Saldo Libros' in df.columns:
-            dflb = df.dropna(subset=['PeriodoLib', 'Fecha']).copy()
-            if not dflb.empty:
-                # Obtener la fecha máxima por Empresa/Banco/Periodo
-                max_dates = dflb.groupby(['Empresa', 'Banco', 'PeriodoLib'])['Fecha'].transform('max')
-                dfl_lastday = dflb[dflb['Fecha'] == max_dates]
-                # Agregar por periodo y empresa (suma de todas las filas de ese día)
-                grp_lib = dfl_lastday.groupby(['PeriodoLib', 'Empresa'], as_index=False)['Saldo Libros'].sum()
+        # Inicial = primer día del mes, Libros = último corte del mes, por Empresa/Banco: ya vienen
+        # en el cubo mensual (Saldo Apertura / Saldo Cierre); aquí solo se suman por Empresa
+        grp_ini = (df.dropna(subset=['Saldo Apertura'])
+                     .groupby(['Mes', 'Empresa'], as_index=False)['Saldo Apertura'].sum()
+                     .rename(columns={'Mes': 'PeriodoIni', 'Saldo Apertura': 'Saldo Inicial'}))
+        grp_lib = (df.dropna(subset=['Saldo Cierre'])
+                     .groupby(['Mes', 'Empresa'], as_index=False)['Saldo Cierre'].sum()
+                     .rename(columns={'Mes': 'PeriodoLib', 'Saldo Cierre': 'Saldo Libros'}))
         # Categorías unificadas y orden cronológico basadas en subconjuntos filtrados
         cats = set()
         if not grp_lib.empty:
@@ -214,7 +189,9 @@ def register(app):
             tot_lib = grp_lib.groupby('PeriodoLib')['Saldo Libros'].sum().to_dict()
 
         # Línea: Movimientos total por periodo y etiquetas como Variación % (sum(Mov)/sum(Saldo Inicial)*100)
-        period_agg = df.groupby('PeriodoLib', as_index=False).agg({'Movimientos': 'sum', 'Saldo Inicial': 'sum'})
+        period_agg = (df.dropna(subset=['Movimientos'])
+                        .groupby('Mes', as_index=False).agg({'Movimientos': 'sum', 'Saldo Inicial': 'sum'})
+                        .rename(columns={'Mes': 'PeriodoLib'}))
         # Asegurar que los periodos de la línea estén presentes en el orden del eje X
         if not period_agg.empty:
             cats = sorted(set(cats).union(set(period_agg['PeriodoLib'].dropna().unique())))
@@ -1,45 +1,122 @@
+import hashlib
+import json
 import pandas as pd
-import re
-from path_utils import UPLOAD_FOLDER, NEW_FILES_LIST
-import re
-patron_final = re.compile(r'^.+ - \d{2}-\d{2}-\d{4}\.xlsx$', re.IGNORECASE)
-if NEW_FILES_LIST.exists():
-    with open(NEW_FILES_LIST, 'r', encoding='utf-8') as fh:
-        nuevos = {l.strip() for l in fh if l.strip()}
-else:
-    nuevos = None
-
-# Función para extraer banco y tipo de cuenta
-def extraer_banco_y_tipo(cuenta):
-    if isinstance(cuenta, str):
-        match = re.search(r'(.+?)\s+(COR|AHO)\b', cuenta)
-        if match:
-            banco = match.group(1).strip()
-            tipo = match.group(2)
-            return banco, tipo
-    return "", ""
-
-# Procesar cada archivo en la carpeta
-for f in UPLOAD_FOLDER.glob('*.xlsx'):
-    archivo = f.name
-    if archivo.endswith('.xlsx'):
-        ruta_archivo = str(f)
-        if patron_final.match(archivo) and (not nuevos or archivo not in nuevos):
-            continue
-        try:
-            df = pd.read_excel(ruta_archivo)
-
-            if "Cuenta" in df.columns:
-                # Aplicar la función a la columna Cuenta
-                df[["Banco", "Tipo de Cuenta"]] = df["Cuenta"].apply(
-                    lambda x: pd.Series(extraer_banco_y_tipo(x))
-                )
-
-                # Guardar el archivo actualizado
-                df.to_excel(ruta_archivo, index=False)
-                print(f"Archivo actualizado: {archivo}")
+from path_utils import BASE_DIR, UPLOAD_FOLDER, INDICE_BANCOS_JSON, cargar_manifiesto
+from estandar import normalizar
+from COMUN import staging
+from COMUN.atomico import bloqueo, escribir_json
+
+# Maestro de bancos: id y nombre canónico de cada banco con los alias con que aparece en
+# "Cuenta". Así el mismo banco no queda partido en dos series en los dashboards. Un banco
+# que no esté en el maestro conserva el nombre tal como viene en la cuenta.
+RUTA_MAESTRO = BASE_DIR / "bancos_maestro.json"
+
+
+def cargar_maestro(ruta=RUTA_MAESTRO):
+    """Lee el maestro y arma el índice {alias normalizado: (id, nombre)}.
+    Retorna (índice, patrón de extracción, huella del maestro)."""
+    with open(ruta, 'rb') as fh:
+        contenido = fh.read()
+    datos = json.loads(contenido.decode('utf-8'))
+    alias = {}
+    for banco in datos["bancos"]:
+        for nombre in [banco["nombre"], *banco.get("alias", [])]:
+            alias[normalizar(nombre)] = (banco["id"], banco["nombre"])
+    tipos = "|".join(datos.get("tipos_cuenta", ["COR", "AHO"]))
+    # Banco = lo que va antes del tipo de cuenta: "BANCO DE OCCIDENTE COR 123..." -> (BANCO DE OCCIDENTE, COR)
+    patron = rf'(.+?)\s+({tipos})\b'
+    return alias, patron, hashlib.sha256(contenido).hexdigest()[:16]
+
+
+alias_bancos, patron_cuenta, huella_maestro = cargar_maestro()
+
+# Cuenta -> [id, banco, tipo]; se carga una vez por proceso desde INDICE_BANCOS_JSON
+_indice = None
+
+
+def _cargar_indice():
+    """Índice persistente de cuentas ya resueltas; vacío si no existe o si cambió el maestro."""
+    try:
+        with open(INDICE_BANCOS_JSON, 'r', encoding='utf-8') as fh:
+            datos = json.load(fh)
+        if datos.get("maestro") == huella_maestro:
+            return datos.get("cuentas", {})
+    except (OSError, ValueError):
+        pass
+    return {}
+
+
+def _guardar_indice(nuevas):
+    """Agrega `nuevas` al índice en disco. Relee, mezcla y reemplaza con el bloqueo tomado:
+    dos procesos del pool que guardan a la vez no se pisan las cuentas agregadas."""
+    try:
+        with bloqueo(INDICE_BANCOS_JSON):
+            cuentas = _cargar_indice()
+            cuentas.update(nuevas)
+            escribir_json(INDICE_BANCOS_JSON, {"maestro": huella_maestro, "cuentas": cuentas})
+    except OSError as e:
+        print(f"⚠️ No se pudo guardar {INDICE_BANCOS_JSON.name}: {e}")
+
+
+def resolver_cuentas(cuentas):
+    """DataFrame indexado por cada valor distinto de `cuentas` con id, Banco y Tipo de Cuenta.
+    Solo los valores que no estaban en el índice pasan por la expresión regular."""
+    global _indice
+    if _indice is None:
+        _indice = _cargar_indice()
+    distintas = [c for c in pd.unique(cuentas.dropna()) if isinstance(c, str)]
+    nuevas = [c for c in distintas if c not in _indice]
+    if nuevas:
+        extraido = pd.Series(nuevas, dtype=object).str.extract(patron_cuenta)
+        agregadas = {}
+        for cuenta, banco, tipo in zip(nuevas, extraido[0], extraido[1]):
+            if isinstance(banco, str):
+                banco = banco.strip()
+                id_banco, nombre = alias_bancos.get(normalizar(banco), (normalizar(banco), banco))
+                agregadas[cuenta] = [id_banco, nombre, tipo]
             else:
-                print(f"Columna 'Cuenta' no encontrada en: {archivo}")
+                agregadas[cuenta] = ["", "", ""]
+        _indice.update(agregadas)
+        _guardar_indice(agregadas)
+    return pd.DataFrame([_indice[c] for c in distintas], index=pd.Index(distintas, dtype=object),
+                        columns=["id", "Banco", "Tipo de Cuenta"])
+
+
+def procesar(df, archivo):
+    """Agrega Banco y Tipo de Cuenta a partir de 'Cuenta'; None si la columna no existe."""
+    if "Cuenta" not in df.columns:
+        print(f"Columna 'Cuenta' no encontrada en: {archivo}")
+        return None
+    # Una búsqueda por cuenta distinta; las filas se llenan con un map sobre ese resultado
+    resueltas = resolver_cuentas(df["Cuenta"])
+    df["Banco"] = df["Cuenta"].map(resueltas["Banco"]).fillna("")
+    df["Tipo de Cuenta"] = df["Cuenta"].map(resueltas["Tipo de Cuenta"]).fillna("")
+    print(f"Archivo actualizado: {archivo}")
+    return df
+
+
+def main():
+    manifiesto = cargar_manifiesto()
+    # Procesar cada archivo en la carpeta
+    for f in UPLOAD_FOLDER.glob('*.xlsx'):
+        archivo = f.name
+        if archivo.endswith('.xlsx'):
+            ruta_archivo = str(f)
+            if not manifiesto.pendiente(f, "agregar_colm2"):
+                continue
+            try:
+                df = staging.leer(ruta_archivo)
+                df = procesar(df, archivo)
+                if df is not None:
+                    # Guardar el archivo actualizado
+                    staging.escribir(df, ruta_archivo)
+                # Aunque no aplique, queda registrada para no volver a leer el archivo
+                manifiesto.registrar(f, "agregar_colm2")
+
+            except Exception as e:
+                print(f"Error procesando {archivo}: {e}")
+    manifiesto.guardar()
+
 
-        except Exception as e:
-            print(f"Error procesando {archivo}: {e}")
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,44 @@
 import pandas as pd
-from openpyxl import load_workbook
-from path_utils import UPLOAD_FOLDER, NEW_FILES_LIST
-import re
+from path_utils import UPLOAD_FOLDER, cargar_manifiesto
+from COMUN import staging
+from COMUN.encabezado import sondear_libro
 
-patron_final = re.compile(r'^.+ - \d{2}-\d{2}-\d{4}\.xlsx$', re.IGNORECASE)
-if NEW_FILES_LIST.exists():
-    with open(NEW_FILES_LIST, 'r', encoding='utf-8') as fh:
-        nuevos = {l.strip() for l in fh if l.strip()}
-else:
-    nuevos = None
+# Fila (base 0) donde empieza el encabezado en la exportación cruda (fila 6 en Excel);
+# se usa si la sonda no encuentra la fila "Cuenta"
+FILA_ENCABEZADO = 5
 
-for f in UPLOAD_FOLDER.glob('*.xlsx'):
-    archivo = f.name
-    ruta_archivo = str(f)
-    if patron_final.match(archivo) and (not nuevos or archivo not in nuevos):
-        continue
-    try:
-        wb = load_workbook(ruta_archivo, data_only=True)
-        ws = wb.active
-        valor_a1 = str(ws["A1"].value).strip() if ws["A1"].value else ""
-        if valor_a1.lower() == "cuenta":
-            print(f"'{archivo}' ya tiene 'Cuenta' en A1. Se deja sin modificar.")
-        else:
-            df = pd.read_excel(ruta_archivo, header=5)
-            df.to_excel(ruta_archivo, index=False)
-            print(f"Encabezado actualizado en: {archivo}")
-    except Exception as e:
-        print(f"Error procesando '{archivo}': {e}")
+
+def leer(ruta_archivo):
+    """Abre el libro una sola vez: revisa A1 y lo carga con el encabezado correcto.
+    Retorna (df, ya_limpio); ya_limpio=True si A1 ya era 'Cuenta'."""
+    with pd.ExcelFile(ruta_archivo) as xl:
+        # pandas abre el libro en modo read-only: la sonda recorre solo las primeras filas de la columna A
+        encabezado = sondear_libro(xl.book, "Cuenta")
+        ya_limpio = encabezado.fila_encabezado == 0
+        fila = encabezado.fila_encabezado if encabezado.fila_encabezado is not None else FILA_ENCABEZADO
+        df = xl.parse(header=fila)
+    return df, ya_limpio
+
+
+def main():
+    manifiesto = cargar_manifiesto()
+    for f in UPLOAD_FOLDER.glob('*.xlsx'):
+        archivo = f.name
+        ruta_archivo = str(f)
+        if not manifiesto.pendiente(f, "clean"):
+            continue
+        try:
+            df, ya_limpio = leer(ruta_archivo)
+            if ya_limpio:
+                print(f"'{archivo}' ya tiene 'Cuenta' en A1. Se deja sin modificar.")
+            else:
+                staging.escribir(df, ruta_archivo)
+                print(f"Encabezado actualizado en: {archivo}")
+            manifiesto.registrar(f, "clean")
+        except Exception as e:
+            print(f"Error procesando '{archivo}': {e}")
+    manifiesto.guardar()
+
+
+if __name__ == "__main__":
+    main()
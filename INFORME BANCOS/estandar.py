@@ -1,60 +1,149 @@
-import pandas as pd
-from path_utils import UPLOAD_FOLDER, NEW_FILES_LIST
+import json
 import re
-patron_final = re.compile(r'^.+ - \d{2}-\d{2}-\d{4}\.xlsx$', re.IGNORECASE)
-if NEW_FILES_LIST.exists():
-    with open(NEW_FILES_LIST, 'r', encoding='utf-8') as fh:
-        nuevos = {l.strip() for l in fh if l.strip()}
-else:
-    nuevos = None
-
-# Columnas requeridas
-columnas_requeridas = [
-    "Cuenta",
-    " Saldo Inicial",
-    "ABR - Notas contables",
-    "Ajustes y Reclasificaciones",
-    "CE CHEQUES",
-    "CE TRANSF",
-    "Comprobante de Egreso",
-    "Comprobante de Ingreso",
-    "Cuenta Por Pagar",
-    "Documento de Cartera Reversado",
-    "Gastos Bancarios",
-    "GASTOS BANCARIOS AUTOMATICOS",
-    "Legalizacion de anticipos",
-    "Prestamos",
-    "Traslado de Fondos",
-    "Saldo Libros",
-    "Cheques x Ent",
-    "Saldo Bancos"
-]
-
-# Recorre los archivos en la carpeta
-for f in UPLOAD_FOLDER.glob('*.xlsx'):
-    archivo = f.name
-    if archivo.endswith('.xlsx'):
-        ruta_archivo = str(f)
-        if patron_final.match(archivo) and (not nuevos or archivo not in nuevos):
+import unicodedata
+import warnings
+import pandas as pd
+from path_utils import BASE_DIR, UPLOAD_FOLDER, cargar_manifiesto
+from COMUN import staging
+
+# Registro de encabezados de SALDO BANCOS: columnas canónicas (en orden, con su tipo). Los
+# encabezados se comparan sin tildes, sin distinguir mayúsculas y con espacios simples; si
+# una exportación real trae otro nombre para una columna, se agrega en "variantes". Una
+# columna con nombre que no esté registrada es un cambio de esquema: el archivo falla (el
+# motor lo pasa a _cuarentena) en vez de perder la columna en silencio. Las columnas sin
+# encabezado ("Unnamed: n", cálculos sueltos al lado de la tabla) se descartan con un aviso.
+RUTA_ESQUEMA = BASE_DIR / "esquema_bancos.json"
+
+
+class CambioDeEsquema(ValueError):
+    """El encabezado o el contenido del archivo no coincide con esquema_bancos.json."""
+
+
+class AvisoEsquema(UserWarning):
+    """Algo del archivo se descartó sin ser un error (queda en el informe de ejecución)."""
+
+
+def normalizar(nombre):
+    """Clave de comparación de un encabezado: sin tildes, en mayúsculas y con espacios simples."""
+    nombre = unicodedata.normalize("NFKD", str(nombre))
+    nombre = "".join(c for c in nombre if not unicodedata.combining(c))
+    return " ".join(nombre.upper().split())
+
+
+def cargar_esquema(ruta=RUTA_ESQUEMA):
+    """Lee el registro y arma el índice {clave normalizada: columna canónica}.
+    Retorna (columnas canónicas, tipos, índice, claves ignoradas, patrón de filas a excluir)."""
+    with open(ruta, 'r', encoding='utf-8') as fh:
+        datos = json.load(fh)
+    columnas, tipos, indice = [], {}, {}
+    for col in datos["columnas"]:
+        nombre = col["nombre"]
+        columnas.append(nombre)
+        tipos[nombre] = col.get("tipo", "numero")
+        for variante in [nombre, *col.get("variantes", [])]:
+            clave = normalizar(variante)
+            if indice.get(clave, nombre) != nombre:
+                raise ValueError(f"La variante '{variante}' está registrada para '{indice[clave]}' y '{nombre}'")
+            indice[clave] = nombre
+    ignoradas = {normalizar(c) for c in datos.get("ignoradas", [])}
+    excluir = re.compile(datos.get("filas_excluir", "TOTALES|TOTAL GENERAL"))
+    return columnas, tipos, indice, ignoradas, excluir
+
+
+columnas_requeridas, tipos_columna, indice_encabezados, columnas_ignoradas, filas_excluir = cargar_esquema()
+columnas_numericas = [c for c in columnas_requeridas if tipos_columna[c] == "numero"]
+
+# Plan de cada encabezado ya visto (tupla de columnas -> plan): los archivos con el mismo
+# layout se resuelven con una búsqueda en este dict, sin volver a recorrer las columnas
+_planes = {}
+
+
+def _compilar(columnas):
+    """Resuelve un encabezado contra el registro. Retorna el plan:
+    (renombres, faltantes, columnas a descartar, columnas 'Unnamed' que se descartan)."""
+    renombres, descartar, sin_nombre, desconocidas = {}, [], [], []
+    origen = {}
+    for col in columnas:
+        if isinstance(col, str) and col.startswith("Unnamed:"):
+            sin_nombre.append(col)
             continue
-        try:
-            df = pd.read_excel(ruta_archivo)
+        clave = normalizar(col)
+        canonica = indice_encabezados.get(clave)
+        if canonica is None:
+            if clave in columnas_ignoradas:
+                descartar.append(col)
+            else:
+                desconocidas.append(col)
+            continue
+        if canonica in origen:
+            raise CambioDeEsquema(f"'{origen[canonica]}' y '{col}' corresponden a la misma columna '{canonica}'")
+        origen[canonica] = col
+        if col != canonica:
+            renombres[col] = canonica
+    if desconocidas:
+        raise CambioDeEsquema(f"columnas no registradas en {RUTA_ESQUEMA.name}: {desconocidas}")
+    if "Cuenta" not in origen:
+        raise CambioDeEsquema("el archivo no tiene la columna 'Cuenta'")
+    faltantes = [c for c in columnas_requeridas if c not in origen]
+    return renombres, faltantes, descartar, sin_nombre
+
+
+def plan_para(columnas):
+    """Plan del encabezado, compilado la primera vez que aparece ese layout."""
+    firma = tuple(columnas)
+    plan = _planes.get(firma)
+    if plan is None:
+        plan = _planes[firma] = _compilar(firma)
+    return plan
+
+
+def procesar(df, archivo):
+    """Lleva el archivo a las columnas canónicas (tipadas) y elimina las filas de totales."""
+    renombres, faltantes, descartar, sin_nombre = plan_para(df.columns)
+
+    # Columnas sin encabezado: se descartan, avisando cuántos valores traían
+    con_datos = {c: int(n) for c, n in df[sin_nombre].notna().sum().items() if n}
+    if con_datos:
+        warnings.warn(f"{archivo}: se descartan columnas sin encabezado con datos {con_datos}", AvisoEsquema)
+
+    # Nombres canónicos y orden del registro; las faltantes quedan vacías
+    df = df.rename(columns=renombres).reindex(columns=columnas_requeridas)
+
+    # Eliminar filas que contienen "TOTALES" o "TOTAL GENERAL" en la columna 'Cuenta'
+    df = df[~df["Cuenta"].astype(str).str.upper().str.contains(filas_excluir, na=False)]
+
+    # Tipos al cargar: los movimientos y saldos como float64 (texto no numérico = cambio de esquema)
+    for col in columnas_numericas:
+        valores = pd.to_numeric(df[col], errors="coerce")
+        invalidos = valores.isna() & df[col].notna()
+        if invalidos.any():
+            raise CambioDeEsquema(f"valores no numéricos en '{col}': {df.loc[invalidos, col].head(3).tolist()}")
+        df[col] = valores.astype("float64")
+    print(f"Archivo actualizado: {archivo} (faltaban {len(faltantes)} columnas, "
+          f"{len(renombres)} renombradas, eliminadas extra y filas con totales)")
+    return df
 
-            # Verificar qué columnas faltan
-            columnas_faltantes = [col for col in columnas_requeridas if col not in df.columns]
 
-            # Agregar columnas faltantes con valores vacíos
-            for col in columnas_faltantes:
-                df[col] = ""
+def main():
+    manifiesto = cargar_manifiesto()
+    # Recorre los archivos en la carpeta
+    for f in UPLOAD_FOLDER.glob('*.xlsx'):
+        archivo = f.name
+        if archivo.endswith('.xlsx'):
+            ruta_archivo = str(f)
+            if not manifiesto.pendiente(f, "estandar"):
+                continue
+            try:
+                df = staging.leer(ruta_archivo)
+                df = procesar(df, archivo)
 
-            # Eliminar filas que contienen "TOTALES" o "TOTAL GENERAL" en la columna 'Cuenta'
-            df = df[~df["Cuenta"].astype(str).str.upper().str.contains("TOTALES|TOTAL GENERAL", na=False)]
+                # Guardar el archivo actualizado
+                staging.escribir(df, ruta_archivo)
+                manifiesto.registrar(f, "estandar")
+            except Exception as e:
+                print(f"Error procesando {archivo}: {e}")
+    manifiesto.guardar()
 
-            # Eliminar columnas adicionales
-            df = df[[col for col in columnas_requeridas]]
 
-            # Guardar el archivo actualizado
-            df.to_excel(ruta_archivo, index=False)
-            print(f"Archivo actualizado: {archivo} (faltaban {len(columnas_faltantes)} columnas, eliminadas extra y filas con totales)")
-        except Exception as e:
-            print(f"Error procesando {archivo}: {e}")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Motor por archivo, en paralelo, para el pipeline de INFORME BANCOS.
+
+Cada archivo de SALDO BANCOS es independiente: se lee una vez y se le aplican en memoria
+clean → estandar → agregar_colum → agregar_colm2 antes de escribirlo una sola vez. Esa
+cadena corre en un pool de procesos (un archivo por tarea). Las etapas que necesitan una
+vista global son barreras explícitas que corren en el proceso principal:
+
+- rename: la lectura de A2/A4 va en paralelo, pero los renombres y la actualización del
+  índice de periodos / manifiesto se hacen juntos al final.
+- las fechas iniciales y las etapas pendientes de cada archivo (según el manifiesto) se
+  calculan una sola vez y se envían a cada tarea; el manifiesto solo lo escribe el proceso
+  principal con lo que devuelve cada tarea.
+
+Las etapas por archivo están declaradas como grafo (ver COMUN/ejecutor.py). Cada tarea
+devuelve su Resultado (log, etapas aplicadas, mediciones, error) y el proceso principal
+actualiza el manifiesto y el informe; un archivo que falla pasa a SALDO BANCOS/_cuarentena
+y el resto del lote sigue.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import rename
+import clean
+import estandar
+import agregar_colum
+import agregar_colm2
+from path_utils import (UPLOAD_FOLDER, ETAPAS, INFORME_JSONL, CUARENTENA_DIR, PATRON_FINAL,
+                        cargar_manifiesto, cargar_fechas_iniciales, sincronizar_periodos)
+from COMUN import staging, ejecutor
+from COMUN.ejecutor import Etapa
+from COMUN.informe import Informe
+from COMUN.atomico import escritura
+
+# Grafo de etapas por archivo (rename es una barrera previa sobre toda la carpeta)
+GRAFO = ejecutor.ordenar([
+    # clean lo aplica la lectura (clean.leer ubica la fila de encabezado)
+    Etapa("clean", None),
+    Etapa("estandar", estandar.procesar, ("clean",)),
+    Etapa("agregar_colum", agregar_colum.procesar, ("estandar",), requiere_guion=True),
+    Etapa("agregar_colm2", agregar_colm2.procesar, ("estandar",)),
+])
+assert [e.nombre for e in GRAFO] == [e for e in ETAPAS if e != "rename"]
+
+
+def por_procesar(rutas):
+    """Para el vigilante: las rutas que todavía tienen trabajo según el manifiesto."""
+    return ejecutor.por_procesar(rutas, cargar_manifiesto(), GRAFO, PATRON_FINAL)
+
+
+def procesar_archivo(ruta_archivo, map_fechas_inicial, pendientes):
+    """Tarea del pool: aplica a un archivo las etapas pendientes y retorna su Resultado."""
+    return ejecutor.procesar_archivo(ruta_archivo, GRAFO, pendientes, clean.leer,
+                                     {"agregar_colum": (map_fechas_inicial,)}, capturar=True)
+
+
+def _mapear(pool, funcion, *iterables):
+    if pool is None:
+        return map(funcion, *iterables)
+    return pool.map(funcion, *iterables)
+
+
+def ejecutar(workers=None, informe=None, pool=None, archivos=None):
+    """Ejecuta el pipeline. workers=None usa todos los núcleos; workers<=1 corre en serie.
+    Con `pool` se reutiliza un ProcessPoolExecutor ya creado (modo vigilante). Con
+    `archivos` solo se procesan esas rutas (el lote del vigilante): rename y la revisión
+    del manifiesto no recorren toda la carpeta."""
+    propio = informe is None
+    if propio:
+        informe = Informe(INFORME_JSONL, "INFORME BANCOS", "motor")
+    try:
+        # Los lectores (GRAFICOS) ven una generación nueva de SALDO BANCOS al terminar
+        with escritura(UPLOAD_FOLDER):
+            _ejecutar(workers or os.cpu_count() or 1, informe, pool, archivos)
+    finally:
+        if propio:
+            informe.cerrar()
+
+
+def _ejecutar(workers, informe, pool_externo=None, lote=None):
+    pool = pool_externo
+    if pool is None and workers > 1:
+        pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        # ▶️ rename: lectura en paralelo + barrera (renombres y JSON en el proceso principal)
+        print(f"\n🟡 Ejecutando rename ({workers} procesos)...")
+        with informe.etapa("rename"):
+            sin_nombre_final = rename.pendientes(lote)
+            leidos = _mapear(pool, rename.leer_o_error, sin_nombre_final)
+            renombrados = rename.aplicar(list(zip(sin_nombre_final, leidos)))
+
+        # ▶️ Barrera: manifiesto y fechas iniciales ya actualizados por rename
+        manifiesto = cargar_manifiesto()
+        if lote is None:
+            # Copias columnares que dejó una ejecución por scripts interrumpida
+            with informe.etapa("publicar copias"):
+                staging.publicar_carpeta(UPLOAD_FOLDER, manifiesto)
+            candidatos = ejecutor.archivos(UPLOAD_FOLDER)
+        else:
+            # Solo el lote: los que ya tenían nombre final más los que rename acaba de renombrar
+            candidatos = [Path(r) for r in lote if Path(r).exists() and PATRON_FINAL.match(Path(r).name)]
+            candidatos += renombrados
+        map_fechas_inicial = cargar_fechas_iniciales()
+        archivos, pendientes = [], []
+        for f in candidatos:
+            # Un stat() por archivo: solo entran los que tienen alguna etapa pendiente
+            etapas = ejecutor.pendientes(manifiesto, f, GRAFO)
+            if etapas:
+                archivos.append(str(f))
+                pendientes.append(etapas)
+        if not archivos:
+            print("↪️ No hay archivos nuevos para procesar.")
+            sincronizar_periodos(manifiesto)
+            return
+
+        # ▶️ clean → estandar → agregar_colum → agregar_colm2 por archivo
+        print(f"\n🟡 Ejecutando clean → estandar → agregar_colum → agregar_colm2 ({len(archivos)} archivos, {workers} procesos)...")
+        resultados = _mapear(pool, procesar_archivo, archivos, [map_fechas_inicial] * len(archivos), pendientes)
+        for ruta_archivo, resultado in zip(archivos, resultados):
+            print(resultado.log, end="")
+            ejecutor.registrar_resultado(ruta_archivo, resultado, manifiesto, informe, CUARENTENA_DIR)
+        manifiesto.guardar()
+        # Estado de cada corte (procesado / cuarentena) en el índice de periodos
+        sincronizar_periodos(manifiesto)
+    finally:
+        if pool is not None and pool is not pool_externo:
+            pool.shutdown()
+
+
+if __name__ == "__main__":
+    ejecutar()
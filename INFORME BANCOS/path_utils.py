@@ -1,10 +1,88 @@
+import json
+import re
+import sys
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent
+# Raíz del proyecto: permite importar los módulos compartidos de COMUN
+ROOT_DIR = BASE_DIR.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.append(str(ROOT_DIR))
+
+from COMUN.manifiesto import Manifiesto
+from COMUN.periodos import IndicePeriodos
+
 UPLOAD_FOLDER = BASE_DIR / "SALDO BANCOS"
+# Manifiesto con hash, tamaño, mtime y etapas aplicadas de cada archivo
+MANIFIESTO_JSON = UPLOAD_FOLDER / "_manifiesto.json"
+# Lista de recién renombrados que usaban las versiones anteriores (solo se lee para migrar)
 NEW_FILES_LIST = UPLOAD_FOLDER / "_archivos_recien_renombrados.txt"
-# Nuevo archivo para mapear nombre de archivo final -> Fecha Inicial
+# Mapping nombre de archivo final -> Fecha Inicial de las versiones anteriores (solo se lee para migrar)
 FECHAS_INICIALES_JSON = UPLOAD_FOLDER / "_fechas_iniciales.json"
+# Índice de periodos: empresa, fecha inicial / final, hash de origen y estado de cada corte
+PERIODOS_DB = UPLOAD_FOLDER / "_periodos.sqlite"
+# Informe de cada ejecución (JSON lines): tiempos, filas y bytes por etapa y por archivo
+INFORME_JSONL = UPLOAD_FOLDER / "_informe_ejecuciones.jsonl"
+# Índice persistente "Cuenta" -> (id de banco, banco, tipo de cuenta) de agregar_colm2.py
+INDICE_BANCOS_JSON = UPLOAD_FOLDER / "_indice_bancos.json"
+# Archivos que fallaron en alguna etapa del motor (con un .error.txt al lado)
+CUARENTENA_DIR = UPLOAD_FOLDER / "_cuarentena"
+# Nombre final que deja rename.py: "EMPRESA - dd-mm-aaaa.xlsx"
+PATRON_FINAL = re.compile(r'^.+ - \d{2}-\d{2}-\d{4}\.xlsx$', re.IGNORECASE)
+# Etapas del pipeline en orden, con su versión (ver COMUN/manifiesto.py antes de subir una)
+ETAPAS = {
+    "rename": 1,
+    "clean": 1,
+    "estandar": 1,
+    "agregar_colum": 1,
+    "agregar_colm2": 2,
+}
 
 if not UPLOAD_FOLDER.exists():
     raise FileNotFoundError(f"No se encontró la carpeta SALDO BANCOS en: {UPLOAD_FOLDER}")
+
+
+def cargar_manifiesto():
+    """Carga el manifiesto de SALDO BANCOS. La primera vez adopta como ya procesados los archivos
+    con nombre final que no estaban en la última lista de recién renombrados (la regla anterior)."""
+    manifiesto = Manifiesto(MANIFIESTO_JSON, ETAPAS)
+    if not manifiesto.existia:
+        nuevos = set()
+        if NEW_FILES_LIST.exists():
+            with open(NEW_FILES_LIST, 'r', encoding='utf-8') as fh:
+                nuevos = {l.strip() for l in fh if l.strip()}
+        for f in UPLOAD_FOLDER.glob('*.xlsx'):
+            if PATRON_FINAL.match(f.name) and f.name not in nuevos:
+                # Procesados antes de existir el manifiesto: versión 1 de cada etapa
+                manifiesto.adoptar(f, {etapa: 1 for etapa in ETAPAS})
+        manifiesto.guardar()
+    manifiesto.limpiar(UPLOAD_FOLDER)
+    return manifiesto
+
+
+def abrir_periodos():
+    """Abre el índice de periodos. La primera vez importa _fechas_iniciales.json si existe."""
+    existia = PERIODOS_DB.exists()
+    periodos = IndicePeriodos(PERIODOS_DB)
+    if not existia and FECHAS_INICIALES_JSON.exists():
+        try:
+            with open(FECHAS_INICIALES_JSON, 'r', encoding='utf-8') as fh:
+                periodos.importar_json(json.load(fh))
+        except Exception as e:
+            print(f"⚠️ No se pudo migrar {FECHAS_INICIALES_JSON.name}: {e}")
+    return periodos
+
+
+def cargar_fechas_iniciales():
+    """Mapping nombre de archivo final -> Fecha Inicial ("dd/mm/aaaa") registrado por rename.py."""
+    with abrir_periodos() as periodos:
+        return periodos.fechas_iniciales()
+
+
+def sincronizar_periodos(manifiesto):
+    """Al terminar una ejecución: estado de cada corte según el manifiesto y la cuarentena."""
+    try:
+        with abrir_periodos() as periodos:
+            periodos.sincronizar(UPLOAD_FOLDER, manifiesto, ETAPAS, CUARENTENA_DIR)
+    except Exception as e:
+        print(f"⚠️ No se pudo actualizar el índice de periodos: {e}")
@@ -1,70 +1,86 @@
-import re
-import json
-from openpyxl import load_workbook
-from path_utils import UPLOAD_FOLDER, NEW_FILES_LIST, FECHAS_INICIALES_JSON
+from pathlib import Path
 
-def main():
-    patron_final = re.compile(r'^.+ - \d{2}-\d{2}-\d{4}\.xlsx$', re.IGNORECASE)
-    nuevos = []
-    # Cargar fechas iniciales existentes si el archivo ya existe
-    if FECHAS_INICIALES_JSON.exists():
-        try:
-            with open(FECHAS_INICIALES_JSON, 'r', encoding='utf-8') as fh:
-                fechas_iniciales = json.load(fh)
-        except Exception:
-            fechas_iniciales = {}
+from path_utils import UPLOAD_FOLDER, PATRON_FINAL, abrir_periodos, cargar_manifiesto
+from COMUN.encabezado import sondear
+from COMUN.ejecutor import archivos as archivos_excel, es_temporal
+
+
+def pendientes(rutas=None):
+    """Archivos que aún no tienen el nombre final. Con `rutas` solo se revisan esas (lote
+    del vigilante) en vez de toda la carpeta."""
+    if rutas is None:
+        # Sin los archivos de bloqueo "~$..." que deja Excel abierto
+        candidatos = archivos_excel(UPLOAD_FOLDER)
     else:
-        fechas_iniciales = {}
-    for f in UPLOAD_FOLDER.glob('*.xlsx'):
+        candidatos = [Path(r) for r in rutas if Path(r).exists() and not es_temporal(Path(r).name)]
+    archivos = []
+    for f in candidatos:
+        if PATRON_FINAL.match(f.name):
+            print(f"↪️ Ya con nombre final, se omite: {f.name}")
+            continue
+        archivos.append(f)
+    return archivos
+
+
+def leer_datos(f):
+    """Lee A2/A4 de un archivo y calcula su nombre final. Retorna (nuevo_nombre, fecha_inicial).
+    Solo lee el archivo: se puede ejecutar en paralelo."""
+    # Solo se leen las primeras filas de la columna A (modo streaming)
+    encabezado = sondear(str(f))
+    nombre_parte1 = encabezado.empresa if encabezado.empresa is not None else "SIN_NOMBRE"
+    fecha_final = encabezado.fecha_final or "FECHA_NO_ENCONTRADA"
+    fecha_inicial = encabezado.fecha_inicial
+    fecha_final_safe = fecha_final.replace('/', '-') if fecha_final != 'FECHA_NO_ENCONTRADA' else ''
+    nuevo_nombre = f"{nombre_parte1.strip()} - {fecha_final_safe}.xlsx" if fecha_final_safe else f"{nombre_parte1.strip()}.xlsx"
+    return nuevo_nombre, fecha_inicial
+
+
+def aplicar(leidos):
+    """Barrera: renombra y actualiza el índice de periodos / manifiesto con una vista global.
+    `leidos` es una lista de (ruta, (nuevo_nombre, fecha_inicial)) o (ruta, Exception).
+    Retorna las rutas nuevas de los archivos que quedaron renombrados."""
+    renombrados = []
+    manifiesto = cargar_manifiesto()
+    periodos = abrir_periodos()
+    for f, datos in leidos:
         archivo = f.name
-        if patron_final.match(archivo):
-            print(f"↪️ Ya con nombre final, se omite: {archivo}")
+        if isinstance(datos, Exception):
+            print(f"Error procesando '{archivo}': {datos}")
             continue
-        ruta_archivo = str(f)
+        nuevo_nombre, fecha_inicial = datos
         try:
-            wb = load_workbook(ruta_archivo, data_only=True)
-            ws = wb.active
-            fila_nombre = str(ws["A2"].value)
-            if fila_nombre and "NIT" in fila_nombre:
-                nombre_parte1 = fila_nombre.split("NIT")[0].strip()
-            else:
-                nombre_parte1 = "SIN_NOMBRE"
-            fila_fecha = str(ws["A4"].value)
-            # Extraer Fecha Final
-            match_fecha_final = re.search(r"Fecha Final:\s*([0-9]{2}/[0-9]{2}/[0-9]{4})", fila_fecha)
-            fecha_final = match_fecha_final.group(1) if match_fecha_final else "FECHA_NO_ENCONTRADA"
-            # Extraer Fecha Inicial
-            match_fecha_inicial = re.search(r"Fecha Inicial:\s*([0-9]{2}/[0-9]{2}/[0-9]{4})", fila_fecha)
-            fecha_inicial = match_fecha_inicial.group(1) if match_fecha_inicial else ""
-            fecha_final_safe = fecha_final.replace('/', '-') if fecha_final != 'FECHA_NO_ENCONTRADA' else ''
-            nuevo_nombre = f"{nombre_parte1.strip()} - {fecha_final_safe}.xlsx" if fecha_final_safe else f"{nombre_parte1.strip()}.xlsx"
             nueva_ruta = f.with_name(nuevo_nombre)
             if not nueva_ruta.exists():
                 f.rename(nueva_ruta)
-                nuevos.append(nuevo_nombre)
-                if fecha_inicial:
-                    fechas_iniciales[nuevo_nombre] = fecha_inicial
+                # Exportación cruda: el nombre nuevo entra al manifiesto solo con "rename"
+                manifiesto.olvidar(f)
+                manifiesto.registrar(nueva_ruta, "rename")
+                # Fecha inicial y hash de la exportación original quedan en el índice de periodos
+                periodos.registrar(nuevo_nombre, fecha_inicial or None,
+                                   hash_origen=manifiesto.archivos[nuevo_nombre]["hash"])
+                renombrados.append(nueva_ruta)
                 print(f"Renombrado: '{archivo}' → '{nuevo_nombre}' (Fecha Inicial: {fecha_inicial or 'NO_ENCONTRADA'})")
             else:
                 # Si ya existe y no tiene fecha inicial registrada, intentar registrar
-                if fecha_inicial and nuevo_nombre not in fechas_iniciales:
-                    fechas_iniciales[nuevo_nombre] = fecha_inicial
+                if fecha_inicial and nuevo_nombre not in periodos.fechas_iniciales():
+                    periodos.registrar(nuevo_nombre, fecha_inicial)
                 print(f"Archivo ya existe: '{nuevo_nombre}' → se omite. (Fecha Inicial: {fecha_inicial or 'NO_ENCONTRADA'})")
         except Exception as e:
             print(f"Error procesando '{archivo}': {e}")
-    # Guardar lista de nuevos
-    try:
-        with open(NEW_FILES_LIST, 'w', encoding='utf-8') as fh:
-            for n in nuevos:
-                fh.write(n + '\n')
-    except Exception as e:
-        print(f"⚠️ No se pudo escribir lista de nuevos archivos: {e}")
-    # Guardar fechas iniciales persistentes
+    manifiesto.guardar()
+    periodos.cerrar()
+    return renombrados
+
+
+def leer_o_error(f):
     try:
-        with open(FECHAS_INICIALES_JSON, 'w', encoding='utf-8') as fh:
-            json.dump(fechas_iniciales, fh, ensure_ascii=False, indent=2)
+        return leer_datos(f)
     except Exception as e:
-        print(f"⚠️ No se pudo escribir fechas iniciales: {e}")
+        return e
+
+
+def main():
+    aplicar([(f, leer_o_error(f)) for f in pendientes()])
 
 if __name__ == '__main__':
     main()
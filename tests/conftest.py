@@ -0,0 +1,94 @@
+"""Utilidades comunes de las pruebas.
+
+Los scripts de cada pipeline se importan por nombre desde su carpeta (path_utils, clean,
+rename, ... existen en las dos), así que `importar` deja en sys.path solo la carpeta
+pedida y saca de sys.modules los módulos que vinieron de la otra.
+
+Las pruebas de punta a punta copian el pipeline a una carpeta temporal (como el
+benchmark), generan exportaciones crudas con BENCHMARK/generador.py y corren
+`ejecutar.py` en otro proceso, como lo hace el usuario.
+"""
+import importlib
+import os
+import shutil
+import subprocess
+import sys
+from datetime import date
+from pathlib import Path
+
+from openpyxl import load_workbook
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+PIPELINES = ("BALANCE DETALLADO", "INFORME BANCOS")
+# Carpeta de entrada de cada pipeline
+ENTRADAS = {"BALANCE DETALLADO": "DOCUMENTOS", "INFORME BANCOS": "SALDO BANCOS"}
+# Corte fijo de los datos generados: mismas exportaciones en cada corrida de las pruebas
+HASTA = date(2025, 9, 1)
+
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+
+def importar(pipeline, modulo):
+    """Importa `modulo` de la carpeta del pipeline."""
+    carpeta = ROOT_DIR / pipeline
+    otras = {str(ROOT_DIR / p) for p in PIPELINES if p != pipeline}
+    sys.path[:] = [p for p in sys.path if p not in otras]
+    if str(carpeta) not in sys.path:
+        sys.path.insert(0, str(carpeta))
+    for nombre, mod in list(sys.modules.items()):
+        archivo = getattr(mod, "__file__", None)
+        if archivo and str(Path(archivo).parent) in otras:
+            del sys.modules[nombre]
+    return importlib.import_module(modulo)
+
+
+def copiar_pipeline(pipeline, destino):
+    """Copia los scripts del pipeline y COMUN a `destino`. Retorna (carpeta del pipeline,
+    carpeta de entrada vacía)."""
+    carpeta = Path(destino) / pipeline
+    carpeta.mkdir(parents=True)
+    for archivo in (ROOT_DIR / pipeline).iterdir():
+        if archivo.is_file() and archivo.suffix in (".py", ".json"):
+            shutil.copy2(archivo, carpeta / archivo.name)
+    shutil.copytree(ROOT_DIR / "COMUN", Path(destino) / "COMUN", ignore=shutil.ignore_patterns("__pycache__"))
+    entrada = carpeta / ENTRADAS[pipeline]
+    entrada.mkdir()
+    return carpeta, entrada
+
+
+def generar(entrada, pipeline, **parametros):
+    """Exportaciones crudas de BENCHMARK/generador.py en `entrada` (en otro proceso: el
+    generador importa su propio path_utils). Retorna los nombres generados."""
+    parametros = {"hasta": HASTA, **parametros}
+    codigo = (f"import sys; sys.path.insert(0, {str(ROOT_DIR / 'BENCHMARK')!r})\n"
+              "import datetime\n"
+              "from generador import generar\n"
+              f"for ruta in generar({str(entrada)!r}, {pipeline!r}, **{parametros!r}):\n"
+              "    print(ruta.name)\n")
+    salida = subprocess.run([sys.executable, "-c", codigo], check=True, capture_output=True, text=True)
+    return salida.stdout.split()
+
+
+def ejecutar(carpeta, *argumentos):
+    """Corre `ejecutar.py` del pipeline copiado y retorna su salida (falla si termina con error)."""
+    entorno = {**os.environ, "PYTHONIOENCODING": "utf-8"}
+    entorno.pop("CONTA_STAGING", None)
+    resultado = subprocess.run([sys.executable, "ejecutar.py", *argumentos], cwd=carpeta, env=entorno,
+                               capture_output=True, text=True, encoding="utf-8")
+    assert resultado.returncode == 0, resultado.stdout + resultado.stderr
+    return resultado.stdout
+
+
+def valores(ruta):
+    """Celdas del libro (primera hoja) como lista de filas, con su tipo."""
+    wb = load_workbook(ruta, read_only=True)
+    try:
+        return [list(fila) for fila in wb.worksheets[0].iter_rows(values_only=True)]
+    finally:
+        wb.close()
+
+
+def libros(entrada):
+    """{nombre: celdas} de los .xlsx de la carpeta."""
+    return {f.name: valores(f) for f in sorted(Path(entrada).glob("*.xlsx"))}
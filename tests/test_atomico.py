@@ -0,0 +1,120 @@
+import json
+import subprocess
+import sys
+import time
+
+import pytest
+
+from COMUN import atomico
+from tests.conftest import ROOT_DIR
+
+
+def _marcador(carpeta, generacion, en_curso, pid=999999):
+    (carpeta / atomico.MARCADOR).write_text(json.dumps(
+        {"generacion": generacion, "en_curso": en_curso, "pid": pid}), encoding="utf-8")
+
+
+def test_reemplazar_confirma_o_deja_el_archivo_como_estaba(tmp_path):
+    ruta = tmp_path / "ZETA LTDA - 31-08-2025.xlsx"
+    ruta.write_text("anterior")
+    with pytest.raises(RuntimeError):
+        with atomico.reemplazar(ruta) as temporal:
+            temporal.write_text("a medias")
+            raise RuntimeError("falla al escribir")
+    assert ruta.read_text() == "anterior"
+    with atomico.reemplazar(ruta) as temporal:
+        assert temporal.name.startswith(".") and not temporal.name.endswith(".xlsx")
+        temporal.write_text("nuevo")
+        assert ruta.read_text() == "anterior"
+    assert ruta.read_text() == "nuevo"
+    assert [f.name for f in tmp_path.iterdir()] == [ruta.name]
+
+
+def test_escribir_json_conserva_acentos(tmp_path):
+    ruta = tmp_path / "_indice.json"
+    atomico.escribir_json(ruta, {"banco": "COLPATRIA", "tipo": "Ahorros Nómina"})
+    assert json.loads(ruta.read_text(encoding="utf-8")) == {"banco": "COLPATRIA", "tipo": "Ahorros Nómina"}
+    assert "Nómina" in ruta.read_text(encoding="utf-8")
+
+
+def test_bloqueo_excluye_a_otro_proceso(tmp_path):
+    ruta = tmp_path / "_indice_bancos.json"
+    codigo = (f"import sys, time; sys.path.insert(0, {str(ROOT_DIR)!r})\n"
+              "from COMUN.atomico import bloqueo\n"
+              f"with bloqueo({str(ruta)!r}):\n"
+              "    print('tomado', flush=True)\n"
+              "    time.sleep(1.5)\n")
+    otro = subprocess.Popen([sys.executable, "-c", codigo], stdout=subprocess.PIPE, text=True)
+    try:
+        assert otro.stdout.readline().strip() == "tomado"
+        inicio = time.monotonic()
+        with atomico.bloqueo(ruta):
+            esperado = time.monotonic() - inicio
+        assert esperado > 0.5
+    finally:
+        otro.wait(timeout=10)
+
+
+def test_generacion_sube_al_terminar_la_escritura(tmp_path):
+    assert atomico.leer_generacion(tmp_path) == (0, False)
+    with atomico.escritura(tmp_path):
+        assert atomico.leer_generacion(tmp_path) == (0, True)
+    assert atomico.leer_generacion(tmp_path) == (1, False)
+    with pytest.raises(ValueError):
+        with atomico.escritura(tmp_path):
+            raise ValueError("falla una etapa")
+    assert atomico.leer_generacion(tmp_path) == (2, False)
+
+
+def test_marcador_de_un_escritor_muerto_no_bloquea_la_lectura(tmp_path, capsys):
+    # Un pipeline que murió (kill, corte de luz) deja el marcador en_curso sin nadie escribiendo
+    _marcador(tmp_path, 7, True)
+    inicio = time.monotonic()
+    assert atomico.cargar_consistente(tmp_path, lambda: "datos") == "datos"
+    assert time.monotonic() - inicio < 1
+    assert "mezclar" not in capsys.readouterr().out
+    # La siguiente ejecución sigue desde esa generación
+    with atomico.escritura(tmp_path):
+        pass
+    assert atomico.leer_generacion(tmp_path) == (8, False)
+
+
+def test_escritor_terminado_con_kill_deja_de_contar_como_en_curso(tmp_path):
+    codigo = (f"import sys, time; sys.path.insert(0, {str(ROOT_DIR)!r})\n"
+              "from COMUN.atomico import escritura\n"
+              f"with escritura({str(tmp_path)!r}):\n"
+              "    print('escribiendo', flush=True)\n"
+              "    time.sleep(60)\n")
+    escritor = subprocess.Popen([sys.executable, "-c", codigo], stdout=subprocess.PIPE, text=True)
+    try:
+        assert escritor.stdout.readline().strip() == "escribiendo"
+        assert atomico.leer_generacion(tmp_path) == (0, True)
+    finally:
+        escritor.kill()
+        escritor.wait(timeout=10)
+    assert json.loads((tmp_path / atomico.MARCADOR).read_text(encoding="utf-8"))["en_curso"]
+    assert atomico.leer_generacion(tmp_path) == (0, False)
+
+
+def test_escritura_en_curso_se_espera_hasta_el_limite(tmp_path, capsys):
+    with atomico.escritura(tmp_path):
+        inicio = time.monotonic()
+        assert atomico.cargar_consistente(tmp_path, lambda: "parcial", espera=0.5) == "parcial"
+        assert 0.4 < time.monotonic() - inicio < 5
+    assert "mezclar dos ejecuciones" in capsys.readouterr().out
+
+
+def test_se_vuelve_a_cargar_si_cambia_la_generacion(tmp_path, capsys):
+    lecturas = []
+
+    def cargar():
+        lecturas.append(atomico.leer_generacion(tmp_path)[0])
+        if len(lecturas) == 1:
+            # Un pipeline publica una generación nueva mientras se leía
+            with atomico.escritura(tmp_path):
+                pass
+        return len(lecturas)
+
+    assert atomico.cargar_consistente(tmp_path, cargar) == 2
+    assert lecturas == [0, 1]
+    assert "mezclar" not in capsys.readouterr().out
@@ -0,0 +1,94 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+
+from COMUN.bloques import leer_bloques
+from tests.conftest import copiar_pipeline, ejecutar, generar, libros
+
+PIPELINE = "BALANCE DETALLADO"
+# Más filas que el bloque y no múltiplo de él: bloques completos y uno parcial por libro
+PARAMETROS = {"empresas": 1, "meses": 2, "filas_balance": 120}
+BLOQUE = "50"
+
+
+@pytest.fixture
+def exportacion(tmp_path):
+    """Libro con bloque de encabezado arriba, columna sin nombre, nombre repetido, fila vacía
+    en medio y celdas vacías al final."""
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["BALANCE DE PRUEBA"])
+    ws.append([])
+    ws.append(["Cuenta contable", "Tercero", "Saldo final", None, "Cuenta contable"])
+    ws.append([11100501, "ZETA LTDA", 1.5, None, "X"])
+    ws.append([23359501, None, 2.0])
+    ws.append([])
+    ws.append(["13700501", "DELTA", "1.234,50", None, None])
+    ws.append([28150501, "OMEGA", -3.25])
+    ruta = tmp_path / "export_0001.xlsx"
+    wb.save(ruta)
+    return ruta
+
+
+@pytest.mark.parametrize("dtype", [None, str])
+@pytest.mark.parametrize("filas", [1, 2, 3, 10])
+def test_bloques_iguales_a_leer_el_libro_completo(exportacion, filas, dtype):
+    completo = pd.read_excel(exportacion, header=2, dtype=dtype)
+    bloques = list(leer_bloques(exportacion, fila_encabezado=2, filas=filas, dtype=dtype))
+    # Cinco filas bajo el encabezado (la vacía queda como NaN, igual que en pd.read_excel)
+    assert [len(b) for b in bloques] == [min(filas, 5 - i) for i in range(0, 5, filas)]
+    assert list(bloques[0].columns) == ["Cuenta contable", "Tercero", "Saldo final", "Unnamed: 3",
+                                        "Cuenta contable.1"]
+    unidos = pd.concat(bloques, ignore_index=True)
+    # Los tipos se infieren por bloque; los valores son los mismos
+    assert unidos.astype(object).where(unidos.notna(), None).values.tolist() == \
+        completo.astype(object).where(completo.notna(), None).values.tolist()
+
+
+def test_hoja_sin_datos_da_un_bloque_vacio(tmp_path):
+    ruta = tmp_path / "vacio.xlsx"
+    wb = Workbook()
+    wb.active.append(["Cuenta contable", "Tercero"])
+    wb.save(ruta)
+    bloques = list(leer_bloques(ruta, filas=5))
+    assert len(bloques) == 1 and bloques[0].empty
+    assert list(bloques[0].columns) == ["Cuenta contable", "Tercero"]
+
+
+@pytest.fixture(scope="module")
+def procesados(tmp_path_factory):
+    resultado = {}
+    for modo, argumentos in (("completo", ()), ("bloques", ("--bloques", BLOQUE))):
+        carpeta, entrada = copiar_pipeline(PIPELINE, tmp_path_factory.mktemp(modo))
+        generar(entrada, PIPELINE, **PARAMETROS)
+        ejecutar(carpeta, *argumentos)
+        resultado[modo] = entrada
+    return resultado
+
+
+def _filas_base(entrada):
+    with sqlite3.connect(entrada / "_balances.sqlite") as conexion:
+        return sorted(conexion.execute("SELECT * FROM balances").fetchall(), key=repr)
+
+
+def test_por_bloques_deja_los_mismos_libros(procesados):
+    completo = libros(procesados["completo"])
+    assert len(completo) == 2
+    assert all(len(celdas) - 1 == PARAMETROS["filas_balance"] for celdas in completo.values())
+    assert libros(procesados["bloques"]) == completo
+
+
+def test_por_bloques_carga_la_misma_base(procesados):
+    filas = _filas_base(procesados["completo"])
+    assert len(filas) == 2 * PARAMETROS["filas_balance"]
+    assert _filas_base(procesados["bloques"]) == filas
+
+
+def test_por_bloques_igual_que_los_terceros(procesados):
+    def registro(entrada):
+        with sqlite3.connect(entrada / "_terceros.sqlite") as conexion:
+            return sorted(conexion.execute("SELECT nit, tercero FROM terceros").fetchall())
+
+    assert registro(procesados["bloques"]) == registro(procesados["completo"])
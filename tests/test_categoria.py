@@ -0,0 +1,78 @@
+import json
+
+import pandas as pd
+import pytest
+
+from tests.conftest import importar
+
+categoria = importar("BALANCE DETALLADO", "categoria")
+
+# Cuenta contable → categoría con categorias_puc.json
+CUENTAS = [
+    ("13700501", "Saldo por Cobrar"),
+    ("18959501", "Saldo por Cobrar"),
+    ("23990501", "Saldo por Pagar"),
+    ("28150501", "Saldo por Pagar"),
+    ("23600501", "Saldo por Pagar"),
+    ("37100501", "Saldo por Pagar"),
+    ("1370", "Saldo por Cobrar"),
+    # Más corta que el prefijo, otra cuenta o el prefijo en otra posición: sin categoría
+    ("137", ""),
+    ("11100501", ""),
+    ("X1370", ""),
+    # Cuentas que llegan como número (o float, leídas sin dtype=str)
+    (13700501, "Saldo por Cobrar"),
+    (23600501.0, "Saldo por Pagar"),
+    ("", ""),
+    (None, ""),
+]
+
+
+def test_clasificar_por_prefijo_puc():
+    cuentas = pd.Series([c for c, _ in CUENTAS], dtype=object)
+    assert categoria.clasificar(cuentas).tolist() == [e for _, e in CUENTAS]
+
+
+@pytest.fixture
+def categorias_propias(tmp_path, monkeypatch):
+    ruta = tmp_path / "categorias.json"
+    ruta.write_text(json.dumps({"columnas_saldo": ["Cartera", "Activo"], "prefijos": {
+        "1": "Activo", "13": "Cartera", "1370": "Vinculados", "137005": "Cartera", 23: "Pasivo"}}),
+        encoding="utf-8")
+    indice, columnas = categoria.cargar_categorias(ruta)
+    monkeypatch.setattr(categoria, "indice_prefijos", indice)
+    monkeypatch.setattr(categoria, "columnas_saldo", columnas)
+    return indice
+
+
+def test_indice_de_mayor_a_menor_longitud(categorias_propias):
+    assert list(categorias_propias) == [6, 4, 2, 1]
+    assert categorias_propias[2] == {"13": "Cartera", "23": "Pasivo"}
+
+
+def test_gana_el_prefijo_mas_largo(categorias_propias):
+    cuentas = pd.Series(["13700501", "13701001", "13050501", "11100501", "23359501", "41350501"])
+    assert categoria.clasificar(cuentas).tolist() == [
+        "Cartera", "Vinculados", "Cartera", "Activo", "Pasivo", ""]
+
+
+def test_columnas_de_saldo():
+    df = pd.DataFrame({"Cuenta contable": ["13700501", "23600501", "11100501"],
+                       "Saldo final": [10.5, -20.0, 30.0]})
+    resultado = categoria.procesar(df, "X - 31-08-2025.xlsx")
+    assert resultado["Categoría"].tolist() == ["Saldo por Cobrar", "Saldo por Pagar", ""]
+    assert resultado["Saldo por Cobrar"].tolist() == [10.5, 0.0, 0.0]
+    assert resultado["Saldo por Pagar"].tolist() == [0.0, -20.0, 0.0]
+
+
+def test_columnas_de_saldo_de_la_configuracion(categorias_propias):
+    df = pd.DataFrame({"Cuenta contable": ["13050501", "11100501", "23359501"],
+                       "Saldo final": [1.0, 2.0, 3.0]})
+    resultado = categoria.procesar(df, "X - 31-08-2025.xlsx")
+    assert resultado["Cartera"].tolist() == [1.0, 0.0, 0.0]
+    assert resultado["Activo"].tolist() == [0.0, 2.0, 0.0]
+    assert "Saldo por Cobrar" not in resultado.columns
+
+
+def test_sin_columnas_necesarias():
+    assert categoria.procesar(pd.DataFrame({"Cuenta contable": ["1370"]}), "X - 31-08-2025.xlsx") is None
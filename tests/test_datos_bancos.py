@@ -0,0 +1,337 @@
+import json
+import os
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from tests.conftest import ROOT_DIR
+
+sys.path.insert(0, str(ROOT_DIR / "GRAFICOS"))
+import datos_bancos  # noqa: E402
+
+
+def _libro(empresa, cuentas, saldos_libros, fecha="2025-06-30"):
+    n = len(cuentas)
+    return pd.DataFrame({
+        "Empresa": empresa,
+        "Fecha": pd.Timestamp(fecha),
+        "Fecha Inicial": pd.Timestamp(fecha).replace(day=1),
+        "Banco": "BANCO DE OCCIDENTE",
+        "Cuenta": cuentas,
+        "Saldo Inicial": [100.0] * n,
+        "Adiciones": [float("nan")] * n,
+        "Salidas": [float("nan")] * n,
+        "Movimientos": [float("nan")] * n,
+        "Saldo Libros": pd.Series(saldos_libros, dtype="float64"),
+    })
+
+
+def test_celdas_sin_valores_quedan_vacias_en_el_cubo():
+    frames = [
+        _libro("A", ["BANCO DE OCCIDENTE AHO 1", "BANCO DE OCCIDENTE AHO 2"], [10.0, None]),
+        # La misma cuenta en otro libro del mismo corte, también sin Saldo Libros
+        _libro("A", ["BANCO DE OCCIDENTE AHO 2"], [None]),
+    ]
+    cubo = datos_bancos._cubo(frames).set_index("Cuenta")
+    assert cubo.loc["BANCO DE OCCIDENTE AHO 1", "Saldo Libros"] == 10.0
+    assert pd.isna(cubo.loc["BANCO DE OCCIDENTE AHO 2", "Saldo Libros"])
+    assert cubo.loc["BANCO DE OCCIDENTE AHO 2", "Saldo Inicial"] == 200.0
+    assert cubo["Movimientos"].isna().all()
+
+
+def test_empresa_banco_sin_saldo_libros_no_aparece_en_el_grafico():
+    # Como grafic_bancos.actualizar_barras: sum(min_count=1).dropna() sobre la rebanada
+    frames = [
+        _libro("A", ["BANCO DE OCCIDENTE AHO 1"], [10.0]),
+        _libro("B", ["BANCO DE OCCIDENTE AHO 3"], [None]),
+    ]
+    df = datos_bancos.rebanar(datos_bancos._cubo(frames), pd.Timestamp("2025-06-30"), sin_cxp=True)
+    grp = df.groupby(["Empresa", "Banco"])["Saldo Libros"].sum(min_count=1).dropna()
+    assert list(grp.index.get_level_values("Empresa")) == ["A"]
+
+
+def _exportacion(ruta, columnas):
+    """Libro de SALDO BANCOS en disco con las columnas dadas (valores como texto, como los lee el tablero)."""
+    pd.DataFrame(columnas).to_excel(ruta, index=False)
+    return ruta
+
+
+def test_libro_sin_columna_banco_queda_como_sin_banco(tmp_path):
+    ruta = _exportacion(tmp_path / "ZETA LTDA - 30-06-2025.xlsx", {
+        "Empresa": ["ZETA LTDA"] * 2,
+        "Fecha": ["30/06/2025"] * 2,
+        "Fecha Inicial": ["01/06/2025"] * 2,
+        "Cuenta": ["AHO 1", "CTE 2"],
+        "Saldo Inicial": ["10", "20"],
+        "Saldo Libros": ["15,5", "25"],
+    })
+    df, error = datos_bancos._parsear(str(ruta))
+    assert error is None
+    cubo = datos_bancos._cubo([df])
+    assert list(cubo["Banco"]) == ["Sin Banco", "Sin Banco"]
+    # El filtro de bancos encuentra las mismas filas que se grafican
+    sin_banco = datos_bancos.rebanar(cubo, pd.Timestamp("2025-06-30"), bancos=["Sin Banco"], sin_cxp=True)
+    assert sin_banco["Saldo Libros"].sum() == 40.5
+    mensual = datos_bancos._cubo_mensual(cubo).set_index(["Empresa", "Banco", "Mes"])
+    assert mensual.loc[("ZETA LTDA", "Sin Banco", "2025-06"), "Saldo Cierre"] == 40.5
+
+
+def test_libro_sin_saldo_inicial_ni_cuenta_sigue_en_el_cubo(tmp_path):
+    ruta = _exportacion(tmp_path / "ZETA LTDA - 31-07-2025.xlsx", {
+        "Empresa": ["ZETA LTDA"],
+        "Fecha": ["31/07/2025"],
+        "Banco": ["COLPATRIA"],
+        "Saldo Libros": ["7"],
+    })
+    df, _ = datos_bancos._parsear(str(ruta))
+    cubo = datos_bancos._cubo([df, _libro("A", ["BANCO DE OCCIDENTE AHO 1"], [10.0])])
+    fila = cubo[cubo["Empresa"] == "ZETA LTDA"].iloc[0]
+    assert fila["Banco"] == "COLPATRIA"
+    assert fila["Saldo Libros"] == 7.0
+    assert pd.isna(fila["Saldo Inicial"]) and pd.isna(fila["Cuenta"])
+    assert not fila["CXP"]
+
+
+def test_grafic_bancos_filtros_y_barras_con_los_mismos_datos(monkeypatch):
+    pytest.importorskip("dash")
+    pytest.importorskip("plotly")
+    import grafic_bancos
+
+    sin_banco = _libro("B", ["AHO 9", "CXP 9"], [5.0, 3.0]).assign(Banco=None)
+    cubo = datos_bancos._cubo([_libro("A", ["BANCO DE OCCIDENTE AHO 1"], [10.0]), sin_banco])
+    monkeypatch.setattr(datos_bancos, "cubo", lambda: cubo)
+    opciones = grafic_bancos.cargar_datos()
+    assert sorted(opciones["Banco"].unique()) == ["BANCO DE OCCIDENTE", "Sin Banco"]
+    barras = grafic_bancos._saldos(datos_bancos.rebanar(cubo, pd.Timestamp("2025-06-30"), bancos=["Sin Banco"]))
+    assert list(barras["Cuenta"]) == ["AHO 9"]
+
+
+def test_cubo_con_libros_sin_cuenta_ni_fecha_inicial():
+    solo_saldos = pd.DataFrame({"Empresa": ["ZETA LTDA"], "Fecha": [pd.Timestamp("2025-07-31")],
+                                "Saldo Libros": [7.0]})
+    cubo = datos_bancos._cubo([solo_saldos])
+    assert list(cubo["Banco"]) == ["Sin Banco"]
+    assert list(cubo["Mes"]) == ["2025-07"] and cubo["Mes Inicial"].isna().all()
+    assert not cubo["CXP"].any() and cubo["Cierre"].all()
+
+
+@pytest.fixture
+def carpeta(tmp_path, monkeypatch):
+    """SALDO BANCOS y caché en disco temporales, con las cachés en memoria vacías."""
+    saldos = tmp_path / "SALDO BANCOS"
+    saldos.mkdir()
+    monkeypatch.setattr(datos_bancos, "SALDO_BANCOS_DIR", saldos)
+    monkeypatch.setattr(datos_bancos, "CACHE_DIR", tmp_path / "_cache_bancos")
+    monkeypatch.setattr(datos_bancos, "PROCESOS", 1)
+    for cache in ("_archivos", "_vistas", "_publicados"):
+        monkeypatch.setattr(datos_bancos, cache, {})
+    return saldos
+
+
+@pytest.fixture
+def lecturas(monkeypatch):
+    """Nombres de los libros que se parsean (en serie)."""
+    leidos = []
+    parsear = datos_bancos._parsear
+
+    def contar(ruta):
+        leidos.append(Path(ruta).name)
+        return parsear(ruta)
+
+    monkeypatch.setattr(datos_bancos, "_parsear", contar)
+    return leidos
+
+
+def _saldos(carpeta, empresa, saldo, fecha="30/06/2025"):
+    """Libro procesado de SALDO BANCOS con una cuenta."""
+    return _exportacion(carpeta / f"{empresa} - {fecha.replace('/', '-')}.xlsx", {
+        "Cuenta": ["BANCOLOMBIA AHO 1"], " Saldo Inicial": ["100"], "Traslado de Fondos": [str(saldo - 100)],
+        "Saldo Libros": [str(saldo)], "Empresa": [empresa], "Fecha": [fecha], "Fecha Inicial": ["01/06/2025"],
+        "Banco": ["BANCOLOMBIA"], "Tipo de Cuenta": ["AHO"],
+    })
+
+
+def _saldo_libros(df):
+    return df.set_index("Empresa")["Saldo Libros"].to_dict()
+
+
+def test_solo_se_releen_los_libros_que_cambiaron(carpeta, lecturas):
+    _saldos(carpeta, "ALFA", 150)
+    beta = _saldos(carpeta, "BETA", 250)
+    assert _saldo_libros(datos_bancos.movimientos_por_cuenta()) == {"ALFA": 150.0, "BETA": 250.0}
+    assert sorted(lecturas) == ["ALFA - 30-06-2025.xlsx", "BETA - 30-06-2025.xlsx"]
+
+    # Sin cambios: solo stat(), ni una lectura
+    lecturas.clear()
+    assert _saldo_libros(datos_bancos.movimientos_por_cuenta()) == {"ALFA": 150.0, "BETA": 250.0}
+    assert lecturas == []
+
+    # Se corrige un libro: solo ese se vuelve a leer
+    st = beta.stat()
+    _saldos(carpeta, "BETA", 275)
+    os.utime(beta, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+    assert _saldo_libros(datos_bancos.movimientos_por_cuenta()) == {"ALFA": 150.0, "BETA": 275.0}
+    assert lecturas == ["BETA - 30-06-2025.xlsx"]
+
+    # Un libro borrado sale de la caché sin leer los demás
+    lecturas.clear()
+    beta.unlink()
+    assert _saldo_libros(datos_bancos.movimientos_por_cuenta()) == {"ALFA": 150.0}
+    assert lecturas == [] and [f.name for f in datos_bancos._archivos] == ["ALFA - 30-06-2025.xlsx"]
+
+
+def test_vistas_se_entregan_como_copia(carpeta):
+    _saldos(carpeta, "ALFA", 150)
+    datos_bancos.movimientos_por_cuenta()["Saldo Libros"] = 0.0
+    assert _saldo_libros(datos_bancos.movimientos_por_cuenta()) == {"ALFA": 150.0}
+    assert datos_bancos.cubo() is datos_bancos.cubo()
+
+
+def _reiniciar(monkeypatch):
+    """Como al reiniciar la app: las cachés en memoria vacías, la de disco intacta."""
+    for cache in ("_archivos", "_vistas", "_publicados"):
+        monkeypatch.setattr(datos_bancos, cache, {})
+
+
+def test_al_reiniciar_se_usa_la_cache_en_disco(carpeta, lecturas, monkeypatch):
+    pytest.importorskip("pyarrow")
+    alfa = _saldos(carpeta, "ALFA", 150)
+    # Exportación cruda: no aplica, queda marcada para no volver a leerla
+    _exportacion(carpeta / "export_0001.xlsx", {"SALDOS BANCOS": ["x"]})
+    primera = datos_bancos.movimientos_por_cuenta()
+    assert sorted(lecturas) == ["ALFA - 30-06-2025.xlsx", "export_0001.xlsx"]
+    clave = f"{datos_bancos.hash_archivo(alfa)}-v{datos_bancos.VERSION_LECTOR}"
+    assert (datos_bancos.CACHE_DIR / f"{clave}.parquet").exists()
+    assert len(list(datos_bancos.CACHE_DIR.glob(f"*{datos_bancos._OMITIDO}"))) == 1
+
+    _reiniciar(monkeypatch)
+    lecturas.clear()
+    pd.testing.assert_frame_equal(datos_bancos.movimientos_por_cuenta(), primera)
+    assert lecturas == []
+
+    # Otra versión del lector no usa lo guardado por la anterior (y lo poda)
+    _reiniciar(monkeypatch)
+    monkeypatch.setattr(datos_bancos, "VERSION_LECTOR", datos_bancos.VERSION_LECTOR + 1)
+    datos_bancos.movimientos_por_cuenta()
+    assert sorted(lecturas) == ["ALFA - 30-06-2025.xlsx", "export_0001.xlsx"]
+    assert not (datos_bancos.CACHE_DIR / f"{clave}.parquet").exists()
+
+
+def test_la_clave_sale_del_contenido_no_del_nombre(carpeta, lecturas, monkeypatch):
+    pytest.importorskip("pyarrow")
+    alfa = _saldos(carpeta, "ALFA", 150)
+    datos_bancos.movimientos_por_cuenta()
+    # El mismo libro copiado otra vez (mtime nuevo, mismo contenido): no se vuelve a parsear
+    _reiniciar(monkeypatch)
+    lecturas.clear()
+    st = alfa.stat()
+    os.utime(alfa, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+    assert _saldo_libros(datos_bancos.movimientos_por_cuenta()) == {"ALFA": 150.0}
+    assert lecturas == []
+
+
+def test_hash_del_manifiesto_si_coincide_la_huella(carpeta, monkeypatch):
+    alfa = _saldos(carpeta, "ALFA", 150)
+    mtime, tamano = datos_bancos._huella(alfa)
+    (carpeta / "_manifiesto.json").write_text(json.dumps({"archivos": {
+        alfa.name: {"hash": "abc123", "mtime": mtime, "tamano": tamano}}}), encoding="utf-8")
+    monkeypatch.setattr(datos_bancos, "hash_archivo", lambda f: "releido")
+    assert datos_bancos._Manifiesto().hash(alfa, (mtime, tamano)) == "abc123"
+    # El archivo cambió después del pipeline: se calcula el hash
+    assert datos_bancos._Manifiesto().hash(alfa, (mtime + 1, tamano)) == "releido"
+
+
+def _danado(carpeta):
+    ruta = carpeta / "GAMMA - 30-06-2025.xlsx"
+    ruta.write_bytes(b"no es un libro de Excel")
+    return ruta
+
+
+def test_libro_danado_se_informa_y_no_tumba_la_consulta(carpeta, lecturas, capsys):
+    _saldos(carpeta, "ALFA", 150)
+    danado = _danado(carpeta)
+    df, error = datos_bancos._parsear(str(danado))
+    assert df is None and error
+
+    assert _saldo_libros(datos_bancos.movimientos_por_cuenta()) == {"ALFA": 150.0}
+    assert f"⚠️ Error leyendo {danado.name}" in capsys.readouterr().out
+    # No se reintenta mientras el archivo no cambie; al reemplazarlo entra
+    lecturas.clear()
+    datos_bancos.movimientos_por_cuenta()
+    assert lecturas == []
+    danado.unlink()
+    _saldos(carpeta, "GAMMA", 350)
+    assert _saldo_libros(datos_bancos.movimientos_por_cuenta()) == {"ALFA": 150.0, "GAMMA": 350.0}
+    assert lecturas == ["GAMMA - 30-06-2025.xlsx"]
+
+
+def test_pool_de_procesos_igual_que_en_serie(carpeta, monkeypatch, capsys):
+    for i, empresa in enumerate(("ALFA", "BETA", "DELTA")):
+        _saldos(carpeta, empresa, 100 * (i + 1))
+    danado = _danado(carpeta)
+    rutas = [str(f) for f in sorted(carpeta.glob("*.xlsx"))]
+    serie = [datos_bancos._parsear(r) for r in rutas]
+
+    monkeypatch.setattr(datos_bancos, "PROCESOS", 2)
+    paralelo = datos_bancos._parsear_todos(rutas)
+    # Mismo orden que las rutas; el error del libro dañado vuelve como resultado, no como excepción
+    assert [e is None for _, e in paralelo] == [p.name != danado.name for p in map(Path, rutas)]
+    assert [e for _, e in paralelo] == [e for _, e in serie]
+    for (df, _), (esperado, _) in zip(paralelo, serie):
+        if esperado is not None:
+            pd.testing.assert_frame_equal(df, esperado)
+
+    assert _saldo_libros(datos_bancos.movimientos_por_cuenta()) == {"ALFA": 100.0, "BETA": 200.0, "DELTA": 300.0}
+    assert f"⚠️ Error leyendo {danado.name}" in capsys.readouterr().out
+
+
+def _corregir(ruta, empresa, saldo):
+    """Reescribe el libro con otro saldo (mtime distinto aunque el sistema de archivos sea lento)."""
+    st = ruta.stat()
+    _saldos(ruta.parent, empresa, saldo)
+    os.utime(ruta, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+
+
+def test_token_cambia_solo_si_cambia_la_carpeta(carpeta):
+    alfa = _saldos(carpeta, "ALFA", 150)
+    token = datos_bancos.publicar("cubo", datos_bancos.cubo)
+    assert token == "cubo:1"
+    assert datos_bancos.publicar("cubo", datos_bancos.cubo) == "cubo:1"
+    assert _saldo_libros(datos_bancos.resolver(token)) == {"ALFA": 150.0}
+
+    _corregir(alfa, "ALFA", 175)
+    assert datos_bancos.publicar("cubo", datos_bancos.cubo) == "cubo:2"
+    # Otra pestaña con el token anterior sigue viendo su versión
+    assert _saldo_libros(datos_bancos.resolver("cubo:1")) == {"ALFA": 150.0}
+    assert _saldo_libros(datos_bancos.resolver("cubo:2")) == {"ALFA": 175.0}
+
+
+def test_resolver_entrega_copia_salvo_que_se_pida_la_guardada(carpeta):
+    _saldos(carpeta, "ALFA", 150)
+    token = datos_bancos.publicar("cubo", datos_bancos.cubo)
+    datos_bancos.resolver(token)["Saldo Libros"] = 0.0
+    assert _saldo_libros(datos_bancos.resolver(token)) == {"ALFA": 150.0}
+    assert datos_bancos.resolver(token, copia=False) is datos_bancos.resolver(token, copia=False)
+
+
+def test_token_vacio_o_desconocido(carpeta):
+    assert datos_bancos.resolver(None) is None
+    assert datos_bancos.resolver("") is None
+    # Nadie publicó este dataset en este proceso (p. ej. un Store de antes de reiniciar)
+    assert datos_bancos.resolver("cubo:3") is None
+
+
+def test_token_desplazado_se_vuelve_a_cargar(carpeta, monkeypatch):
+    alfa = _saldos(carpeta, "ALFA", 100)
+    for saldo in range(101, 101 + datos_bancos._VERSIONES):
+        datos_bancos.publicar("cubo", datos_bancos.cubo)
+        _corregir(alfa, "ALFA", saldo)
+    ultimo = datos_bancos.publicar("cubo", datos_bancos.cubo)
+    assert ultimo == f"cubo:{datos_bancos._VERSIONES + 1}"
+    versiones = [t for t, _, _ in datos_bancos._publicados["cubo"][1]]
+    assert "cubo:1" not in versiones and len(versiones) == datos_bancos._VERSIONES
+    # cubo:1 ya no está: se carga la carpeta actual y no se crea otra versión
+    assert _saldo_libros(datos_bancos.resolver("cubo:1")) == {"ALFA": 100.0 + datos_bancos._VERSIONES}
+    assert [t for t, _, _ in datos_bancos._publicados["cubo"][1]] == versiones
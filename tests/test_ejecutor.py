@@ -0,0 +1,181 @@
+import re
+
+import pandas as pd
+import pytest
+
+from COMUN import ejecutor
+from COMUN.ejecutor import Etapa
+from tests.conftest import importar
+
+PATRON_FINAL = re.compile(r"^.+ - \d{2}-\d{2}-\d{4}\.xlsx$")
+
+
+def _grafo(pipeline):
+    return importar(pipeline, "motor").GRAFO
+
+
+def _nombres(etapas):
+    return [e.nombre for e in etapas]
+
+
+class _ManifiestoFijo:
+    """Manifiesto de prueba: las etapas pendientes de cualquier archivo son las indicadas."""
+
+    def __init__(self, pendientes):
+        self._pendientes = set(pendientes)
+
+    def pendiente(self, ruta, etapa):
+        return etapa in self._pendientes
+
+
+class _Registro:
+    """Manifiesto e informe de prueba: guardan lo que les registra el proceso principal."""
+
+    def __init__(self):
+        self.olvidados, self.mediciones = [], []
+
+    def registrar(self, ruta, *etapas):
+        pass
+
+    def olvidar(self, ruta):
+        self.olvidados.append(ruta)
+
+    def agregar(self, med):
+        self.mediciones.append(med)
+
+
+def test_orden_de_los_grafos_de_los_motores():
+    assert _nombres(_grafo("BALANCE DETALLADO")) == [
+        "clean", "agregar_colum", "filtros", "remplazar", "categoria", "unificar", "decimales", "base_datos"]
+    assert _nombres(_grafo("INFORME BANCOS")) == ["clean", "estandar", "agregar_colum", "agregar_colm2"]
+
+
+def test_ordenar_prefiere_el_orden_declarado_entre_etapas_listas():
+    etapas = [Etapa("b", None, ("a",)), Etapa("c", None), Etapa("a", None), Etapa("d", None, ("a", "c"))]
+    assert _nombres(ejecutor.ordenar(etapas)) == ["c", "a", "b", "d"]
+    # Declaradas al revés de sus dependencias
+    etapas = [Etapa("z", None, ("y",)), Etapa("y", None, ("x",)), Etapa("x", None)]
+    assert _nombres(ejecutor.ordenar(etapas)) == ["x", "y", "z"]
+    assert ejecutor.ordenar([]) == []
+
+
+def test_ordenar_rechaza_dependencias_desconocidas_y_ciclos():
+    with pytest.raises(ValueError, match="'a' depende de 'x', que no está declarada"):
+        ejecutor.ordenar([Etapa("a", None, ("x",))])
+    with pytest.raises(ValueError, match=r"\['a', 'b'\] forman un ciclo"):
+        ejecutor.ordenar([Etapa("a", None, ("b",)), Etapa("b", None, ("a",)), Etapa("c", None)])
+    with pytest.raises(ValueError, match="ciclo"):
+        ejecutor.ordenar([Etapa("a", None, ("a",))])
+
+
+@pytest.mark.parametrize("directas, esperadas", [
+    ((), []),
+    (("base_datos",), ["base_datos"]),
+    (("decimales",), ["decimales", "base_datos"]),
+    # agregar_colum no depende de filtros: no arrastra remplazar ni categoria
+    (("agregar_colum",), ["agregar_colum", "unificar", "decimales", "base_datos"]),
+    (("remplazar",), ["remplazar", "categoria", "unificar", "decimales", "base_datos"]),
+    (("clean",), ["clean", "agregar_colum", "filtros", "remplazar", "categoria", "unificar", "decimales",
+                  "base_datos"]),
+    (("categoria", "base_datos"), ["categoria", "unificar", "decimales", "base_datos"]),
+])
+def test_pendientes_balance(directas, esperadas):
+    assert ejecutor.pendientes(_ManifiestoFijo(directas), "x.xlsx", _grafo("BALANCE DETALLADO")) == esperadas
+
+
+@pytest.mark.parametrize("directas, esperadas", [
+    (("estandar",), ["estandar", "agregar_colum", "agregar_colm2"]),
+    (("agregar_colm2",), ["agregar_colm2"]),
+    (("agregar_colum", "agregar_colm2"), ["agregar_colum", "agregar_colm2"]),
+])
+def test_pendientes_bancos(directas, esperadas):
+    assert ejecutor.pendientes(_ManifiestoFijo(directas), "x.xlsx", _grafo("INFORME BANCOS")) == esperadas
+
+
+def test_por_procesar(tmp_path):
+    final = tmp_path / "ZETA LTDA - 31-08-2025.xlsx"
+    crudo = tmp_path / "Balance.xlsx"
+    for ruta in (final, crudo):
+        ruta.touch()
+    grafo = _grafo("INFORME BANCOS")
+    rutas = [final, crudo, tmp_path / "BORRADO - 31-08-2025.xlsx"]
+    # Sin nombre final siempre hay trabajo (falta rename); los que no existen se omiten
+    assert ejecutor.por_procesar(rutas, _ManifiestoFijo(()), grafo, PATRON_FINAL) == [crudo]
+    assert ejecutor.por_procesar(rutas, _ManifiestoFijo({"agregar_colm2"}), grafo, PATRON_FINAL) == [final, crudo]
+
+
+def test_archivos_omite_los_bloqueos_de_excel(tmp_path):
+    for nombre in ("ZETA LTDA - 31-08-2025.xlsx", "~$ZETA LTDA - 31-08-2025.xlsx", "notas.txt"):
+        (tmp_path / nombre).touch()
+    assert [f.name for f in ejecutor.archivos(tmp_path)] == ["ZETA LTDA - 31-08-2025.xlsx"]
+
+
+def _etapas(registro):
+    def duplicar(df, archivo):
+        df["Saldo"] = df["Saldo"] * 2
+        return df
+
+    def no_aplica(df, archivo):
+        return None
+
+    def falla(df, archivo):
+        raise ValueError("columna desconocida")
+
+    def cargar(df, archivo):
+        registro.append(df["Saldo"].tolist())
+        return len(df)
+
+    return {"duplicar": Etapa("duplicar", duplicar), "no_aplica": Etapa("no_aplica", no_aplica),
+            "falla": Etapa("falla", falla, ("duplicar",)),
+            "cargar": Etapa("cargar", cargar, ("duplicar",), posterior=True)}
+
+
+def _leer(ruta):
+    return pd.read_excel(ruta), True
+
+
+@pytest.fixture
+def libro(tmp_path):
+    ruta = tmp_path / "ZETA LTDA - 31-08-2025.xlsx"
+    pd.DataFrame({"Saldo": [1.5, -2.0]}).to_excel(ruta, index=False)
+    return ruta
+
+
+def test_procesar_archivo_escribe_una_vez_y_aplica_las_posteriores(libro):
+    cargados = []
+    etapas = _etapas(cargados)
+    grafo = [etapas["duplicar"], etapas["no_aplica"], etapas["cargar"]]
+    resultado = ejecutor.procesar_archivo(libro, grafo, ["duplicar", "no_aplica", "cargar"], _leer, capturar=True)
+    assert resultado.error is None and resultado.aplicadas == ["duplicar", "no_aplica", "cargar"]
+    assert pd.read_excel(libro)["Saldo"].tolist() == [3.0, -4.0]
+    # La etapa posterior ve el DataFrame ya escrito
+    assert cargados == [[3.0, -4.0]]
+    assert [m["etapa"] for m in resultado.mediciones] == ["lectura", "duplicar", "no_aplica", "escritura", "cargar"]
+    assert "✅ Guardado" in resultado.log
+
+
+def test_etapas_que_no_aplican_no_reescriben_el_archivo(libro):
+    antes = libro.stat().st_mtime_ns
+    etapas = _etapas([])
+    resultado = ejecutor.procesar_archivo(libro, [etapas["no_aplica"]], ["no_aplica"], _leer, capturar=True)
+    assert resultado.aplicadas == ["no_aplica"]
+    assert libro.stat().st_mtime_ns == antes
+
+
+def test_etapa_que_falla_va_a_cuarentena(libro, tmp_path):
+    cargados = []
+    etapas = _etapas(cargados)
+    grafo = ejecutor.ordenar([etapas["duplicar"], etapas["falla"], etapas["cargar"]])
+    resultado = ejecutor.procesar_archivo(libro, grafo, ["duplicar", "falla", "cargar"], _leer, capturar=True)
+    assert resultado.error == ("falla", "columna desconocida") and resultado.cuarentena
+    assert resultado.aplicadas == [] and cargados == []
+    # Nada se escribió
+    assert pd.read_excel(libro)["Saldo"].tolist() == [1.5, -2.0]
+
+    manifiesto, informe = _Registro(), _Registro()
+    ejecutor.registrar_resultado(libro, resultado, manifiesto, informe, tmp_path / "_cuarentena")
+    assert not libro.exists() and manifiesto.olvidados == [libro]
+    assert [m["etapa"] for m in informe.mediciones] == ["lectura", "duplicar", "falla"]
+    error = (tmp_path / "_cuarentena" / f"{libro.name}.error.txt").read_text(encoding="utf-8")
+    assert "Etapa: falla" in error and "Error: columna desconocida" in error
+    assert (tmp_path / "_cuarentena" / libro.name).exists()
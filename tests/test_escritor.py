@@ -0,0 +1,116 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+from openpyxl import load_workbook
+
+from COMUN import escritor
+
+MOTORES = [pytest.param(True, id="xlsxwriter"), pytest.param(False, id="openpyxl")]
+
+
+@pytest.fixture(params=MOTORES)
+def motor(request, monkeypatch):
+    if request.param:
+        pytest.importorskip("xlsxwriter")
+    else:
+        monkeypatch.setattr(escritor, "xlsxwriter", None)
+    return request.param
+
+
+def _balance():
+    return pd.DataFrame({
+        "Cuenta contable": ["11100501", "23359501", "http://x.co"],
+        "Tercero": ["ZETA LTDA", None, "DELTA"],
+        "Saldo final": [1234567.891, np.nan, -0.5],
+        "Filas": np.array([3, 4, 5], dtype="int64"),
+        "Corte": [datetime.datetime(2025, 8, 31), pd.NaT, datetime.datetime(2025, 9, 30)],
+        "Mixta": [np.int64(7), "texto", 1.5],
+    })
+
+
+def _celdas(ruta):
+    hoja = load_workbook(ruta).active
+    return [[(c.value, c.number_format) for c in fila] for fila in hoja.iter_rows()]
+
+
+def test_valores_y_formatos(tmp_path, motor):
+    ruta = tmp_path / "ZETA LTDA - 31-08-2025.xlsx"
+    escritor.guardar_excel(_balance(), ruta)
+    celdas = _celdas(ruta)
+    assert [v for v, _ in celdas[0]] == list(_balance().columns)
+    valores = [[v for v, _ in fila] for fila in celdas[1:]]
+    assert valores == [
+        ["11100501", "ZETA LTDA", 1234567.891, 3, datetime.datetime(2025, 8, 31), 7],
+        # Vacíos sin celda
+        ["23359501", None, None, 4, None, "texto"],
+        ["http://x.co", "DELTA", -0.5, 5, datetime.datetime(2025, 9, 30), 1.5],
+    ]
+    # Solo las columnas float llevan el formato de miles con dos decimales
+    for fila in (celdas[1], celdas[3]):
+        assert [f for _, f in fila][:4] == ["General", "General", "#,##0.00", "General"]
+    # Releído con pandas: el saldo vuelve como float y la cuenta como texto
+    releido = pd.read_excel(ruta)
+    assert releido["Saldo final"].dtype == "float64"
+    assert releido["Cuenta contable"].tolist() == ["11100501", "23359501", "http://x.co"]
+
+
+def test_streaming_escribe_texto_literal(tmp_path):
+    pytest.importorskip("xlsxwriter")
+    ruta = tmp_path / "libro.xlsx"
+    escritor.guardar_excel(pd.DataFrame({"Tercero": ["=SUMA(A1)", "http://x.co"]}), ruta)
+    celdas = [c for (c,) in load_workbook(ruta).active.iter_rows(min_row=2)]
+    assert [(c.value, c.data_type, c.hyperlink) for c in celdas] == [
+        ("=SUMA(A1)", "s", None), ("http://x.co", "s", None)]
+
+
+def test_falla_al_escribir_deja_el_archivo_anterior(tmp_path, motor, monkeypatch):
+    ruta = tmp_path / "ZETA LTDA - 31-08-2025.xlsx"
+    escritor.guardar_excel(pd.DataFrame({"Tercero": ["ANTERIOR"]}), ruta)
+
+    def falla(*args):
+        raise OSError("disco lleno")
+
+    monkeypatch.setattr(escritor, "_guardar_streaming" if motor else "_guardar_openpyxl", falla)
+    with pytest.raises(OSError):
+        escritor.guardar_excel(pd.DataFrame({"Tercero": ["NUEVO"]}), ruta)
+    assert pd.read_excel(ruta)["Tercero"].tolist() == ["ANTERIOR"]
+    assert [f.name for f in tmp_path.iterdir()] == [ruta.name]
+
+
+@pytest.mark.parametrize("filas", [0, 1, 3, 4, 7])
+def test_limites_de_bloque(tmp_path, motor, monkeypatch, filas):
+    # Bloques de 3 filas: vacío, menos de un bloque, justo uno, uno y fracción, varios
+    monkeypatch.setattr(escritor, "FILAS_BLOQUE", 3)
+    df = pd.DataFrame({"Cuenta contable": [str(1000 + i) for i in range(filas)],
+                       "Saldo final": [i + 0.25 for i in range(filas)]})
+    ruta = tmp_path / "libro.xlsx"
+    escritor.guardar_excel(df, ruta)
+    releido = pd.read_excel(ruta, dtype={"Cuenta contable": str})
+    assert list(releido.columns) == ["Cuenta contable", "Saldo final"]
+    assert releido.to_dict("list") == df.to_dict("list")
+
+
+def test_escritor_por_bloques_igual_a_guardar_de_una_vez(tmp_path, motor, monkeypatch):
+    monkeypatch.setattr(escritor, "FILAS_BLOQUE", 2)
+    df = _balance()
+    escritor.guardar_excel(df, tmp_path / "entero.xlsx")
+    por_bloques = escritor.EscritorBloques(tmp_path / "bloques.xlsx")
+    for inicio in (0, 1):
+        por_bloques.escribir(df.iloc[inicio * 2:inicio * 2 + 2])
+    # El archivo final no aparece hasta cerrar
+    assert not (tmp_path / "bloques.xlsx").exists()
+    por_bloques.cerrar()
+    assert por_bloques.filas == 3
+    assert _celdas(tmp_path / "bloques.xlsx") == _celdas(tmp_path / "entero.xlsx")
+
+
+def test_descartar_deja_el_archivo_como_estaba(tmp_path, motor):
+    ruta = tmp_path / "libro.xlsx"
+    escritor.guardar_excel(pd.DataFrame({"Tercero": ["ANTERIOR"]}), ruta)
+    por_bloques = escritor.EscritorBloques(ruta)
+    por_bloques.escribir(pd.DataFrame({"Tercero": ["NUEVO"]}))
+    por_bloques.descartar()
+    assert pd.read_excel(ruta)["Tercero"].tolist() == ["ANTERIOR"]
+    assert [f.name for f in tmp_path.iterdir()] == [ruta.name]
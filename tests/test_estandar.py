@@ -0,0 +1,140 @@
+import json
+import warnings
+
+import pandas as pd
+import pytest
+
+from tests.conftest import importar
+
+estandar = importar("INFORME BANCOS", "estandar")
+
+# Encabezado de "AMERICAN LIGHTING S.A.S. - 30-06-2025.xlsx": tres columnas sin nombre con
+# cálculos sueltos entre "Cheques x Ent" y "Saldo Bancos"
+ENCABEZADO = [
+    "Cuenta", " Saldo Inicial", "ABR - Notas contables", "Ajustes y Reclasificaciones", "CE CHEQUES",
+    "CE TRANSF", "Comprobante de Egreso", "Comprobante de Ingreso", "Cuenta Por Pagar",
+    "Documento de Cartera Reversado", "Gastos Bancarios", "GASTOS BANCARIOS AUTOMATICOS",
+    "Legalizacion de anticipos", "Prestamos", "Traslado de Fondos", "Saldo Libros", "Cheques x Ent",
+    "Unnamed: 17", "Unnamed: 18", "Unnamed: 19", "Saldo Bancos",
+    "Empresa", "Fecha", "Fecha Inicial", "Banco", "Tipo de Cuenta",
+]
+
+
+def _libro(filas=16):
+    df = pd.DataFrame({col: [float(i) for i in range(filas)] for col in ENCABEZADO})
+    df["Cuenta"] = [f"BANCO DE OCCIDENTE AHO {830126000 + i} CUENTA AHORROS" for i in range(filas)]
+    df.loc[filas - 1, "Cuenta"] = None
+    # Como en el libro real: 16 / 15 / 16 valores en las columnas sin nombre
+    df.loc[filas - 1, "Unnamed: 18"] = None
+    for col in ("Empresa", "Fecha", "Fecha Inicial", "Banco", "Tipo de Cuenta"):
+        df[col] = "x"
+    return df
+
+
+def test_columnas_sin_encabezado_se_descartan_con_aviso():
+    with warnings.catch_warnings(record=True) as avisos:
+        warnings.simplefilter("always")
+        resultado = estandar.procesar(_libro(), "AMERICAN LIGHTING S.A.S. - 30-06-2025.xlsx")
+    assert list(resultado.columns) == estandar.columnas_requeridas
+    assert len(resultado) == 16
+    assert [type(a.message) for a in avisos] == [estandar.AvisoEsquema]
+    assert "{'Unnamed: 17': 16, 'Unnamed: 18': 15, 'Unnamed: 19': 16}" in str(avisos[0].message)
+
+
+def test_columnas_sin_encabezado_vacias_no_avisan():
+    df = _libro()
+    df[["Unnamed: 17", "Unnamed: 18", "Unnamed: 19"]] = None
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        resultado = estandar.procesar(df, "X - 30-06-2025.xlsx")
+    assert list(resultado.columns) == estandar.columnas_requeridas
+
+
+def test_columna_con_nombre_no_registrada_es_cambio_de_esquema():
+    df = _libro().rename(columns={"Unnamed: 17": "Otros Documentos"})
+    with pytest.raises(estandar.CambioDeEsquema, match="Otros Documentos"):
+        estandar.procesar(df, "X - 30-06-2025.xlsx")
+
+
+def test_plan_normaliza_tildes_mayusculas_y_espacios():
+    columnas = ["CUENTA", "saldo  inicial", "Legalización de Anticipos", "Saldo Libros", "Unnamed: 4",
+                "Banco", "Fecha Inicial", "Unnamed: 7"]
+    renombres, faltantes, descartar, sin_nombre = estandar._compilar(columnas)
+    assert renombres == {"CUENTA": "Cuenta", "saldo  inicial": " Saldo Inicial",
+                         "Legalización de Anticipos": "Legalizacion de anticipos"}
+    assert descartar == ["Banco", "Fecha Inicial"]
+    assert sin_nombre == ["Unnamed: 4", "Unnamed: 7"]
+    assert faltantes == [c for c in estandar.columnas_requeridas
+                         if c not in ("Cuenta", " Saldo Inicial", "Legalizacion de anticipos", "Saldo Libros")]
+
+
+@pytest.mark.parametrize("columnas, mensaje", [
+    (["Cuenta", "Saldo Libros", "Otros Documentos"], "no registradas.*Otros Documentos"),
+    ([" Saldo Inicial", "Saldo Libros"], "no tiene la columna 'Cuenta'"),
+    (["Cuenta", "Saldo Libros", "SALDO LIBROS"], "'Saldo Libros' y 'SALDO LIBROS' corresponden a la misma"),
+])
+def test_plan_rechaza_encabezados_fuera_del_registro(columnas, mensaje):
+    with pytest.raises(estandar.CambioDeEsquema, match=mensaje):
+        estandar._compilar(columnas)
+
+
+@pytest.fixture
+def esquema_propio(tmp_path, monkeypatch):
+    ruta = tmp_path / "esquema.json"
+    ruta.write_text(json.dumps({"filas_excluir": "SUBTOTAL", "ignoradas": ["Notas"], "columnas": [
+        {"nombre": "Cuenta", "tipo": "texto"},
+        {"nombre": "Saldo Libros", "variantes": ["Saldo en Libros", "SALDO CONTABLE"]},
+        {"nombre": "Saldo Bancos"},
+    ]}), encoding="utf-8")
+    columnas, tipos, indice, ignoradas, excluir = estandar.cargar_esquema(ruta)
+    for nombre, valor in (("columnas_requeridas", columnas), ("tipos_columna", tipos),
+                          ("indice_encabezados", indice), ("columnas_ignoradas", ignoradas),
+                          ("filas_excluir", excluir), ("columnas_numericas", ["Saldo Libros", "Saldo Bancos"]),
+                          ("_planes", {})):
+        monkeypatch.setattr(estandar, nombre, valor)
+    return indice
+
+
+def test_variantes_registradas(esquema_propio):
+    assert esquema_propio == {"CUENTA": "Cuenta", "SALDO LIBROS": "Saldo Libros",
+                              "SALDO EN LIBROS": "Saldo Libros", "SALDO CONTABLE": "Saldo Libros",
+                              "SALDO BANCOS": "Saldo Bancos"}
+    assert estandar._compilar(["Cuenta", "Saldo Contable", "Notas"]) == (
+        {"Saldo Contable": "Saldo Libros"}, ["Saldo Bancos"], ["Notas"], [])
+
+
+def test_variante_en_dos_columnas_es_error(tmp_path):
+    ruta = tmp_path / "esquema.json"
+    ruta.write_text(json.dumps({"columnas": [{"nombre": "Saldo Libros", "variantes": ["Saldo"]},
+                                             {"nombre": "Saldo Bancos", "variantes": ["SALDO"]}]}),
+                    encoding="utf-8")
+    with pytest.raises(ValueError, match="'SALDO' está registrada para 'Saldo Libros' y 'Saldo Bancos'"):
+        estandar.cargar_esquema(ruta)
+
+
+def test_procesar_con_esquema_propio(esquema_propio):
+    df = pd.DataFrame({"SALDO CONTABLE": ["1.5", 2, None], "Cuenta": ["BANCOLOMBIA AHO 1", "SUBTOTAL", "X"],
+                       "Notas": ["a", "b", "c"]})
+    resultado = estandar.procesar(df, "X - 30-06-2025.xlsx")
+    assert list(resultado.columns) == ["Cuenta", "Saldo Libros", "Saldo Bancos"]
+    assert resultado["Cuenta"].tolist() == ["BANCOLOMBIA AHO 1", "X"]
+    assert resultado["Saldo Libros"].dtype == "float64" and resultado["Saldo Bancos"].dtype == "float64"
+    assert resultado.fillna(0)["Saldo Libros"].tolist() == [1.5, 0.0]
+    # El mismo layout reutiliza el plan compilado
+    assert list(estandar._planes) == [("SALDO CONTABLE", "Cuenta", "Notas")]
+
+
+def test_texto_no_numerico_en_un_saldo_es_cambio_de_esquema(esquema_propio):
+    df = pd.DataFrame({"Cuenta": ["BANCOLOMBIA AHO 1", "BBVA COR 2"], "Saldo Libros": [1.0, "1.234,50"]})
+    with pytest.raises(estandar.CambioDeEsquema, match=r"no numéricos en 'Saldo Libros': \['1.234,50'\]"):
+        estandar.procesar(df, "X - 30-06-2025.xlsx")
+
+
+def test_filas_de_totales_se_eliminan():
+    df = _libro(4)
+    df[["Unnamed: 17", "Unnamed: 18", "Unnamed: 19"]] = None
+    df.loc[1, "Cuenta"] = "TOTALES BANCO DE OCCIDENTE"
+    df.loc[2, "Cuenta"] = "total general"
+    resultado = estandar.procesar(df, "X - 30-06-2025.xlsx")
+    assert resultado["Cuenta"].tolist()[0] == "BANCO DE OCCIDENTE AHO 830126000 CUENTA AHORROS"
+    assert len(resultado) == 2
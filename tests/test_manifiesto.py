@@ -0,0 +1,122 @@
+import os
+
+import pytest
+
+from COMUN.manifiesto import Manifiesto, hash_archivo
+from tests.conftest import importar
+
+ETAPAS = {"clean": 1, "estandar": 1, "agregar_colm2": 2}
+
+
+@pytest.fixture
+def libro(tmp_path):
+    ruta = tmp_path / "EMPRESA - 31-08-2025.xlsx"
+    ruta.write_bytes(b"contenido original")
+    return ruta
+
+
+def _tocar(ruta, segundos=10):
+    """Cambia solo el mtime del archivo."""
+    st = os.stat(ruta)
+    os.utime(ruta, ns=(st.st_atime_ns, st.st_mtime_ns + segundos * 10 ** 9))
+
+
+def test_archivo_nuevo_pendiente_hasta_registrar(tmp_path, libro):
+    manifiesto = Manifiesto(tmp_path / "_manifiesto.json", ETAPAS)
+    assert not manifiesto.existia
+    assert manifiesto.pendiente(libro, "clean")
+    manifiesto.registrar(libro, "clean", "estandar")
+    assert not manifiesto.pendiente(libro, "clean")
+    assert not manifiesto.pendiente(libro, "estandar")
+    assert manifiesto.pendiente(libro, "agregar_colm2")
+    assert manifiesto.entrada(libro)["hash"] == hash_archivo(libro)
+
+
+def test_cambio_de_mtime_sin_cambio_de_contenido_no_reprocesa(tmp_path, libro):
+    manifiesto = Manifiesto(tmp_path / "_manifiesto.json", ETAPAS)
+    manifiesto.registrar(libro, *ETAPAS)
+    _tocar(libro)
+    assert not any(manifiesto.pendiente(libro, e) for e in ETAPAS)
+    # La huella nueva queda guardada: la siguiente consulta vuelve a costar solo un stat()
+    assert manifiesto.archivos[libro.name]["mtime"] == os.stat(libro).st_mtime_ns
+
+
+def test_cambio_de_contenido_reinicia_todas_las_etapas(tmp_path, libro):
+    manifiesto = Manifiesto(tmp_path / "_manifiesto.json", ETAPAS)
+    manifiesto.registrar(libro, *ETAPAS)
+    libro.write_bytes(b"contenido editado por fuera")
+    _tocar(libro)
+    assert all(manifiesto.pendiente(libro, e) for e in ETAPAS)
+    assert manifiesto.archivos[libro.name]["etapas"] == {}
+
+
+def test_subir_version_deja_pendiente_solo_esa_etapa(tmp_path, libro):
+    ruta_json = tmp_path / "_manifiesto.json"
+    manifiesto = Manifiesto(ruta_json, {**ETAPAS, "agregar_colm2": 1})
+    manifiesto.registrar(libro, *ETAPAS)
+    manifiesto.guardar()
+    recargado = Manifiesto(ruta_json, ETAPAS)
+    assert [e for e in ETAPAS if recargado.pendiente(libro, e)] == ["agregar_colm2"]
+
+
+def test_guardar_y_recargar(tmp_path, libro):
+    ruta_json = tmp_path / "_manifiesto.json"
+    manifiesto = Manifiesto(ruta_json, ETAPAS)
+    manifiesto.registrar(libro, "clean")
+    manifiesto.guardar()
+    recargado = Manifiesto(ruta_json, ETAPAS)
+    assert recargado.existia
+    assert recargado.archivos == manifiesto.archivos
+    assert not recargado.pendiente(libro, "clean")
+
+
+def test_manifiesto_ilegible_se_reconstruye(tmp_path, libro):
+    ruta_json = tmp_path / "_manifiesto.json"
+    ruta_json.write_text("{no es json", encoding="utf-8")
+    manifiesto = Manifiesto(ruta_json, ETAPAS)
+    assert manifiesto.archivos == {}
+    assert manifiesto.pendiente(libro, "clean")
+
+
+def test_olvidar_adoptar_y_limpiar(tmp_path, libro):
+    manifiesto = Manifiesto(tmp_path / "_manifiesto.json", ETAPAS)
+    manifiesto.adoptar(libro)
+    assert not any(manifiesto.pendiente(libro, e) for e in ETAPAS)
+    manifiesto.adoptar(libro, {"clean": 1, "estandar": 1, "agregar_colm2": 1})
+    assert [e for e in ETAPAS if manifiesto.pendiente(libro, e)] == ["agregar_colm2"]
+    manifiesto.olvidar(libro)
+    assert manifiesto.entrada(libro) is None
+
+    manifiesto.registrar(libro, "clean")
+    borrado = tmp_path / "EMPRESA - 31-07-2025.xlsx"
+    borrado.write_bytes(b"otro")
+    manifiesto.registrar(borrado, "clean")
+    borrado.unlink()
+    manifiesto.limpiar(tmp_path)
+    assert list(manifiesto.archivos) == [libro.name]
+
+
+def test_migracion_desde_la_lista_de_recien_renombrados(tmp_path, monkeypatch):
+    path_utils = importar("BALANCE DETALLADO", "path_utils")
+    monkeypatch.setattr(path_utils, "UPLOAD_FOLDER", tmp_path)
+    monkeypatch.setattr(path_utils, "MANIFIESTO_JSON", tmp_path / "_manifiesto.json")
+    monkeypatch.setattr(path_utils, "NEW_FILES_LIST", tmp_path / "_archivos_recien_renombrados.txt")
+    procesado = tmp_path / "ZETA LTDA - 31-07-2025.xlsx"
+    recien = tmp_path / "ZETA LTDA - 31-08-2025.xlsx"
+    crudo = tmp_path / "export_0001.xlsx"
+    for ruta in (procesado, recien, crudo):
+        ruta.write_bytes(ruta.name.encode())
+    path_utils.NEW_FILES_LIST.write_text(f"{recien.name}\n", encoding="utf-8")
+
+    manifiesto = path_utils.cargar_manifiesto()
+
+    # Lo que ya estaba procesado queda con la versión 1 de las etapas de entonces: solo
+    # vuelven a aplicar decimales (v2) y la carga en la base, que no existía
+    pendientes = [e for e in path_utils.ETAPAS if manifiesto.pendiente(procesado, e)]
+    assert pendientes == ["decimales", "base_datos"]
+    # El recién renombrado y la exportación sin nombre final siguen pendientes en todo
+    assert all(manifiesto.pendiente(recien, e) for e in path_utils.ETAPAS)
+    assert all(manifiesto.pendiente(crudo, e) for e in path_utils.ETAPAS)
+    # La adopción solo ocurre la primera vez; después se limpian los archivos que ya no están
+    procesado.unlink()
+    assert path_utils.cargar_manifiesto().archivos == {}
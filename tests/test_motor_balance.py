@@ -0,0 +1,75 @@
+import json
+import re
+import sqlite3
+
+import pytest
+
+from tests.conftest import copiar_pipeline, ejecutar, generar, libros
+
+PIPELINE = "BALANCE DETALLADO"
+# Dos empresas, dos cortes: 4 exportaciones crudas con filas de subtotal y cuentas CXP
+PARAMETROS = {"empresas": 2, "meses": 2, "filas_balance": 80}
+
+
+@pytest.fixture(scope="module")
+def procesados(tmp_path_factory):
+    """Las mismas exportaciones procesadas por el motor y por los scripts por separado."""
+    resultado = {}
+    for modo, argumentos in (("motor", ()), ("por-scripts", ("--por-scripts",))):
+        carpeta, entrada = copiar_pipeline(PIPELINE, tmp_path_factory.mktemp(modo))
+        generar(entrada, PIPELINE, **PARAMETROS)
+        ejecutar(carpeta, *argumentos)
+        resultado[modo] = entrada
+    return resultado
+
+
+def _filas_base(entrada):
+    with sqlite3.connect(entrada / "_balances.sqlite") as conexion:
+        return sorted(conexion.execute("SELECT * FROM balances").fetchall(), key=repr)
+
+
+def test_motor_deja_los_mismos_libros_que_los_scripts(procesados):
+    motor, scripts = libros(procesados["motor"]), libros(procesados["por-scripts"])
+    assert len(motor) == 4
+    assert all(re.match(r"^.+ - 3[01]-0[78]-2025\.xlsx$", nombre) for nombre in motor)
+    assert motor == scripts
+
+
+def test_motor_carga_la_misma_base_que_los_scripts(procesados):
+    filas = _filas_base(procesados["motor"])
+    assert len(filas) == 4 * PARAMETROS["filas_balance"]
+    assert filas == _filas_base(procesados["por-scripts"])
+
+
+def test_libro_procesado_sin_subtotales_y_con_saldos_numericos(procesados):
+    for nombre, celdas in libros(procesados["motor"]).items():
+        encabezado, filas = celdas[0], celdas[1:]
+        columna = {c: i for i, c in enumerate(encabezado)}
+        empresa, fecha = nombre[:-len(" - dd-mm-aaaa.xlsx")], nombre[-15:-5].replace("-", "/")
+        # filtros.py quita los subtotales (filas sin tercero) y deja una fila por tercero
+        assert len(filas) == PARAMETROS["filas_balance"]
+        assert all(f[columna["Tercero"]] for f in filas)
+        assert {f[columna["Fecha"]] for f in filas} == {fecha}
+        assert {f[columna["Empresa"]] for f in filas} == {empresa.replace(".", ",")}
+        # decimales v2: los saldos quedan como números, no como texto con coma
+        for col in ("Saldo anterior", "Débitos", "Créditos", "Saldo final"):
+            assert all(isinstance(f[columna[col]], (int, float)) for f in filas), col
+
+
+def test_segunda_ejecucion_no_procesa_nada(procesados):
+    entrada = procesados["motor"]
+    carpeta = entrada.parent
+    antes = {f.name: f.stat().st_mtime_ns for f in entrada.iterdir() if f.is_file()}
+    manifiesto = (entrada / "_manifiesto.json").read_text(encoding="utf-8")
+
+    salida = ejecutar(carpeta)
+
+    assert "No hay archivos nuevos para procesar" in salida
+    assert (entrada / "_manifiesto.json").read_text(encoding="utf-8") == manifiesto
+    despues = {f.name: f.stat().st_mtime_ns for f in entrada.iterdir() if f.is_file()}
+    # Los libros y las bases no se tocan; el manifiesto se reescribe igual (ver arriba)
+    assert {n for n in antes if antes[n] != despues.get(n)} <= {
+        "_informe_ejecuciones.jsonl", "_generacion.json", "_manifiesto.json"}
+    lineas = [json.loads(l) for l in (entrada / "_informe_ejecuciones.jsonl").read_text(encoding="utf-8").splitlines()]
+    ultima = lineas[-1]["ejecucion"]
+    assert not [l for l in lineas if l["ejecucion"] == ultima and l["tipo"] == "archivo"]
@@ -0,0 +1,75 @@
+import json
+import sqlite3
+
+import pytest
+
+from tests.conftest import copiar_pipeline, ejecutar, generar, libros, valores
+
+PIPELINE = "INFORME BANCOS"
+# Tres empresas, dos cortes; con esta semilla una exportación trae "Otros Documentos"
+# (columna no registrada en esquema_bancos.json)
+PARAMETROS = {"empresas": 3, "meses": 2, "filas_bancos": 6, "semilla": 20}
+MODOS = {
+    "workers-2": ("--workers", "2"),
+    "workers-1": ("--workers", "1"),
+    "por-scripts": ("--por-scripts",),
+}
+
+
+@pytest.fixture(scope="module")
+def procesados(tmp_path_factory):
+    """Las mismas exportaciones procesadas en paralelo, en serie y por los scripts."""
+    resultado = {}
+    for modo, argumentos in MODOS.items():
+        carpeta, entrada = copiar_pipeline(PIPELINE, tmp_path_factory.mktemp(modo))
+        generar(entrada, PIPELINE, **PARAMETROS)
+        ejecutar(carpeta, *argumentos)
+        resultado[modo] = entrada
+    return resultado
+
+
+def _cortes(entrada):
+    with sqlite3.connect(entrada / "_periodos.sqlite") as conexion:
+        return conexion.execute(
+            "SELECT archivo, empresa, fecha_inicial, fecha_final, estado FROM periodos ORDER BY archivo").fetchall()
+
+
+def test_paralelo_igual_a_serie_y_a_los_scripts(procesados):
+    paralelo = libros(procesados["workers-2"])
+    assert len(paralelo) == 5
+    assert paralelo == libros(procesados["workers-1"])
+    # Los scripts dejan el archivo con el cambio de esquema en la carpeta (solo lo informan)
+    scripts = libros(procesados["por-scripts"])
+    assert {n: scripts[n] for n in paralelo} == paralelo
+
+
+def test_indice_de_bancos_y_periodos_iguales_en_paralelo(procesados):
+    def indice(entrada):
+        return json.loads((entrada / "_indice_bancos.json").read_text(encoding="utf-8"))
+
+    assert indice(procesados["workers-2"]) == indice(procesados["workers-1"])
+    assert _cortes(procesados["workers-2"]) == _cortes(procesados["workers-1"])
+    assert {estado for *_, estado in _cortes(procesados["workers-2"])} == {"procesado", "cuarentena"}
+
+
+def test_libro_procesado_con_columnas_del_esquema(procesados):
+    for nombre, celdas in libros(procesados["workers-2"]).items():
+        encabezado, filas = celdas[0], celdas[1:]
+        assert encabezado[-5:] == ["Empresa", "Fecha", "Fecha Inicial", "Banco", "Tipo de Cuenta"]
+        # estandar quita la fila de TOTALES; agregar_colm2 resuelve banco y tipo de cada cuenta
+        assert len(filas) == PARAMETROS["filas_bancos"]
+        for fila in filas:
+            cuenta, banco, tipo = fila[0], fila[-2], fila[-1]
+            assert cuenta.startswith(banco) and tipo in ("AHO", "COR")
+            assert fila[-4] == nombre[-15:-5].replace("-", "/")
+
+
+def test_cambio_de_esquema_va_a_cuarentena_y_el_lote_sigue(procesados):
+    cuarentena = procesados["workers-2"] / "_cuarentena"
+    archivos = sorted(cuarentena.glob("*.xlsx"))
+    assert len(archivos) == 1
+    # Se mueve la exportación tal como llegó (ya renombrada), con el error al lado
+    assert "Otros Documentos" in valores(archivos[0])[5]
+    error = (cuarentena / f"{archivos[0].name}.error.txt").read_text(encoding="utf-8")
+    assert "Etapa: estandar" in error and "Otros Documentos" in error
+    assert not (procesados["workers-2"] / archivos[0].name).exists()
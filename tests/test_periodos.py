@@ -0,0 +1,153 @@
+import sqlite3
+from datetime import date
+
+import pytest
+
+from COMUN import periodos
+from COMUN.manifiesto import Manifiesto
+from COMUN.periodos import IndicePeriodos
+
+AL, ZETA = "AMERICAN LIGHTING S.A.S.", "ZETA LTDA"
+
+# (archivo, fecha inicial, estado): varios cortes en un mismo mes, meses sin corte y
+# cortes que no cuentan como procesados
+CORTES = [
+    ("AMERICAN LIGHTING S.A.S. - 15-01-2025.xlsx", "01/01/2025", "procesado"),
+    ("AMERICAN LIGHTING S.A.S. - 31-01-2025.xlsx", "16/01/2025", "procesado"),
+    ("AMERICAN LIGHTING S.A.S. - 31-03-2025.xlsx", "01/03/2025", "procesado"),
+    ("AMERICAN LIGHTING S.A.S. - 30-06-2025.xlsx", "01/06/2025", "procesado"),
+    ("AMERICAN LIGHTING S.A.S. - 31-07-2025.xlsx", "01/07/2025", "pendiente"),
+    ("ZETA LTDA - 28-02-2025.xlsx", "01/02/2025", "procesado"),
+    ("ZETA LTDA - 10-02-2025.xlsx", "01/02/2025", "procesado"),
+    ("ZETA LTDA - 31-12-2024.xlsx", None, "procesado"),
+    ("ZETA LTDA - 31-01-2025.xlsx", "01/01/2025", "cuarentena"),
+]
+
+
+@pytest.fixture
+def indice(tmp_path):
+    with IndicePeriodos(tmp_path / "_periodos.sqlite") as indice:
+        for archivo, inicial, estado in CORTES:
+            assert indice.registrar(archivo, inicial, estado=estado)
+        yield indice
+
+
+def test_ultimo_corte_por_mes(indice):
+    # Dos cortes en enero: cuenta el del 31; los cortes pendientes o en cuarentena no cuentan
+    assert indice.ultimo_corte_por_mes(AL) == [
+        (AL, "2025-01", "2025-01-31", "AMERICAN LIGHTING S.A.S. - 31-01-2025.xlsx"),
+        (AL, "2025-03", "2025-03-31", "AMERICAN LIGHTING S.A.S. - 31-03-2025.xlsx"),
+        (AL, "2025-06", "2025-06-30", "AMERICAN LIGHTING S.A.S. - 30-06-2025.xlsx"),
+    ]
+    # Registrados en desorden: gana la fecha final, no el orden de registro
+    assert indice.ultimo_corte_por_mes(ZETA) == [
+        (ZETA, "2024-12", "2024-12-31", "ZETA LTDA - 31-12-2024.xlsx"),
+        (ZETA, "2025-02", "2025-02-28", "ZETA LTDA - 28-02-2025.xlsx"),
+    ]
+    assert indice.ultimo_corte_por_mes() == indice.ultimo_corte_por_mes(AL) + indice.ultimo_corte_por_mes(ZETA)
+    assert indice.ultimo_corte_por_mes("NO EXISTE") == []
+    assert indice.ultimo_corte_por_mes(AL, estado="pendiente") == [
+        (AL, "2025-07", "2025-07-31", "AMERICAN LIGHTING S.A.S. - 31-07-2025.xlsx")]
+
+
+def test_meses_faltantes(indice):
+    assert indice.meses_faltantes(AL) == ["2025-02", "2025-04", "2025-05"]
+    # El corte de enero de ZETA está en cuarentena
+    assert indice.meses_faltantes(ZETA) == ["2025-01"]
+    assert indice.meses_faltantes("NO EXISTE") == []
+
+
+def test_meses_faltantes_con_rango(indice):
+    assert indice.meses_faltantes(ZETA, desde="2024-11", hasta="2025-03") == ["2024-11", "2025-01", "2025-03"]
+
+
+def test_fechas_empresas_y_cortes(indice):
+    assert indice.fechas() == ["2024-12-31", "2025-01-15", "2025-01-31", "2025-02-10", "2025-02-28",
+                               "2025-03-31", "2025-06-30"]
+    assert indice.empresas() == [AL, ZETA]
+    assert indice.cortes(ZETA) == [
+        (ZETA, None, "2024-12-31", "ZETA LTDA - 31-12-2024.xlsx", "procesado"),
+        (ZETA, "2025-02-01", "2025-02-10", "ZETA LTDA - 10-02-2025.xlsx", "procesado"),
+        (ZETA, "2025-02-01", "2025-02-28", "ZETA LTDA - 28-02-2025.xlsx", "procesado"),
+    ]
+    # Todos los estados, por fecha final y empresa
+    assert [c[3] for c in indice.cortes(estado=None)] == [
+        "ZETA LTDA - 31-12-2024.xlsx",
+        "AMERICAN LIGHTING S.A.S. - 15-01-2025.xlsx",
+        "AMERICAN LIGHTING S.A.S. - 31-01-2025.xlsx",
+        "ZETA LTDA - 31-01-2025.xlsx",
+        "ZETA LTDA - 10-02-2025.xlsx",
+        "ZETA LTDA - 28-02-2025.xlsx",
+        "AMERICAN LIGHTING S.A.S. - 31-03-2025.xlsx",
+        "AMERICAN LIGHTING S.A.S. - 30-06-2025.xlsx",
+        "AMERICAN LIGHTING S.A.S. - 31-07-2025.xlsx",
+    ]
+    assert indice.fechas(estado="cuarentena") == ["2025-01-31"]
+
+
+def test_registrar_ignora_nombres_no_finales_y_no_pisa_con_none(indice):
+    assert not indice.registrar("Saldos bancos agosto.xlsx", "01/08/2025")
+    archivo = "ZETA LTDA - 28-02-2025.xlsx"
+    indice.registrar(archivo, hash_origen="abc")
+    indice.registrar(archivo, estado="cuarentena")
+    assert indice.cortes("ZETA LTDA", estado="cuarentena")[-1] == (
+        "ZETA LTDA", "2025-02-01", "2025-02-28", archivo, "cuarentena")
+    hash_guardado, = indice.conexion.execute("SELECT hash FROM periodos WHERE archivo = ?", (archivo,)).fetchone()
+    assert hash_guardado == "abc"
+
+
+def test_fechas_iniciales_y_migracion_del_json(tmp_path):
+    fechas = {"ZETA LTDA - 31-08-2025.xlsx": "01/08/2025", "OTRA S.A. - 30-09-2025.xlsx": "01/09/2025"}
+    with IndicePeriodos(tmp_path / "_periodos.sqlite") as indice:
+        indice.importar_json({**fechas, "sin nombre final.xlsx": "01/01/2025"})
+        assert indice.fechas_iniciales() == fechas
+
+
+def test_sincronizar_deja_el_indice_igual_a_la_carpeta(tmp_path):
+    carpeta = tmp_path / "SALDO BANCOS"
+    cuarentena = carpeta / "_cuarentena"
+    cuarentena.mkdir(parents=True)
+    etapas = {"clean": 1, "estandar": 1}
+    manifiesto = Manifiesto(carpeta / "_manifiesto.json", etapas)
+    for nombre in ("ZETA LTDA - 31-07-2025.xlsx", "ZETA LTDA - 31-08-2025.xlsx", "sin nombre final.xlsx",
+                   "~$ZETA LTDA - 31-08-2025.xlsx"):
+        (carpeta / nombre).write_bytes(nombre.encode())
+    (cuarentena / "ZETA LTDA - 30-09-2025.xlsx").write_bytes(b"roto")
+    manifiesto.registrar(carpeta / "ZETA LTDA - 31-07-2025.xlsx", *etapas)
+    manifiesto.registrar(carpeta / "ZETA LTDA - 31-08-2025.xlsx", "clean")
+
+    with IndicePeriodos(carpeta / "_periodos.sqlite") as indice:
+        indice.registrar("ZETA LTDA - 30-06-2025.xlsx", "01/06/2025", estado="procesado")
+        indice.registrar("ZETA LTDA - 31-07-2025.xlsx", "01/07/2025", hash_origen="original")
+        indice.sincronizar(carpeta, manifiesto, etapas, cuarentena)
+        estados = {archivo: estado for _, _, _, archivo, estado in indice.cortes(estado=None)}
+        assert estados == {
+            "ZETA LTDA - 31-07-2025.xlsx": "procesado",
+            "ZETA LTDA - 31-08-2025.xlsx": "pendiente",
+            "ZETA LTDA - 30-09-2025.xlsx": "cuarentena",
+        }
+        hashes = dict(indice.conexion.execute("SELECT archivo, hash FROM periodos"))
+    # El hash de la exportación no se reemplaza por el del archivo procesado
+    assert hashes["ZETA LTDA - 31-07-2025.xlsx"] == "original"
+    assert hashes["ZETA LTDA - 31-08-2025.xlsx"] == manifiesto.archivos["ZETA LTDA - 31-08-2025.xlsx"]["hash"]
+
+
+def test_consultas_en_solo_lectura(tmp_path, indice):
+    assert periodos.consultar(tmp_path / "otra carpeta") is None
+    assert periodos.fechas_corte(tmp_path / "otra carpeta") is None
+    assert periodos.fechas_corte(tmp_path) == [date.fromisoformat(f) for f in indice.fechas()]
+    solo_lectura = periodos.consultar(tmp_path)
+    try:
+        with pytest.raises(sqlite3.OperationalError):
+            solo_lectura.registrar("ZETA LTDA - 31-08-2025.xlsx")
+    finally:
+        solo_lectura.cerrar()
+
+
+def test_conversiones_de_fecha():
+    assert periodos.corte_de_archivo("C:/x/ZETA LTDA - 31-08-2025.xlsx") == ("ZETA LTDA", "2025-08-31")
+    assert periodos.corte_de_archivo("ZETA LTDA 31-08-2025.xlsx") is None
+    assert periodos.fecha_iso("01/08/2025") == "2025-08-01"
+    assert periodos.fecha_iso("2025-08-01") is None
+    assert periodos.fecha_dmy("2025-08-01") == "01/08/2025"
+    assert periodos._meses("2024-11", "2025-02") == ["2024-11", "2024-12", "2025-01", "2025-02"]
@@ -0,0 +1,84 @@
+import json
+
+import pandas as pd
+import pytest
+
+from tests.conftest import importar
+
+remplazar = importar("BALANCE DETALLADO", "remplazar")
+
+ARCHIVO = "CONSORCIO AMERICAN LIGHTING - 31-08-2025.xlsx"
+
+# (Cuenta contable nombre, No. Identificación, Tercero) → (NIT, Tercero) esperados con
+# reglas_remplazar.json
+CASOS = [
+    # Una sola clave
+    ("OTRAS CXP AMERICAN LIGHTING", 111, "TERCERO A",
+     "806010696", "AMERICAN LIGHTING SAS"),
+    # "AMERICAN" y "CONSORCIO AMERICAN" se solapan: gana la que está más abajo en la tabla
+    ("OTRAS CXP CONSORCIO AMERICAN LIGHTING", 222, "TERCERO B",
+     "900779363", "CONSORCIO AMERICAN LIGHTING"),
+    # Dos claves en distinto orden dentro del nombre: también decide la tabla, no el texto
+    ("OTRAS CXP AGM DESARROLLOS / CONSORCIO SJC", 333, "TERCERO C",
+     "901034269", "CONSORCIO ALUMBRADO PUBLICO SJC"),
+    ("OTRAS CXP CONSORCIO SJC Y AGM", 444, "TERCERO D",
+     "901034269", "CONSORCIO ALUMBRADO PUBLICO SJC"),
+    # Sin clave pero con el NIT de una empresa del grupo: la validación corrige el Tercero
+    ("OTRAS CXP PROVEEDOR SIN REGLA", 806010696, "AMERICAN LIGHTING",
+     "806010696", "AMERICAN LIGHTING SAS"),
+    # Fuera de "OTRAS CXP" (o en minúsculas) no se aplican reglas
+    ("PROVEEDORES AMERICAN LIGHTING", 555, "TERCERO E", "555", "TERCERO E"),
+    ("otras cxp american", 666, "TERCERO F", "666", "TERCERO F"),
+    (None, 777, "TERCERO G", "777", "TERCERO G"),
+]
+
+
+@pytest.fixture
+def balance(tmp_path):
+    """Libro con las columnas de BALANCE DETALLADO, leído como lo lee el motor."""
+    ruta = tmp_path / ARCHIVO
+    pd.DataFrame({
+        "Cuenta contable": [23359501 + i for i in range(len(CASOS))],
+        "Cuenta contable nombre": [c[0] for c in CASOS],
+        "No. Identificación": [c[1] for c in CASOS],
+        "Tercero": [c[2] for c in CASOS],
+        "Saldo final": [1000.5 * i for i in range(len(CASOS))],
+    }).to_excel(ruta, index=False)
+    return pd.read_excel(ruta)
+
+
+def test_reglas_intercompania(balance):
+    resultado = remplazar.procesar(balance, ARCHIVO)
+    assert resultado["No. Identificación"].tolist() == [c[3] for c in CASOS]
+    assert resultado["Tercero"].tolist() == [c[4] for c in CASOS]
+    # Las demás columnas no se tocan
+    assert resultado["Saldo final"].tolist() == [1000.5 * i for i in range(len(CASOS))]
+
+
+def test_sin_columnas_necesarias_no_aplica(balance):
+    assert remplazar.procesar(balance.drop(columns="Tercero"), ARCHIVO) is None
+
+
+def test_sin_coincidencias_solo_valida_nit(balance):
+    sin_cxp = balance.assign(**{"Cuenta contable nombre": "PROVEEDORES NACIONALES"})
+    resultado = remplazar.procesar(sin_cxp, ARCHIVO)
+    assert resultado["No. Identificación"].tolist() == [str(c[1]) for c in CASOS]
+    assert resultado.loc[4, "Tercero"] == "AMERICAN LIGHTING SAS"
+    assert resultado.loc[0, "Tercero"] == "TERCERO A"
+
+
+def test_tabla_de_reglas_propia(tmp_path, monkeypatch):
+    # Claves con caracteres especiales de regex y una clave contenida en otra
+    ruta = tmp_path / "reglas.json"
+    ruta.write_text(json.dumps({"filtro_cuenta": "CXP", "reglas": [
+        {"clave": "C.I. (SAS)", "nit": 1, "tercero": "UNO"},
+        {"clave": "C.I.", "nit": 2, "tercero": "DOS"},
+        {"clave": "ZETA", "nit": 1, "tercero": "UNO BIS"},
+    ]}), encoding="utf-8")
+    filtro, patron, tabla, validacion = remplazar.cargar_reglas(ruta)
+    assert filtro == "CXP" and tabla["nit"].tolist() == ["1", "2", "1"]
+    # NIT repetido en la tabla: para la validación vale la última regla
+    assert validacion == {"1": "UNO BIS", "2": "DOS"}
+    monkeypatch.setattr(remplazar, "patron_reglas", patron)
+    nombres = pd.Series(["CXP C.I. (SAS)", "CXP CXI. (SAS)", "CXP ZETA C.I. (SAS)", "CXP C-I-"])
+    assert remplazar._regla_por_fila(nombres).to_dict() == {0: 1, 2: 2}
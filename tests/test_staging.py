@@ -0,0 +1,91 @@
+import os
+
+import pandas as pd
+import pytest
+
+from COMUN import staging
+from tests.conftest import copiar_pipeline, ejecutar, generar, libros
+
+pytest.importorskip("pyarrow")
+
+PIPELINE = "BALANCE DETALLADO"
+PARAMETROS = {"empresas": 1, "meses": 2, "filas_balance": 60}
+
+
+@pytest.fixture(scope="module")
+def publicados(tmp_path_factory):
+    """Las mismas exportaciones por los scripts escribiendo .xlsx en cada etapa y con copias
+    columnares entre etapas (el .xlsx se publica al final)."""
+    resultado = {}
+    for modo in ("directo", "parquet", "arrow"):
+        carpeta, entrada = copiar_pipeline(PIPELINE, tmp_path_factory.mktemp(modo))
+        generar(entrada, PIPELINE, **PARAMETROS)
+        argumentos = ("--por-scripts",) if modo == "directo" else ("--por-scripts", "--staging", modo)
+        resultado[modo] = (ejecutar(carpeta, *argumentos), entrada)
+    return resultado
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+def test_staging_publica_los_mismos_libros_que_el_modo_directo(publicados, fmt):
+    salida, entrada = publicados[fmt]
+    directo = libros(publicados["directo"][1])
+    assert len(directo) == 2
+    assert libros(entrada) == directo
+    assert salida.count("✅ Publicado:") == 2
+    # La copia queda vigente (mismo mtime del .xlsx) para GRAFICOS
+    for nombre in directo:
+        copia = staging.copia_vigente(entrada / nombre)
+        assert copia is not None and copia.suffix == f".{fmt}"
+
+
+@pytest.fixture
+def libro(tmp_path):
+    ruta = tmp_path / "ZETA LTDA - 31-08-2025.xlsx"
+    pd.DataFrame({"Cuenta contable": [11100501, 23359501], "Tercero": ["A", None],
+                  "Saldo final": [1.5, -2.0], "Fecha": ["31/08/2025", "31/08/2025"]}).to_excel(ruta, index=False)
+    return ruta
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+def test_leer_la_copia_da_los_tipos_del_xlsx(libro, monkeypatch, fmt):
+    monkeypatch.setenv("CONTA_STAGING", fmt)
+    df = pd.read_excel(libro)
+    staging.escribir(df.assign(**{"Saldo final": df["Saldo final"] * 10}), libro)
+    # La etapa escribió solo la copia; el .xlsx sigue igual
+    assert pd.read_excel(libro).equals(df)
+    desde_copia = staging.leer(libro)
+    assert desde_copia["Saldo final"].tolist() == [15, -20]
+    assert staging.leer(libro, dtype=str)["Cuenta contable"].tolist() == ["11100501", "23359501"]
+
+    assert staging.publicar(libro)
+    assert not staging.publicar(libro)  # ya publicado
+    # La etapa siguiente ve lo mismo leyendo la copia que leyendo el .xlsx publicado
+    publicado = pd.read_excel(libro)
+    assert publicado["Saldo final"].tolist() == [15, -20]
+    assert staging.leer(libro).equals(publicado)
+
+
+def test_copia_vieja_se_ignora_si_el_xlsx_cambio_por_fuera(libro, monkeypatch):
+    monkeypatch.setenv("CONTA_STAGING", "parquet")
+    staging.escribir(pd.DataFrame({"Tercero": ["DE LA COPIA"]}), libro)
+    assert staging.leer(libro)["Tercero"].tolist() == ["DE LA COPIA"]
+    # Un contador edita el .xlsx después: manda el .xlsx
+    st = os.stat(libro)
+    os.utime(libro, ns=(st.st_atime_ns, staging.rutas_copia(libro)[0].stat().st_mtime_ns + 10 ** 9))
+    assert staging.copia_vigente(libro) is None
+    assert staging.leer(libro)["Tercero"].tolist()[0] == "A"
+
+
+def test_sin_modo_activo_se_escribe_el_xlsx(libro, monkeypatch):
+    monkeypatch.delenv("CONTA_STAGING", raising=False)
+    staging.escribir(pd.DataFrame({"Tercero": ["NUEVO"]}), libro)
+    assert pd.read_excel(libro)["Tercero"].tolist() == ["NUEVO"]
+    assert not any(c.exists() for c in staging.rutas_copia(libro))
+
+
+def test_columna_mixta_cae_al_xlsx(libro, monkeypatch, capsys):
+    monkeypatch.setenv("CONTA_STAGING", "parquet")
+    staging.escribir(pd.DataFrame({"NIT": [900123456, "SIN NIT"]}), libro)
+    assert "se usa el .xlsx" in capsys.readouterr().out
+    assert not any(c.exists() for c in staging.rutas_copia(libro))
+    assert pd.read_excel(libro)["NIT"].tolist() == [900123456, "SIN NIT"]
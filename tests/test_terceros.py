@@ -0,0 +1,86 @@
+import pandas as pd
+import pytest
+
+from tests.conftest import importar
+
+terceros = importar("BALANCE DETALLADO", "terceros")
+unificar = importar("BALANCE DETALLADO", "unificar")
+
+# Identificación como llega en las exportaciones → clave normalizada
+NITS = [
+    ("806.010.696-1", "806010696"),
+    (" 806010696 ", "806010696"),
+    ("NIT 806010696-1", "806010696"),
+    ("NIT.806,010,696", "806010696"),
+    ("nit 900779363 - 7", "900779363"),
+    (806010696, "806010696"),
+    (806010696.0, "806010696"),
+    ("806010696.0", "806010696"),
+    ("CC 1.020.304", "CC1020304"),
+    ("", None),
+    ("   ", None),
+    (None, None),
+    (float("nan"), None),
+    ("-5", None),
+]
+
+
+def test_normalizar_nit():
+    normalizados = terceros.normalizar_nit(pd.Series([n for n, _ in NITS], dtype=object))
+    assert [None if pd.isna(v) else v for v in normalizados] == [c for _, c in NITS]
+
+
+@pytest.fixture
+def registro(tmp_path):
+    with terceros.RegistroTerceros(tmp_path / "_terceros.sqlite") as registro:
+        yield registro
+
+
+def test_registro_conserva_el_primer_nombre_y_aplica_correcciones(registro):
+    nuevos = registro.registrar(pd.DataFrame({
+        "No. Identificación": ["806.010.696-1", "806010696", "900779363", None],
+        "Tercero": ["AMERICAN LIGTHING", "AMERICAN LIGHTING SAS", "CONSORCIO", "SIN NIT"]}), "enero.xlsx")
+    assert nuevos == 2
+    # Un mes después el mismo NIT llega con otro nombre: no cambia el canónico
+    assert registro.registrar(pd.DataFrame({"No. Identificación": ["806010696"],
+                                            "Tercero": ["AMERICAN LIGHTING SAS"]})) == 0
+    consultados = pd.Series(["806010696", "900779363-7", "123", None])
+    assert registro.resolver(consultados).tolist()[:2] == ["AMERICAN LIGTHING", "CONSORCIO"]
+    assert registro.resolver(consultados).iloc[2:].isna().all()
+
+    assert registro.corregir("NIT 806.010.696-1", "AMERICAN LIGHTING SAS") == "806010696"
+    assert registro.resolver(consultados).iloc[0] == "AMERICAN LIGHTING SAS"
+    # Una corrección posterior reemplaza la anterior
+    registro.corregir("806010696", "AMERICAN LIGHTING S.A.S.")
+    assert registro.resolver(consultados).iloc[0] == "AMERICAN LIGHTING S.A.S."
+
+
+def test_corregir_sin_nit_o_sin_nombre(registro):
+    with pytest.raises(ValueError):
+        registro.corregir("", "NOMBRE")
+    with pytest.raises(ValueError):
+        registro.corregir("806010696", "  ")
+
+
+def test_buscar_por_lotes(registro, monkeypatch):
+    monkeypatch.setattr(terceros, "LOTE_CONSULTA", 2)
+    registro.registrar(pd.DataFrame({"No. Identificación": [str(n) for n in range(1, 6)],
+                                     "Tercero": [f"T{n}" for n in range(1, 6)]}))
+    registro.corregir("4", "T4 CORREGIDO")
+    assert registro.buscar(["1", "3", "4", "5", "9"]) == {"1": "T1", "3": "T3", "4": "T4 CORREGIDO", "5": "T5"}
+
+
+def test_unificar_reescribe_tercero_con_el_nombre_canonico(registro):
+    agosto = pd.DataFrame({"No. Identificación": ["806.010.696-1", "900779363", None],
+                           "Tercero": ["AMERICAN LIGTHING", "CONSORCIO", "SIN NIT"]})
+    septiembre = pd.DataFrame({"No. Identificación": ["806010696", "901034269"],
+                               "Tercero": ["AMERICAN LIGHTING SAS", "CONSORCIO SJC"]})
+    for df, archivo in ((agosto, "agosto.xlsx"), (septiembre, "septiembre.xlsx")):
+        unificar.acumular(df, registro, archivo)
+    resultado = unificar.procesar(septiembre.copy(), "septiembre.xlsx", registro)
+    assert resultado["Tercero"].tolist() == ["AMERICAN LIGTHING", "CONSORCIO SJC"]
+    # Las filas sin identificación quedan sin Tercero
+    resultado = unificar.procesar(agosto.copy(), "agosto.xlsx", registro)
+    assert resultado["Tercero"].tolist()[:2] == ["AMERICAN LIGTHING", "CONSORCIO"]
+    assert pd.isna(resultado["Tercero"].iloc[2])
+    assert unificar.procesar(agosto.drop(columns="Tercero"), "agosto.xlsx", registro) is None
@@ -0,0 +1,148 @@
+import json
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import time
+
+import pytest
+
+from COMUN import atomico
+from COMUN.vigilante import Vigilante
+from tests.conftest import copiar_pipeline, ejecutar, generar, libros
+
+PIPELINE = "BALANCE DETALLADO"
+PARAMETROS = {"empresas": 1, "meses": 2, "filas_balance": 40}
+ESPERA = 0.3
+
+
+@pytest.fixture
+def lotes():
+    return []
+
+
+@pytest.fixture
+def vigilante(tmp_path, lotes):
+    return Vigilante(tmp_path, lotes.append, espera=ESPERA, polling=True)
+
+
+def test_solo_pasan_los_archivos_asentados(tmp_path, vigilante, lotes):
+    libro = tmp_path / "export_0001.xlsx"
+    libro.write_bytes(b"primera mitad")
+    # Bloqueo de Excel, copia columnar, otros archivos y subcarpetas no cuentan
+    for nombre in ("~$export_0001.xlsx", ".export_0001.parquet", "notas.txt"):
+        (tmp_path / nombre).write_bytes(b"x")
+    (tmp_path / "_cuarentena").mkdir()
+    (tmp_path / "_cuarentena" / "export_0002.xlsx").write_bytes(b"x")
+
+    assert vigilante.revisar() == []
+    time.sleep(ESPERA * 0.7)
+    # Se sigue copiando: vuelve a empezar la espera
+    with open(libro, "ab") as fh:
+        fh.write(b" y segunda mitad")
+    assert vigilante.revisar() == []
+    time.sleep(ESPERA * 0.7)
+    assert vigilante.revisar() == []
+    time.sleep(ESPERA * 0.5)
+    assert vigilante.revisar() == [str(libro)]
+    assert lotes == [[str(libro)]]
+    # Sin cambios no se vuelve a entregar
+    time.sleep(ESPERA * 1.2)
+    assert vigilante.revisar() == [] and len(lotes) == 1
+
+
+def test_borrado_antes_de_asentarse_no_se_entrega(tmp_path, vigilante, lotes):
+    libro = tmp_path / "export_0001.xlsx"
+    libro.write_bytes(b"x")
+    vigilante.revisar()
+    libro.unlink()
+    time.sleep(ESPERA * 1.2)
+    assert vigilante.revisar() == [] and lotes == []
+
+
+def test_descarta_los_que_ya_no_tienen_trabajo(tmp_path, lotes):
+    # Lo que escribe el propio pipeline también cambia la carpeta: el manifiesto lo descarta
+    procesados = {str(tmp_path / "ZETA LTDA - 31-08-2025.xlsx")}
+    vigilante = Vigilante(tmp_path, lotes.append, lambda rutas: [r for r in rutas if r not in procesados],
+                          espera=ESPERA, polling=True)
+    for nombre in ("ZETA LTDA - 31-08-2025.xlsx", "export_0002.xlsx"):
+        (tmp_path / nombre).write_bytes(b"x")
+    vigilante.revisar()
+    time.sleep(ESPERA * 1.2)
+    assert vigilante.revisar() == [str(tmp_path / "export_0002.xlsx")]
+
+    (tmp_path / "ZETA LTDA - 31-08-2025.xlsx").write_bytes(b"reescrito")
+    vigilante.revisar()
+    time.sleep(ESPERA * 1.2)
+    assert vigilante.revisar() == []
+    assert lotes == [[str(tmp_path / "export_0002.xlsx")]]
+
+
+def test_error_en_el_lote_no_detiene_al_vigilante(tmp_path, capsys):
+    def falla(rutas):
+        raise RuntimeError("libro abierto en Excel")
+
+    vigilante = Vigilante(tmp_path, falla, espera=0, polling=True)
+    (tmp_path / "export_0001.xlsx").write_bytes(b"x")
+    vigilante.revisar()
+    assert vigilante.revisar() == [str(tmp_path / "export_0001.xlsx")]
+    assert "❌ Error procesando el lote: libro abierto en Excel" in capsys.readouterr().out
+
+
+def _esperar(condicion, limite=90):
+    fin = time.monotonic() + limite
+    while time.monotonic() < fin:
+        if condicion():
+            return True
+        time.sleep(0.2)
+    return False
+
+
+def test_vigilar_procesa_cada_exportacion_cuando_termina_de_copiarse(tmp_path):
+    origen = tmp_path / "descargas"
+    exportaciones = generar(origen, PIPELINE, **PARAMETROS)
+    carpeta_ref, referencia = copiar_pipeline(PIPELINE, tmp_path / "referencia")
+    generar(referencia, PIPELINE, **PARAMETROS)
+    ejecutar(carpeta_ref)
+
+    carpeta, entrada = copiar_pipeline(PIPELINE, tmp_path / "vigilado")
+    log = tmp_path / "vigilante.log"
+    entorno = {**os.environ, "PYTHONIOENCODING": "utf-8", "PYTHONUNBUFFERED": "1"}
+    entorno.pop("CONTA_STAGING", None)
+    with open(log, "w", encoding="utf-8") as salida:
+        proceso = subprocess.Popen([sys.executable, "ejecutar.py", "--vigilar", "--espera", "1"], cwd=carpeta,
+                                   env=entorno, stdout=salida, stderr=subprocess.STDOUT)
+    try:
+        assert _esperar(lambda: "Vigilando" in log.read_text(encoding="utf-8"), 30)
+        # La primera exportación llega en dos partes (una copia lenta); la segunda de una vez
+        datos = (origen / exportaciones[0]).read_bytes()
+        with open(entrada / exportaciones[0], "wb") as fh:
+            fh.write(datos[:len(datos) // 2])
+            fh.flush()
+            time.sleep(0.5)
+            fh.write(datos[len(datos) // 2:])
+        shutil.copy2(origen / exportaciones[1], entrada / exportaciones[1])
+
+        def terminado():
+            generacion, en_curso = atomico.leer_generacion(entrada)
+            return len(libros(entrada)) == 2 and not any((entrada / e).exists() for e in exportaciones) \
+                and generacion >= 2 and not en_curso
+        assert _esperar(terminado), log.read_text(encoding="utf-8")
+    finally:
+        proceso.send_signal(signal.SIGINT)
+        proceso.wait(timeout=30)
+
+    salida = log.read_text(encoding="utf-8")
+    assert libros(entrada) == libros(referencia)
+    assert not (entrada / "_cuarentena").exists()
+    # Al vigilante solo le llegan las exportaciones ya copiadas; los libros que escribe el
+    # propio motor (ya sin etapas pendientes) no disparan otro lote
+    entregados = [linea.split(": ", 1)[1].split(", ") for linea in salida.splitlines() if linea.startswith("👀 ")
+                  and "archivo(s)" in linea]
+    assert sorted(n for lote in entregados for n in lote) == sorted(exportaciones)
+    lineas = [json.loads(l) for l in (entrada / "_informe_ejecuciones.jsonl").read_text(encoding="utf-8").splitlines()]
+    archivos = [l for l in lineas if l["modo"] == "vigilante" and l["tipo"] == "archivo"]
+    assert not [l for l in archivos if l["error"]]
+    # Cada libro se leyó una sola vez
+    assert sorted(l["archivo"] for l in archivos if l["etapa"] == "lectura") == sorted(libros(entrada))